@@ -0,0 +1,387 @@
+"""
+Command line batch analyzer.
+
+Analyzes python files and writes one json object per line for every variable
+in every scope:
+
+    {"module": "samples/fib.py", "scope": "fib", "variable": "n", "types": ["int"], "line": 1}
+
+Usage:
+
+    python -m analyze samples/ "src/**/*.py" -j 4 -o types.jsonl
+
+Exit codes:
+    0: Every file was analyzed.
+    1: At least one file could not be analyzed. An object with an "error" key
+       is written for each of them.
+    2: Bad arguments or no python files were found.
+"""
+
+import argparse
+import glob
+import json
+import os
+import resource
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+
+EXIT_OK = 0
+EXIT_ANALYSIS_ERROR = 1
+EXIT_USAGE = 2
+
+
+def expand_paths(patterns):
+    """
+    Expand files, directories and glob patterns into python files.
+
+    Returns:
+        list[str]: Without duplicates, in the order they were found.
+    """
+    paths = []
+    seen = set()
+
+    def add(path):
+        if path not in seen:
+            seen.add(path)
+            paths.append(path)
+
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        for match in matches:
+            if os.path.isdir(match):
+                for dirpath, dirnames, filenames in os.walk(match):
+                    dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+                    for filename in sorted(filenames):
+                        if filename.endswith(".py"):
+                            add(os.path.join(dirpath, filename))
+            elif match.endswith(".py") and os.path.isfile(match):
+                add(match)
+    return paths
+
+
+def analyze_file(path, budget=None, max_functions=None, max_bytes=None,
+                 release_ast=False, profile=None, memoize=True,
+                 record_expr_types=False):
+    """
+    Analyze one file. This runs inside worker processes.
+
+    Args:
+        path (str)
+        budget (Optional[budget.Budget]): Replaces the budget of the
+            profile.
+        max_functions (Optional[int]): Function environments kept in memory.
+        max_bytes (Optional[int]): Memory traced by tracemalloc above which
+            function environments are evicted.
+        release_ast (bool): Parse top level statements one at a time and
+            drop function bodies from the AST once their bindings are final.
+        profile (Optional[profiles.Profile]): Defaults to the configuration
+            of an analysis without a profile: unlimited, one instance per
+            class, loops interpreted once and no widening.
+        memoize (bool): Keep the results of evaluated expressions whose
+            inputs did not change.
+        record_expr_types (bool): Add a record with the "expr_types" summary
+            of the types of every expression.
+
+    Returns:
+        tuple[str, list[dict], Optional[str]]: The path, its records, and the
+            error that stopped the analysis if any. Bindings that were final
+            before an error are still recorded. Bindings of functions that
+            ran out of budget have an "exhausted" key with the reason. With
+            either memory limit, a record has the "memory" stats of the
+            function environments.
+    """
+    from function_pool import FunctionEnvPool
+    from inference import ModuleEnv
+    from profiles import DEFAULT_PROFILE
+    from summary_pack import types_descriptors
+
+    records = []
+    try:
+        with open(path, "r") as f:
+            code = f.read()
+        pool = FunctionEnvPool(max_functions=max_functions, max_bytes=max_bytes)
+        session = (profile or DEFAULT_PROFILE).create_session(
+            budget=budget, function_pool=pool, memoize=memoize)
+        env = ModuleEnv(module_location=os.path.abspath(path), session=session,
+                        record_expr_types=record_expr_types)
+        meter = session.budget_meter()
+        for binding in env.iter_parse(code, release_ast=release_ast):
+            record = {
+                "module": path,
+                "scope": binding.scope,
+                "variable": binding.name,
+                "types": types_descriptors(binding.types),
+                "line": binding.lineno,
+            }
+            reasons = sorted({meter.exhausted_functions()[t] for t in binding.types
+                              if t in meter.exhausted_functions()})
+            if reasons:
+                record["exhausted"] = ", ".join(reasons)
+            records.append(record)
+        if pool.limited():
+            records.append({"module": path, "memory": pool.stats()})
+        if record_expr_types:
+            records.append({"module": path,
+                            "expr_types": env.expr_types().summary()})
+    except Exception as e:
+        return path, records, "{}: {}".format(type(e).__name__, e)
+    return path, records, None
+
+
+def iter_results(paths, workers, budget=None, max_functions=None,
+                 max_bytes=None, release_ast=False, profile=None,
+                 memoize=True, record_expr_types=False):
+    """
+    Analyze files and yield the result of each one as soon as it is done.
+    At most twice as many files as there are workers are in flight, so
+    results do not pile up in memory.
+    """
+    if workers <= 1:
+        for path in paths:
+            yield analyze_file(path, budget, max_functions, max_bytes,
+                               release_ast, profile, memoize,
+                               record_expr_types)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = iter(paths)
+        in_flight = []
+        for path in pending:
+            in_flight.append(executor.submit(
+                analyze_file, path, budget, max_functions, max_bytes,
+                release_ast, profile, memoize, record_expr_types))
+            if len(in_flight) >= workers * 2:
+                break
+
+        while in_flight:
+            future = in_flight.pop(0)
+            yield future.result()
+            for path in pending:
+                in_flight.append(executor.submit(
+                    analyze_file, path, budget, max_functions, max_bytes,
+                    release_ast, profile, memoize, record_expr_types))
+                break
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process and its workers in megabytes."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is in kilobytes on linux
+    return max(own, children) / 1024.0
+
+
+def write_record(out, record):
+    out.write(json.dumps(record, sort_keys=True))
+    out.write("\n")
+    out.flush()
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m analyze",
+        description="Infer the types of variables in python files.")
+    parser.add_argument("paths", nargs="+",
+                        help="Files, directories, or glob patterns to analyze.")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="Number of worker processes.")
+    parser.add_argument("-o", "--output", default="-",
+                        help="File to write json lines to. Defaults to stdout.")
+    add_analysis_arguments(parser)
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and write the bindings whose types "
+                             "change whenever files change.")
+    parser.add_argument("--interval", type=float, default=0.5,
+                        help="Seconds between polls in watch mode.")
+    parser.add_argument("--debounce", type=float, default=0.2,
+                        help="Seconds of quiet before changes are analyzed "
+                             "together in watch mode.")
+    return parser
+
+
+# The arguments of add_analysis_arguments() by their dest, in the json
+# options of daemon requests
+ANALYSIS_OPTIONS = ("profile", "function_nodes", "function_seconds",
+                    "module_nodes", "module_seconds", "max_functions",
+                    "max_memory", "release_ast", "heap", "heap_depth",
+                    "loop_iterations", "max_union_size", "memoize",
+                    "record_expr_types")
+
+
+def add_analysis_arguments(parser):
+    """
+    Add the arguments that configure the analysis of a file, shared by
+    python -m analyze and python -m daemon analyze.
+    """
+    parser.add_argument("--profile", choices=["fast", "balanced", "precise"],
+                        default="balanced",
+                        help="Preset of the options below that trade precision "
+                             "for speed. Options given explicitly override it.")
+    parser.add_argument("--function-nodes", type=int,
+                        help="Nodes one call may evaluate before the function "
+                             "is given up on and returns unknown.")
+    parser.add_argument("--function-seconds", type=float,
+                        help="Seconds one call may take before the function "
+                             "is given up on and returns unknown.")
+    parser.add_argument("--module-nodes", type=int,
+                        help="Nodes a file may evaluate before every function "
+                             "returns unknown.")
+    parser.add_argument("--module-seconds", type=float,
+                        help="Seconds a file may take before every function "
+                             "returns unknown.")
+    parser.add_argument("--max-functions", type=int,
+                        help="Function environments kept in memory. The least "
+                             "recently called ones are reduced to the types "
+                             "of their arguments and returns.")
+    parser.add_argument("--max-memory", type=float,
+                        help="Megabytes traced by tracemalloc above which "
+                             "function environments are evicted.")
+    parser.add_argument("--release-ast", action="store_true",
+                        help="Parse top level statements one at a time and drop "
+                             "function bodies from the AST once their types are "
+                             "final to lower memory.")
+    parser.add_argument("--heap", choices=["class", "site", "context"],
+                        help="Instances shared by every allocation of a class, "
+                             "one per allocation site, or one per allocation "
+                             "site and its callers. More precise is slower.")
+    parser.add_argument("--heap-depth", type=int,
+                        help="Caller call sites told apart by --heap context.")
+    parser.add_argument("--loop-iterations", type=int,
+                        help="Times a loop body is interpreted at most while "
+                             "the types of its variables keep changing.")
+    parser.add_argument("--max-union-size", type=int,
+                        help="Types a variable may hold before it is widened "
+                             "to unknown.")
+    parser.add_argument("--no-eval-memo", dest="memoize", action="store_false",
+                        help="Evaluate every expression every time instead of "
+                             "keeping results whose inputs did not change. "
+                             "For debugging.")
+    parser.add_argument("--expr-types", dest="record_expr_types",
+                        action="store_true",
+                        help="Write the span and types of every expression of "
+                             "each file in an expr_types record.")
+
+
+def analysis_options(args):
+    """
+    Returns:
+        dict[str, Any]: The json serializable values of ANALYSIS_OPTIONS in
+            parsed arguments.
+    """
+    return {name: getattr(args, name) for name in ANALYSIS_OPTIONS}
+
+
+def analysis_kwargs(options):
+    """
+    Args:
+        options (dict[str, Any]): Values of ANALYSIS_OPTIONS. Missing options
+            take the defaults of the command line.
+
+    Returns:
+        dict[str, Any]: The keyword arguments of analyze_file() for them.
+    """
+    parser = argparse.ArgumentParser()
+    add_analysis_arguments(parser)
+    args = parser.parse_args([])
+    for name in ANALYSIS_OPTIONS:
+        if name in options:
+            setattr(args, name, options[name])
+
+    max_bytes = None
+    if args.max_memory is not None:
+        max_bytes = int(args.max_memory * 2 ** 20)
+    return {
+        "max_functions": args.max_functions,
+        "max_bytes": max_bytes,
+        "release_ast": args.release_ast,
+        "profile": profile_from_args(args),
+        "memoize": args.memoize,
+        "record_expr_types": args.record_expr_types,
+    }
+
+
+def profile_from_args(args):
+    from profiles import get_profile
+    return get_profile(args.profile,
+                       heap_policy=args.heap,
+                       heap_depth=args.heap_depth,
+                       loop_iterations=args.loop_iterations,
+                       max_union_size=args.max_union_size,
+                       function_nodes=args.function_nodes,
+                       function_seconds=args.function_seconds,
+                       module_nodes=args.module_nodes,
+                       module_seconds=args.module_seconds)
+
+
+def watch_paths(args):
+    from watch import watch
+
+    # Directories are watched for new files, patterns only match once
+    paths = [p for p in args.paths if os.path.isdir(p)]
+    paths += [p for p in expand_paths([p for p in args.paths
+                                       if not os.path.isdir(p)])]
+    if not paths:
+        sys.stderr.write("No python files found.\n")
+        return EXIT_USAGE
+    kwargs = analysis_kwargs(analysis_options(args))
+    # Statements are parsed again on every change, and only changed
+    # bindings are written
+    for option, flag in (("release_ast", "--release-ast"),
+                         ("record_expr_types", "--expr-types")):
+        if kwargs.pop(option):
+            sys.stderr.write("{} does not apply to --watch.\n".format(flag))
+            return EXIT_USAGE
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        watch(paths, out=out, interval=args.interval, debounce=args.debounce,
+              **kwargs)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return EXIT_OK
+
+
+def main(argv=None):
+    args = create_parser().parse_args(argv)
+
+    if args.watch:
+        return watch_paths(args)
+
+    paths = expand_paths(args.paths)
+    if not paths:
+        sys.stderr.write("No python files found.\n")
+        return EXIT_USAGE
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    failed = 0
+    start = time.perf_counter()
+    try:
+        kwargs = analysis_kwargs(analysis_options(args))
+        results = iter_results(paths, args.workers, None, **kwargs)
+        for path, records, error in results:
+            for record in records:
+                write_record(out, record)
+            if error is not None:
+                failed += 1
+                write_record(out, {"module": path, "error": error})
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    sys.stderr.write(
+        "{} files ({} failed) in {:.2f}s, {:.1f} files/s, peak RSS {:.1f} MB\n".format(
+            len(paths), failed, elapsed, len(paths) / elapsed if elapsed else 0.0,
+            peak_rss_mb()))
+
+    return EXIT_ANALYSIS_ERROR if failed else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
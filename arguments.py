@@ -1,6 +1,8 @@
 import sys
 import ast
 
+from type_set import TYPE_SETS
+
 
 class Arguments:
     """
@@ -23,6 +25,7 @@ class Arguments:
     when represented as asts. The Call node only has fields for args and keywords,
     so the ast combines keywords and keyword only args into the same field.
     """
+    __slots__ = ("__pos_args", "__keyword_args", "__vararg", "__kwarg")
 
     def __init__(self, pos_args=None, keyword_args=None, vararg=None, kwarg=None):
         """
@@ -32,26 +35,27 @@ class Arguments:
             vararg (Optional[pytype.PyType])
             kwarg (Optional[pytype.PyType])
         """
-        from tuple_type import TUPLE_CLASS
+        from tuple_type import TUPLE_CLASS, EMPTY_TUPLE
         from dict_type import DICT_CLASS
         from builtin_types import STR_TYPE
 
         self.__pos_args = pos_args or []
         self.__keyword_args = keyword_args or {}
-        self.__vararg = vararg or TUPLE_CLASS.instance()
-        self.__kwarg = kwarg or DICT_CLASS.instance().new_container()
+        # The empty vararg and kwarg are shared since they are only read
+        self.__vararg = vararg or EMPTY_TUPLE
+        self.__kwarg = kwarg or DICT_CLASS.instance()
 
         # Type checks
         assert isinstance(self.__pos_args, list)
-        assert all(isinstance(x, set) for x in self.__pos_args)
+        assert all(isinstance(x, TYPE_SETS) for x in self.__pos_args)
 
         assert isinstance(self.__keyword_args, dict)
-        assert all(isinstance(x, set) for x in self.__keyword_args.values())
+        assert all(isinstance(x, TYPE_SETS) for x in self.__keyword_args.values())
 
         assert isinstance(self.__vararg, type(TUPLE_CLASS.instance()))
         assert isinstance(self.__kwarg, type(DICT_CLASS.instance()))
         for types in self.__kwarg.key_types():
-            assert isinstance(types, set)
+            assert isinstance(types, TYPE_SETS)
             assert all(x.is_type(STR_TYPE) for x in types)
 
     def pos_args(self):
@@ -158,7 +162,7 @@ class Arguments:
         """
         Add any remaining positional arguments then the unpacked vararg.
         """
-        from tuple_type import TUPLE_CLASS
+        from tuple_type import TUPLE_CLASS, EMPTY_TUPLE
 
         pos_args = self.pos_args()
         tup = TUPLE_CLASS.create_tuple(
@@ -166,7 +170,7 @@ class Arguments:
         )
         func.env().bind(func.vararg(), {tup})
         self.__pos_args.clear()
-        self.__vararg = TUPLE_CLASS.create_tuple()
+        self.__vararg = EMPTY_TUPLE
 
     def unpack_kwonly_args(self, func):
         kw_args = self.keyword_args()
@@ -0,0 +1,101 @@
+"""
+Count the sets allocated by the analyzer while the test suite runs.
+
+Every module of the analyzer gets a set, frozenset and TypeSet that count
+their calls by the module and line they are made on, so copies like
+set(types) and new empty sets are counted. Set literals and the results of
+unions are not.
+
+    python benchmarks/bench_allocations.py [--top 10]
+"""
+
+import argparse
+import builtins
+import collections
+import contextlib
+import io
+import os
+import sys
+import time
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+COUNTS = collections.Counter()  # Counter[tuple[str, int]]
+COPIES = collections.Counter()  # Counter[tuple[str, int]]
+
+
+def counting(cls):
+    """
+    Returns:
+        type: A stand in for cls whose calls are counted by caller.
+    """
+    class Meta(type):
+        def __call__(self, *args):
+            frame = sys._getframe(1)
+            site = (os.path.relpath(frame.f_code.co_filename, ROOT), frame.f_lineno)
+            COUNTS[site] += 1
+            if args:
+                COPIES[site] += 1
+            return cls(*args)
+
+        def __instancecheck__(self, obj):
+            return isinstance(obj, cls)
+
+        def __subclasscheck__(self, subclass):
+            return issubclass(subclass, cls)
+
+    return Meta(cls.__name__, (), {})
+
+
+def analyzer_modules():
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None) or ""
+        if (path.startswith(ROOT) and
+                not path.startswith(os.path.join(ROOT, "tests")) and
+                not path.startswith(os.path.join(ROOT, "benchmarks"))):
+            yield module
+
+
+def instrument():
+    try:
+        from type_set import TypeSet
+    except ImportError:
+        TypeSet = None
+
+    stand_ins = {"set": counting(builtins.set),
+                 "frozenset": counting(builtins.frozenset)}
+    for module in analyzer_modules():
+        for name, stand_in in stand_ins.items():
+            module.__dict__.setdefault(name, stand_in)
+        if TypeSet is not None and module.__dict__.get("TypeSet") is TypeSet:
+            module.TypeSet = counting(TypeSet)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    suite = unittest.defaultTestLoader.discover(os.path.join(ROOT, "tests"),
+                                                top_level_dir=ROOT)
+    instrument()
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = unittest.TextTestRunner(stream=io.StringIO()).run(suite)
+    elapsed = time.perf_counter() - start
+
+    print("{} tests, {} failures and errors, {:.2f}s".format(
+        result.testsRun, len(result.failures) + len(result.errors), elapsed))
+    print("{} sets allocated, {} of them copies".format(
+        sum(COUNTS.values()), sum(COPIES.values())))
+    for (path, line), count in COPIES.most_common(args.top):
+        print("{:>10}  {}:{}".format(count, path, line))
+
+
+if __name__ == "__main__":
+    main()
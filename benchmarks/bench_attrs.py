@@ -0,0 +1,74 @@
+"""
+Benchmark attribute heavy code: a generated module of classes that set
+their attributes in __init__ and read them in methods, timed and with the
+memory retained by the analysis as traced by tracemalloc.
+
+    python benchmarks/bench_attrs.py [--classes 300] [--attrs 12]
+"""
+
+import argparse
+import ast
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import ModuleEnv
+from session import AnalysisSession
+
+
+def generate_module(classes, attrs):
+    parts = []
+    for i in range(classes):
+        init = "".join("        self.attr_{j} = a + {j}\n".format(j=j)
+                       for j in range(attrs))
+        reads = " + ".join("self.attr_{j}".format(j=j) for j in range(attrs))
+        parts.append(
+            "class Class{i}:\n"
+            "    def __init__(self, a):\n"
+            "{init}"
+            "\n"
+            "    def total(self):\n"
+            "        return {reads}\n"
+            "\n"
+            "    def scaled(self, b):\n"
+            "        return self.total() * b + self.attr_0\n"
+            "\n"
+            "obj_{i} = Class{i}({i})\n"
+            "result_{i} = obj_{i}.scaled(2) + obj_{i}.total()\n"
+            .format(i=i, init=init, reads=reads))
+    return "\n".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--classes", type=int, default=300)
+    parser.add_argument("--attrs", type=int, default=12)
+    args = parser.parse_args()
+
+    node = ast.parse(generate_module(args.classes, args.attrs))
+    tracemalloc.start()
+    ModuleEnv(session=AnalysisSession()).parse_module(ast.parse("x = 1"))
+
+    gc.collect()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    session = AnalysisSession()
+    env = ModuleEnv(session=session)
+    with session.activate():
+        env.parse_module(node)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - base
+
+    print("{} classes with {} attributes: {:.2f}s, retained {:.2f} MB "
+          "({:.0f} bytes per class)".format(
+              args.classes, args.attrs, elapsed, retained / 2 ** 20,
+              retained / args.classes))
+
+
+if __name__ == "__main__":
+    main()
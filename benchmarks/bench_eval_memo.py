@@ -0,0 +1,76 @@
+"""
+Benchmark the eval memo on a generated module of arithmetic functions that
+are called several times with arguments of the same types, and on the
+samples, with the memo and without it.
+
+    python benchmarks/bench_eval_memo.py [--functions 200] [--calls 3]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import ModuleEnv
+from session import AnalysisSession
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FUNCTION_TEMPLATE = """
+def scale_{i}(x, low, high):
+    total = 0
+    for step in [1, 2, 3]:
+        if low < x * step + 1:
+            total = total + x * step - low * 2
+        total = total + (x - low) * (high - x) / 2
+    return total
+
+"""
+
+CALL_TEMPLATE = "result_{i}_{j} = scale_{i}({j}, {j} + 1, {j} + 2)\n"
+
+
+def generate_module(functions, calls):
+    return "".join(
+        FUNCTION_TEMPLATE.format(i=i) +
+        "".join(CALL_TEMPLATE.format(i=i, j=j) for j in range(calls))
+        for i in range(functions))
+
+
+def measure(code, memoize):
+    """
+    Returns:
+        tuple[float, dict]: Seconds and the stats of the memo.
+    """
+    session = AnalysisSession(memoize=memoize)
+    start = time.perf_counter()
+    ModuleEnv(session=session).parse_code(code)
+    return time.perf_counter() - start, session.eval_memo().stats()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--functions", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=3)
+    args = parser.parse_args()
+
+    corpora = [("generated", generate_module(args.functions, args.calls))]
+    corpora += [(os.path.basename(path), open(path).read())
+                for path in sorted(glob.glob(os.path.join(ROOT, "samples", "*.py")))]
+    measure("x = 1", False)
+
+    for corpus, code in corpora:
+        without, _ = measure(code, False)
+        with_memo, stats = measure(code, True)
+        print("{:<14} without memo {:.3f}s, with memo {:.3f}s ({:.2f}x), "
+              "{} hits, {} misses, {:.1f}% hit rate".format(
+                  corpus, without, with_memo, without / with_memo,
+                  stats["hits"], stats["misses"], stats["hit_rate"] * 100))
+
+
+if __name__ == "__main__":
+    main()
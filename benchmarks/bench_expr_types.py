@@ -0,0 +1,63 @@
+"""
+Benchmark recording the types of every expression: a generated module of
+functions each called twice, analyzed without the expression type table and
+with it.
+
+    python benchmarks/bench_expr_types.py [--functions 300] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import ModuleEnv
+
+
+TEMPLATE = """
+def area_{i}(width, height):
+    total = width * height
+    if 100 < total:
+        total = total - 1
+    return [total, width + height]
+
+
+first_{i} = area_{i}({i}, 2)
+second_{i} = area_{i}(1.5, {i})
+"""
+
+
+def generate_module(functions):
+    return "".join(TEMPLATE.format(i=i) for i in range(functions))
+
+
+def measure(code, repeat, record_expr_types):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ModuleEnv(record_expr_types=record_expr_types).parse_code(code)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--functions", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    code = generate_module(args.functions)
+    ModuleEnv().parse_code("x = 1")
+
+    without = measure(code, args.repeat, False)
+    recorded = measure(code, args.repeat, True)
+    print("{} functions: without the table {:.3f}s, recording every expression "
+          "{:.3f}s ({:+.1f}%)".format(args.functions, without, recorded,
+                                      (recorded / without - 1) * 100))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark the cost and precision of each heap policy on the samples and on a
+generated object oriented module, where objects of the same classes are
+created with different types directly and through factory functions.
+
+Precision is the share of module level bindings with exactly one type, and
+their mean number of types. Bindings in functions are left out since the
+self of a method holds every instance it was called on.
+
+    python benchmarks/bench_heap.py [--groups 40] [--depth 1 2]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from heap import create_heap
+from inference import ModuleEnv
+from session import AnalysisSession
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CLASSES = """
+class Box:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class Pair:
+    def __init__(self, first, second):
+        self.first = Box(first)
+        self.second = Box(second)
+
+    def left(self):
+        return self.first.get()
+
+    def right(self):
+        return self.second.get()
+
+
+def make_box(value):
+    return Box(value)
+
+
+def make_pair(first, second):
+    return Pair(first, second)
+"""
+
+GROUP_TEMPLATE = """
+int_box_{i} = Box({i})
+str_box_{i} = Box('s{i}')
+int_value_{i} = int_box_{i}.get()
+str_value_{i} = str_box_{i}.get()
+made_float_{i} = make_box({i}.5).get()
+made_none_{i} = make_box(None).get()
+pair_{i} = make_pair({i}, 's')
+left_{i} = pair_{i}.left()
+right_{i} = pair_{i}.right()
+"""
+
+
+def generate_module(groups):
+    return CLASSES + "".join(GROUP_TEMPLATE.format(i=i) for i in range(groups))
+
+
+def measure(code, policy, depth):
+    """
+    Returns:
+        tuple[float, int, float, dict]: Seconds, share of bindings with one
+            type, mean types per binding, and the stats of the heap.
+    """
+    start = time.perf_counter()
+    session = AnalysisSession(heap=create_heap(policy, depth))
+    env = ModuleEnv(session=session)
+    sizes = [len(b.types) for b in env.iter_parse(code) if not b.scope]
+    elapsed = time.perf_counter() - start
+    precise = sum(1 for size in sizes if size == 1) / len(sizes)
+    return elapsed, precise, sum(sizes) / len(sizes), session.heap().stats()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=40)
+    parser.add_argument("--depth", type=int, nargs="*", default=[1, 2])
+    args = parser.parse_args()
+
+    corpora = [("generated", generate_module(args.groups))]
+    corpora += [(os.path.basename(path), open(path).read())
+                for path in sorted(glob.glob(os.path.join(ROOT, "samples", "*.py")))]
+    policies = [("class", "class", 1), ("site", "site", 1)]
+    policies += [("context k={}".format(k), "context", k) for k in args.depth]
+
+    for corpus, code in corpora:
+        print(corpus)
+        for label, policy, depth in policies:
+            elapsed, precise, mean, stats = measure(code, policy, depth)
+            print("  {:<12} {:.3f}s, {:5.1f}% single typed, {:.2f} types per "
+                  "binding, {} instances, {} contexts".format(
+                      label, elapsed, precise * 100, mean,
+                      stats["instances"], stats["contexts"]))
+
+
+if __name__ == "__main__":
+    main()
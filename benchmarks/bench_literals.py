@@ -0,0 +1,92 @@
+"""
+Benchmark large literal tables like those of generated config modules: a
+list and a tuple of constants, evaluated by the literal fast path and by
+evaluating every element as before it, timed and with the memory of the
+tuple type as traced by tracemalloc.
+
+    python benchmarks/bench_literals.py [--elements 100000]
+"""
+
+import argparse
+import ast
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from builtin_types import LIST_CLASS
+from inference import ModuleEnv
+from session import AnalysisSession
+from tuple_type import TUPLE_CLASS
+
+
+def generate_table(elements):
+    # Mostly ints, with a few runs of other constants like a real table
+    values = []
+    for i in range(elements):
+        if i % 1000 < 990:
+            values.append(str(i))
+        elif i % 1000 < 995:
+            values.append("'s{}'".format(i))
+        else:
+            values.append("{}.5".format(i))
+    return ", ".join(values)
+
+
+def eval_each_list(env, node):
+    return {LIST_CLASS.from_list(list(map(env.eval, node.elts)))}
+
+
+def eval_each_tuple(env, node):
+    return {TUPLE_CLASS.create_tuple(
+        init_contents=tuple(env.eval(n) for n in node.elts))}
+
+
+def measure(evaluate, env, node):
+    """
+    Returns:
+        tuple[float, int]: Seconds and bytes retained by the result.
+    """
+    start = time.perf_counter()
+    evaluate(env, node)
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    result = evaluate(env, node)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return elapsed, retained
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--elements", type=int, default=100000)
+    args = parser.parse_args()
+
+    table = generate_table(args.elements)
+    list_node = ast.parse("[{}]".format(table)).body[0].value
+    tuple_node = ast.parse("({},)".format(table)).body[0].value
+
+    session = AnalysisSession()
+    env = ModuleEnv(session=session)
+    with session.activate():
+        cases = [
+            ("list, each element", eval_each_list, list_node),
+            ("list, fast path", ModuleEnv.eval_list, list_node),
+            ("tuple, each element", eval_each_tuple, tuple_node),
+            ("tuple, fast path", ModuleEnv.eval_tuple, tuple_node),
+        ]
+        for label, evaluate, node in cases:
+            elapsed, retained = measure(evaluate, env, node)
+            print("{:<20} {} elements: {:.3f}s, retained {:.2f} MB".format(
+                label, args.elements, elapsed, retained / 2 ** 20))
+
+
+if __name__ == "__main__":
+    main()
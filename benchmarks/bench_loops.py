@@ -0,0 +1,98 @@
+"""
+Benchmark for loops over builtin containers: a generated module of functions
+looping over lists, tuples, strings and generators, analyzed with the
+balanced profile so loop bodies are interpreted more than once. Each run is
+timed with the element types of the builtin containers and again going
+through __iter__ and __next__ for every container, as before them.
+
+    python benchmarks/bench_loops.py [--functions 300] [--repeat 3]
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from builtin_types.list_type import ListType
+from builtin_types.str_type import StrType
+from generator_type import GeneratorType
+from inference import ModuleEnv
+from pytype import PyType
+from tuple_type import TupleType
+
+
+TEMPLATE = """
+def numbers_{i}():
+    yield {i}
+    yield {i}.5
+
+
+def walk_{i}(items, pairs, text):
+    total = 0
+    last = None
+    for item in items:
+        total = total + item
+        for a, b in pairs:
+            total = total + a
+            last = b
+        for ch in text:
+            last = ch
+        for n in numbers_{i}():
+            total = n
+    return total, last
+
+
+result_{i} = walk_{i}([1, 2, {i}], [(1, 'a'), ({i}, 'b')], 'text')
+"""
+
+
+def generate_module(functions):
+    return "".join(TEMPLATE.format(i=i) for i in range(functions))
+
+
+@contextlib.contextmanager
+def generic_iteration():
+    """Iterate over every builtin container through its magic methods."""
+    types = (ListType, TupleType, StrType, GeneratorType)
+    saved = [t.__dict__["element_types"] for t in types]
+    for t in types:
+        t.element_types = PyType.element_types
+    try:
+        yield
+    finally:
+        for t, method in zip(types, saved):
+            t.element_types = method
+
+
+def measure(code, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        env = ModuleEnv(profile="balanced")
+        env.parse_code(code)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--functions", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    code = generate_module(args.functions)
+    ModuleEnv().parse_code("x = 1")
+
+    with generic_iteration():
+        generic = measure(code, args.repeat)
+    direct = measure(code, args.repeat)
+    print("{} functions: __iter__ and __next__ {:.3f}s, element types {:.3f}s "
+          "({:.2f}x)".format(args.functions, generic, direct, generic / direct))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark the language server on a generated module of about 5000 lines:
+opening it, then typing into one function and hovering after each edit.
+
+    python benchmarks/bench_lsp.py [--lines 5000] [--edits 20]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from incremental import IncrementalModule
+from lsp_server import LanguageServer
+from summary_pack import types_descriptors
+
+
+URI = "file:///bench/generated.py"
+
+FUNCTION_TEMPLATE = """
+def func_{i}(a, b=1.0):
+    total = a * b
+    items = [a]
+    items.append(total)
+    for item in items:
+        total = total + item
+    return total
+
+result_{i} = func_{i}({i})
+"""
+
+
+def generate_module(lines):
+    parts = []
+    i = 0
+    while sum(p.count("\n") for p in parts) < lines:
+        parts.append(FUNCTION_TEMPLATE.format(i=i))
+        i += 1
+    return "".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=5000)
+    parser.add_argument("--edits", type=int, default=20)
+    args = parser.parse_args()
+
+    source = generate_module(args.lines)
+    print("{} lines".format(source.count("\n")))
+
+    server = LanguageServer(io.BytesIO())
+    server.handle({"id": 0, "method": "initialize", "params": {}})
+
+    start = time.perf_counter()
+    server.handle({"method": "textDocument/didOpen", "params": {
+        "textDocument": {"uri": URI, "text": source, "version": 0}}})
+    print("open: {:.1f}ms".format((time.perf_counter() - start) * 1000))
+    doc = server.documents()[URI]
+
+    # Type a new argument into the call at the end of the middle function
+    middle = source.count("\n") // 2
+    lines = source.splitlines()
+    line = next(i for i in range(middle, len(lines))
+                if lines[i].startswith("result_"))
+    col = len(lines[line]) - 1
+
+    edit_times = []
+    hover_times = []
+    for n in range(args.edits):
+        start = time.perf_counter()
+        server.handle({"method": "textDocument/didChange", "params": {
+            "textDocument": {"uri": URI, "version": n + 1},
+            "contentChanges": [{
+                "range": {"start": {"line": line, "character": col},
+                          "end": {"line": line, "character": col}},
+                "text": " * 2.5" if n % 2 == 0 else " + 1",
+            }]}})
+        edit_times.append(time.perf_counter() - start)
+        col += len(" * 2.5" if n % 2 == 0 else " + 1")
+
+        start = time.perf_counter()
+        server.handle({"id": n + 1, "method": "textDocument/hover", "params": {
+            "textDocument": {"uri": URI},
+            "position": {"line": line, "character": 1}}})
+        hover_times.append(time.perf_counter() - start)
+
+    edit_times.sort()
+    hover_times.sort()
+    print("edit: median {:.1f}ms, max {:.1f}ms, {} of {} statements reused".format(
+        edit_times[len(edit_times) // 2] * 1000, edit_times[-1] * 1000,
+        doc.module().reused_statements(),
+        doc.module().reused_statements() + doc.module().analyzed_statements()))
+    print("hover: median {:.3f}ms, max {:.3f}ms".format(
+        hover_times[len(hover_times) // 2] * 1000, hover_times[-1] * 1000))
+
+    start = time.perf_counter()
+    cold = IncrementalModule()
+    cold.update(doc.text())
+    print("cold analysis of the edited module: {:.1f}ms".format(
+        (time.perf_counter() - start) * 1000))
+
+    # Function types are only equal to themselves, so compare descriptions
+    assert cold.types().keys() == doc.module().types().keys()
+    for key, types in cold.types().items():
+        assert (types_descriptors(types) ==
+                types_descriptors(doc.module().types()[key])), key
+
+
+if __name__ == "__main__":
+    main()
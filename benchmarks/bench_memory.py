@@ -0,0 +1,72 @@
+"""
+Benchmark the memory of analyzing a generated module with and without
+evicting function environments, as traced by tracemalloc. The module is
+parsed before measuring so only the memory of the analysis is counted.
+
+    python benchmarks/bench_memory.py [--lines 5000] [--max-functions 8 64]
+"""
+
+import argparse
+import ast
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_lsp import generate_module
+from function_pool import FunctionEnvPool
+from inference import ModuleEnv
+from session import AnalysisSession
+
+
+def analyze(node, pool):
+    """
+    Returns:
+        tuple[float, int, int, dict]: Seconds, peak and retained traced
+            bytes, and the stats of the pool.
+    """
+    # Analyses before this one live in reference cycles
+    gc.collect()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+
+    session = AnalysisSession(function_pool=pool)
+    env = ModuleEnv(session=session)
+    env.parse_module(node)
+
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - base
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - base
+    return elapsed, peak, retained, session.function_pool().stats()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=5000)
+    parser.add_argument("--max-functions", type=int, nargs="*", default=[64, 8])
+    args = parser.parse_args()
+
+    node = ast.parse(generate_module(args.lines))
+    tracemalloc.start()
+    # Builtins and imports are loaded once and not part of any analysis
+    analyze(ast.parse(generate_module(10)), None)
+
+    print("{} lines".format(args.lines))
+    rows = [("unlimited", None)] + [
+        ("max {} functions".format(n), FunctionEnvPool(max_functions=n))
+        for n in args.max_functions]
+    for label, pool in rows:
+        elapsed, peak, retained, stats = analyze(node, pool)
+        print("{:<18} peak {:.2f} MB, retained {:.2f} MB, {:.2f}s, "
+              "{} evictions, {} rebuilds".format(
+                  label, peak / 2 ** 20, retained / 2 ** 20, elapsed,
+                  stats["evictions"], stats["rebuilds"]))
+
+
+if __name__ == "__main__":
+    main()
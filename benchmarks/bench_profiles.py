@@ -0,0 +1,111 @@
+"""
+Benchmark each analysis profile on the samples, on the generated object
+oriented module of bench_heap.py, and on a generated module of loops whose
+variables take the types of earlier iterations.
+
+Besides the runtime, each profile reports the share of module level bindings
+with exactly one type other than unknown, and its result delta: the share of
+module level bindings whose types differ from those found by the precise
+profile.
+
+    python benchmarks/bench_profiles.py [--groups 40]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_heap import generate_module as generate_oo_module
+from inference import ModuleEnv
+from profiles import PROFILES
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOOP_TEMPLATE = """
+def pick_{i}(current, item):
+    if current:
+        return item
+    return current
+
+
+def rotate_{i}(items):
+    first = {i}
+    second = None
+    third = None
+    for item in items:
+        third = pick_{i}(second, third)
+        second = pick_{i}(first, second)
+        first = item
+    return third
+
+
+def collect_{i}(items):
+    seen = []
+    for item in items:
+        pair = (pick_{i}(item, None), {i})
+        seen.append(pair)
+    return seen
+
+
+values_{i} = ['s{i}', {i}.5, True, None, ({i},), [{i}]]
+rotated_{i} = rotate_{i}(values_{i})
+collected_{i} = collect_{i}(values_{i})
+"""
+
+
+def generate_loop_module(groups):
+    return "".join(LOOP_TEMPLATE.format(i=i) for i in range(groups))
+
+
+def measure(code, profile):
+    """
+    Returns:
+        tuple[float, dict[str, tuple[str]]]: Seconds, and the types of every
+            module level binding by name.
+    """
+    start = time.perf_counter()
+    env = ModuleEnv(profile=profile)
+    types = {b.name: tuple(sorted(str(t) for t in b.types))
+             for b in env.iter_parse(code) if not b.scope}
+    return time.perf_counter() - start, types
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=int, default=40)
+    args = parser.parse_args()
+
+    corpora = [("generated oo", generate_oo_module(args.groups)),
+               ("generated loops", generate_loop_module(args.groups))]
+    corpora += [(os.path.basename(path), open(path).read())
+                for path in sorted(glob.glob(os.path.join(ROOT, "samples", "*.py")))]
+    names = ["fast", "balanced", "precise"]
+    measure("x = 1", PROFILES["fast"])
+
+    totals = {name: 0.0 for name in names}
+    for corpus, code in corpora:
+        print(corpus)
+        results = {name: measure(code, PROFILES[name]) for name in names}
+        reference = results["precise"][1]
+        for name in names:
+            elapsed, types = results[name]
+            totals[name] += elapsed
+            single = sum(1 for t in types.values() if len(t) == 1 and t != ("unknown",))
+            differ = sum(1 for k, t in types.items() if reference.get(k) != t)
+            print("  {:<9} {:.3f}s ({:.2f}x precise), {:5.1f}% single typed, "
+                  "{:5.1f}% differ from precise".format(
+                      name, elapsed, elapsed / results["precise"][0],
+                      100.0 * single / len(types), 100.0 * differ / len(types)))
+
+    print("total")
+    for name in names:
+        print("  {:<9} {:.3f}s".format(name, totals[name]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark whole project analysis with different numbers of worker processes
+on a generated project.
+
+    python benchmarks/bench_project.py [--modules 64] [--waves 4]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from project import ProjectAnalyzer
+
+
+MODULE_TEMPLATE = """
+{imports}
+
+BASE = {base}
+
+{functions}
+
+{calls}
+"""
+
+FUNCTION_TEMPLATE = """
+def func_{i}(a, b=1.0):
+    total = a
+    for x in (1, 2, 3):
+        total = total + x * b
+    if total < 100:
+        return total - 1
+    return total / 2
+"""
+
+
+def generate_project(root, n_modules, n_waves, n_functions):
+    per_wave = max(1, n_modules // n_waves)
+    for m in range(n_modules):
+        wave = m // per_wave
+        imports = ""
+        base = "1"
+        if wave > 0:
+            dep = (wave - 1) * per_wave + (m % per_wave)
+            imports = "import mod_{}".format(dep)
+            base = "mod_{}.BASE".format(dep)
+        functions = "\n".join(FUNCTION_TEMPLATE.format(i=i)
+                              for i in range(n_functions))
+        calls = "\n".join("r{i} = func_{i}(BASE)\nq{i} = func_{i}(2, 3.0)".format(i=i)
+                          for i in range(n_functions))
+        with open(os.path.join(root, "mod_{}.py".format(m)), "w") as f:
+            f.write(MODULE_TEMPLATE.format(imports=imports, base=base,
+                                           functions=functions, calls=calls))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules", type=int, default=64)
+    parser.add_argument("--waves", type=int, default=4)
+    parser.add_argument("--functions", type=int, default=60)
+    parser.add_argument("--workers", type=int, nargs="*", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        generate_project(root, args.modules, args.waves, args.functions)
+
+        baseline = None
+        reference = None
+        print("cpus: {}".format(os.cpu_count()))
+        for workers in args.workers:
+            start = time.perf_counter()
+            result = ProjectAnalyzer(root, workers=workers).analyze()
+            elapsed = time.perf_counter() - start
+
+            if baseline is None:
+                baseline = elapsed
+                reference = result.to_json()
+            assert result.to_json() == reference, "Results differ between worker counts"
+            print("workers={:<3} time={:.3f}s speedup={:.2f}x errors={}".format(
+                workers, elapsed, baseline / elapsed, len(result.errors())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark the peak RSS of analyzing large generated modules with and
+without releasing the bodies of functions from the AST.
+
+    python benchmarks/bench_release.py [--lines 5000 20000 50000]
+
+Every analysis runs in a fresh process so the peaks do not mix.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_lsp import generate_module
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(path, release):
+    """
+    Returns:
+        tuple[float, float]: Seconds and peak RSS in megabytes, as reported by
+            python -m analyze.
+    """
+    command = [sys.executable, "-m", "analyze", path, "-o", os.devnull]
+    if release:
+        command.append("--release-ast")
+    proc = subprocess.run(command, cwd=ROOT, stderr=subprocess.PIPE,
+                          universal_newlines=True, check=True)
+    match = re.search(r"in ([\d.]+)s.*peak RSS ([\d.]+) MB", proc.stderr)
+    return float(match.group(1)), float(match.group(2))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, nargs="*", default=[5000, 20000, 50000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for lines in args.lines:
+            path = os.path.join(tmpdir, "generated_{}.py".format(lines))
+            with open(path, "w") as f:
+                f.write(generate_module(lines))
+
+            kept_time, kept_rss = measure(path, False)
+            released_time, released_rss = measure(path, True)
+            print("{:>6} lines: peak RSS {:.1f} MB kept, {:.1f} MB released ({:+.0f}%), "
+                  "{:.2f}s / {:.2f}s".format(
+                      lines, kept_rss, released_rss,
+                      100.0 * (released_rss - kept_rss) / kept_rss,
+                      kept_time, released_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark the memory of the objects the analysis allocates most: the bytes
+traced by tracemalloc per object of each type, built the way the analysis
+builds them, and the memory retained after analyzing the samples and a
+generated module.
+
+    python benchmarks/bench_slots.py [--lines 5000] [--count 2000]
+"""
+
+import argparse
+import ast
+import gc
+import glob
+import os
+import sys
+import tracemalloc
+
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_lsp import generate_module
+from inference import Environment, ModuleEnv
+from builtin_types import INT_TYPE, LIST_CLASS
+from arguments import Arguments
+from class_type import ClassType
+from dict_type import DICT_CLASS
+from function_type import FunctionType
+from generator_type import GENERATOR_CLASS
+from pytype import PyType
+from session import AnalysisSession
+from tuple_type import TUPLE_CLASS
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FUNCTION_NODE = ast.parse("def f(a, b=1):\n    return a").body[0]
+
+
+def factories(module_env):
+    """
+    Returns:
+        list[tuple[str, Callable[[], object]]]
+    """
+    cls = ClassType("Point")
+    return [
+        ("Arguments", lambda: Arguments([{INT_TYPE}])),
+        ("TupleType", lambda: TUPLE_CLASS.create_tuple(init_contents=({INT_TYPE},))),
+        ("GeneratorType", lambda: GENERATOR_CLASS.instance(yields={INT_TYPE})),
+        ("DictPointer", lambda: DICT_CLASS.instance().new_container()),
+        ("ListType", lambda: LIST_CLASS.instance(init_contents={INT_TYPE})),
+        ("InstanceType", lambda: ClassType("Point").instance()),
+        ("ClassType", lambda: ClassType("Point")),
+        ("Environment", lambda: Environment("f", parent_env=module_env)),
+        ("FunctionType", lambda: FunctionType.from_node_and_env(FUNCTION_NODE, module_env)),
+    ]
+
+
+def bytes_per_object(factory, count):
+    objects = [None] * count
+    gc.collect()
+    base = tracemalloc.get_traced_memory()[0]
+    for i in range(count):
+        objects[i] = factory()
+    gc.collect()
+    return (tracemalloc.get_traced_memory()[0] - base) / count
+
+
+def analyze_corpus(lines):
+    """
+    Returns:
+        tuple[int, Counter]: Bytes retained by the analyses, and the number
+            of objects of each type they keep alive.
+    """
+    paths = sorted(glob.glob(os.path.join(ROOT, "samples", "*.py")))
+    codes = [open(path).read() for path in paths] + [generate_module(lines)]
+    nodes = [ast.parse(code) for code in codes]
+
+    gc.collect()
+    base = tracemalloc.get_traced_memory()[0]
+    envs = []
+    for node in nodes:
+        session = AnalysisSession()
+        env = ModuleEnv(session=session)
+        with session.activate():
+            env.parse_module(node)
+        envs.append(env)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - base
+
+    counts = Counter(type(obj).__name__ for obj in gc.get_objects()
+                     if isinstance(obj, (PyType, Environment, Arguments)))
+    return retained, counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=5000)
+    parser.add_argument("--count", type=int, default=2000)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    session = AnalysisSession()
+    with session.activate():
+        module_env = ModuleEnv(session=session)
+        for label, factory in factories(module_env):
+            factory()
+        for label, factory in factories(module_env):
+            print("{:<14} {:>7.1f} bytes".format(
+                label, bytes_per_object(factory, args.count)))
+
+    retained, counts = analyze_corpus(args.lines)
+    print("corpus retained {:.2f} MB".format(retained / 2 ** 20))
+    for name, count in counts.most_common(8):
+        print("  {:<22} {:>7} objects".format(name, count))
+
+
+if __name__ == "__main__":
+    main()
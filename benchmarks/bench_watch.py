@@ -0,0 +1,79 @@
+"""
+Benchmark the cost of polling an idle tree in watch mode, and how long an
+edit takes to be found.
+
+    python benchmarks/bench_watch.py [--files 50000] [--per-dir 50]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from watch import FileWatcher, DEFAULT_INTERVAL
+
+
+def generate_tree(root, n_files, per_dir):
+    for i in range(n_files):
+        dirpath = os.path.join(root, "pkg_{}".format(i // per_dir))
+        if i % per_dir == 0:
+            os.mkdir(dirpath)
+        with open(os.path.join(dirpath, "mod_{}.py".format(i)), "w") as f:
+            f.write("x = {}\n".format(i))
+
+
+def polls_until_found(watcher, max_polls=1000):
+    for polls in range(1, max_polls + 1):
+        if watcher.poll():
+            return polls
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--per-dir", type=int, default=50)
+    parser.add_argument("--polls", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        generate_tree(root, args.files, args.per_dir)
+
+        start = time.perf_counter()
+        watcher = FileWatcher([root])
+        print("files={} dirs={} scan={:.3f}s".format(
+            len(watcher.files()), len(watcher.dirs()),
+            time.perf_counter() - start))
+
+        cpu = time.process_time()
+        start = time.perf_counter()
+        for _ in range(args.polls):
+            watcher.poll()
+        per_poll = (time.perf_counter() - start) / args.polls
+        cpu_per_poll = (time.process_time() - cpu) / args.polls
+        print("idle poll={:.1f}ms cpu={:.1f}ms ({:.1f}% of one cpu at a {}s interval)".format(
+            per_poll * 1000, cpu_per_poll * 1000,
+            100 * cpu_per_poll / DEFAULT_INTERVAL, DEFAULT_INTERVAL))
+
+        # A new file and a file saved through a rename change their directory
+        path = os.path.join(root, "pkg_0", "new.py")
+        with open(path, "w") as f:
+            f.write("y = 1\n")
+        print("new file found after {} poll(s)".format(polls_until_found(watcher)))
+
+        # A file written in place is found by the sweep, then stays hot
+        path = os.path.join(root, "pkg_7", "mod_{}.py".format(7 * args.per_dir))
+        with open(path, "w") as f:
+            f.write("x = 2.5\n")
+        print("in place edit found after {} poll(s)".format(polls_until_found(watcher)))
+        with open(path, "w") as f:
+            f.write("x = 'again'\n")
+        print("second in place edit found after {} poll(s)".format(
+            polls_until_found(watcher)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Budgets that bound how long an analysis runs.
+
+Every node the environments evaluate or parse is charged to the session's
+BudgetMeter. A function call is charged the nodes of its own body and the
+wall time since it started, and the whole analysis (one module per session)
+is charged every node and the wall time since its first node.
+
+A function that runs over its budget returns unknown instead, as does every
+later call to it, and is reported by exhausted_functions(). Once the module
+budget runs out, every function that is running or called later returns
+unknown, so only the straight line code of the module is still interpreted.
+"""
+
+import contextlib
+import time
+
+
+# Wall time is only checked every so many nodes since it is slower to get
+# than counting
+TIME_CHECK_INTERVAL = 64
+
+NODES = "nodes"
+TIME = "time"
+MODULE_NODES = "module nodes"
+MODULE_TIME = "module time"
+
+
+class Budget:
+    def __init__(self, function_nodes=None, function_seconds=None,
+                 module_nodes=None, module_seconds=None):
+        """
+        Args:
+            function_nodes (Optional[int]): Nodes one call may evaluate in
+                the body of the called function, excluding the functions it
+                calls.
+            function_seconds (Optional[float]): Wall time of one call,
+                including the functions it calls.
+            module_nodes (Optional[int]): Nodes evaluated in the whole
+                analysis.
+            module_seconds (Optional[float]): Wall time of the whole analysis.
+
+        None is unlimited.
+        """
+        self.__function_nodes = function_nodes
+        self.__function_seconds = function_seconds
+        self.__module_nodes = module_nodes
+        self.__module_seconds = module_seconds
+
+    def function_nodes(self):
+        return self.__function_nodes
+
+    def function_seconds(self):
+        return self.__function_seconds
+
+    def module_nodes(self):
+        return self.__module_nodes
+
+    def module_seconds(self):
+        return self.__module_seconds
+
+    def unlimited(self):
+        return (self.__function_nodes is None and self.__function_seconds is None
+                and self.__module_nodes is None and self.__module_seconds is None)
+
+
+UNLIMITED = Budget()
+
+
+class BudgetExceeded(RuntimeError):
+    def __init__(self, reason):
+        """
+        Args:
+            reason (str): One of NODES, TIME, MODULE_NODES or MODULE_TIME.
+        """
+        super().__init__("Analysis budget exceeded: {}".format(reason))
+        self.__reason = reason
+
+    def reason(self):
+        return self.__reason
+
+
+class BudgetMeter:
+    def __init__(self, budget=None):
+        """
+        Args:
+            budget (Optional[Budget]): Defaults to unlimited.
+        """
+        self.__budget = budget or UNLIMITED
+        self.__limited = not self.__budget.unlimited()
+        self.__nodes = 0
+        self.__start = None  # Optional[float]
+        self.__module_exhausted = None  # Optional[str]
+
+        # [nodes, start] of every running call, innermost last
+        self.__frames = []  # list[list]
+        self.__exhausted = {}  # dict[function_type.FunctionType, str]
+
+    def budget(self):
+        return self.__budget
+
+    def limited(self):
+        """
+        Returns:
+            bool: Whether the budget has any limit. Environments do not
+                charge unlimited meters at all.
+        """
+        return self.__limited
+
+    def nodes(self):
+        return self.__nodes
+
+    def module_exhausted(self):
+        """
+        Returns:
+            Optional[str]: Why the module budget ran out, if it did.
+        """
+        return self.__module_exhausted
+
+    def exhausted_functions(self):
+        """
+        Returns:
+            dict[function_type.FunctionType, str]: Functions that returned
+                unknown because a budget ran out, and the reason.
+        """
+        return self.__exhausted
+
+    def exhausted(self, func):
+        """
+        Returns:
+            Optional[str]: Why a function returns unknown, or None if its
+                body can still be interpreted.
+        """
+        return self.__exhausted.get(func) or self.__module_exhausted
+
+    def charge(self, nodes=1):
+        """
+        Count nodes, one by default.
+
+        Raises:
+            BudgetExceeded: The innermost running call or the module ran out
+                of budget.
+        """
+        before = self.__nodes
+        self.__nodes += nodes
+        if not self.__limited:
+            return
+
+        budget = self.__budget
+        checking_time = before // TIME_CHECK_INTERVAL != self.__nodes // TIME_CHECK_INTERVAL
+        if self.__start is None:
+            self.__start = time.perf_counter()
+
+        if self.__module_exhausted is None:
+            if budget.module_nodes() is not None and self.__nodes > budget.module_nodes():
+                self.__module_exhausted = MODULE_NODES
+            elif (checking_time and budget.module_seconds() is not None and
+                  time.perf_counter() - self.__start > budget.module_seconds()):
+                self.__module_exhausted = MODULE_TIME
+
+        if not self.__frames:
+            return
+        frame = self.__frames[-1]
+        frame[0] += nodes
+
+        if self.__module_exhausted is not None:
+            raise BudgetExceeded(self.__module_exhausted)
+        if budget.function_nodes() is not None and frame[0] > budget.function_nodes():
+            raise BudgetExceeded(NODES)
+        if (checking_time and budget.function_seconds() is not None and
+                time.perf_counter() - frame[1] > budget.function_seconds()):
+            raise BudgetExceeded(TIME)
+
+    @contextlib.contextmanager
+    def function(self, func):
+        """
+        Charge the nodes evaluated in the body of a function to its own call.
+
+        Raises:
+            BudgetExceeded: The call ran out of budget. The function is marked
+                as exhausted first.
+        """
+        self.__frames.append([0, time.perf_counter()])
+        try:
+            yield
+        except BudgetExceeded as e:
+            self.__exhausted[func] = e.reason()
+            raise
+        finally:
+            self.__frames.pop()
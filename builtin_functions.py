@@ -0,0 +1,36 @@
+from function_type import BuiltinFunction
+from builtin_types import NONE_TYPE, FILE_TYPE, BOOL_TYPE, STR_TYPE
+
+
+class PrintFunction(BuiltinFunction):
+    def __init__(self):
+        super().__init__(
+            "print",
+            vararg="objects",
+            kwonlyargs=["sep", "end", "file", "flush"],
+            kwonly_defaults=[
+                {STR_TYPE},
+                {STR_TYPE},
+                {FILE_TYPE},
+                {BOOL_TYPE},
+            ]
+        )
+
+    def call(self, args):
+        return {NONE_TYPE}
+
+
+class InputFunction(BuiltinFunction):
+    def __init__(self):
+        super().__init__(
+            "input",
+            keywords=["prompt"],
+            keyword_defaults=[{STR_TYPE}],
+        )
+
+    def call(self, args):
+        return {STR_TYPE}
+
+
+PRINT_FUNCTION = PrintFunction()
+INPUT_FUNCTION = InputFunction()
@@ -1,7 +1,6 @@
 from instance_type import InstanceType
 from class_type import ClassType
-from pytype import PyType
-from arguments import empty_args
+from pytype import PyType, mutated
 from generator_type import GENERATOR_CLASS
 from builtin_types import *
 from magic_methods import *
@@ -16,6 +15,8 @@ LIST_NAME = "list"
 
 
 class ListType(InstanceType):
+    __slots__ = ("__contents",)
+
     def __init__(self, init_contents=None, *args, **kwargs):
         """
         Args:
@@ -28,11 +29,15 @@ class ListType(InstanceType):
 
     def append(self, item):
         assert isinstance(item, PyType)
-        self.__contents.add(item)
+        if item not in self.__contents:
+            self.__contents.add(item)
+            mutated()
 
     def extend(self, iterable_t):
-        for iter_t in iterable_t.call_iter(empty_args()):
-            self.__contents |= iter_t.call_next(empty_args())
+        items = iterable_t.element_types()
+        if not items <= self.__contents:
+            self.__contents |= items
+            mutated()
 
     def contents(self):
         """
@@ -41,6 +46,9 @@ class ListType(InstanceType):
         """
         return self.__contents
 
+    def element_types(self):
+        return self.__contents
+
     def __hash__(self):
         return hash(self.name())
 
@@ -1,4 +1,5 @@
 from class_type import ClassType
+from instance_type import InstanceType
 from function_type import BuiltinFunction
 from magic_methods import *
 from generator_type import GENERATOR_CLASS
@@ -63,6 +64,14 @@ class StrIAddMethod(IAddMethod):
         return self.env().lookup("self")
 
 
+class StrType(InstanceType):
+    __slots__ = ()
+
+    def element_types(self):
+        # Iterating over a string yields strings
+        return {self}
+
+
 class StrClass(ClassType):
     def __init__(self):
         super().__init__(
@@ -79,6 +88,9 @@ class StrClass(ClassType):
 
         self.set_builtin_method(StrStripMethod({self}))
 
+    def create_instance(self, *args, **kwargs):
+        return StrType(self.defined_name(), parents=[self], *args, **kwargs)
+
 
 STR_CLASS = StrClass()
 STR_TYPE = STR_CLASS.instance()
@@ -2,6 +2,8 @@ import pytype
 
 
 class ClassType(pytype.PyType):
+    __slots__ = ("__inst", "__defined_name")
+
     def __init__(self, defined_name=None, init_methods=None, inst=None, *args, **kwargs):
         from function_type import FunctionType
         super().__init__("type", *args, **kwargs)
@@ -37,16 +39,35 @@ class ClassType(pytype.PyType):
         return self.__defined_name
 
     def call(self, args):
-        self.instance().call_init(args)
-        return {self.instance()}
+        from session import current_session
+        inst = current_session().heap().instance(self)
+        inst.call_init(args)
+        return {inst}
 
     def instance(self, *args, **kwargs):
         """Getter for getting the instance this class produces without calling init."""
         if self.__inst is None:
-            from instance_type import InstanceType
-            self.__inst = InstanceType(self.defined_name(), parents=[self], *args, **kwargs)
+            self.__inst = self.create_instance(*args, **kwargs)
+            if self.is_frozen():
+                self.__inst.freeze()
         return self.__inst
 
+    def create_instance(self, *args, **kwargs):
+        """
+        Returns:
+            instance_type.InstanceType: A new instance of this class, of a
+                subclass of InstanceType for classes whose instances
+                behave differently.
+        """
+        from instance_type import InstanceType
+        return InstanceType(self.defined_name(), parents=[self], *args, **kwargs)
+
+    def freeze(self, frozen=None):
+        frozen = set() if frozen is None else frozen
+        super().freeze(frozen)
+        if self.__inst is not None:
+            self.__inst.freeze(frozen)
+
     def set_builtin_method(self, method):
         from function_type import FunctionType
         assert isinstance(method, FunctionType)
@@ -62,6 +83,8 @@ class ClassType(pytype.PyType):
 
 
 class InstanceWrapperClass(ClassType):
+    __slots__ = ()
+
     def call(self, args):
         raise NotImplementedError("Instance wrapper must return the custom instance each time")
 
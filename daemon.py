@@ -0,0 +1,384 @@
+"""
+Warm analysis daemon.
+
+Starting the interpreter, importing the analyzer and building the builtin
+types takes much longer than analyzing a single file. The daemon does that
+once, then forks a worker for every request so each analysis starts from the
+same warm state and shares its memory with the daemon until it writes to it.
+
+Requests and responses are single json lines over a Unix domain socket:
+
+    {"op": "analyze", "path": "samples/fib.py", "cwd": "/home/me/project",
+     "options": {"profile": "fast"}}
+    {"path": "samples/fib.py", "records": [...], "error": null}
+
+    {"op": "ping"}      -> {"ok": true}
+    {"op": "shutdown"}  -> {"ok": true}
+
+Usage:
+
+    python -m daemon serve [--socket PATH] [--idle-timeout 600]
+    python -m daemon analyze samples/fib.py [--socket PATH] [--profile fast]
+
+The options of a request are the analysis options of python -m analyze, with
+the same defaults for those left out. The analyze command takes the same
+options, writes the same json lines as python -m analyze, and analyzes in its
+own process if no daemon is listening.
+
+The socket is in $XDG_RUNTIME_DIR, or else in a directory of the temporary
+directory that only the user can access, so other users can neither connect
+to the daemon nor listen in its place. A daemon does not start while another
+one answers on its socket.
+"""
+
+import argparse
+import json
+import os
+import select
+import socket
+import stat
+import sys
+import tempfile
+
+
+SOCKET_NAME = "python-type-inference.sock"
+DEFAULT_IDLE_TIMEOUT = 600.0
+CLIENT_TIMEOUT = 60.0
+# Seconds a running daemon has to answer before another one starts
+PING_TIMEOUT = 5.0
+
+
+def default_socket():
+    """
+    Returns:
+        str: The socket in the runtime directory of the user, or in a
+            directory of the temporary directory created for the user.
+
+    Raises:
+        RuntimeError: The directory in the temporary directory belongs to
+            another user or other users can access it.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, SOCKET_NAME)
+
+    directory = os.path.join(tempfile.gettempdir(),
+                             "python-type-inference-{}".format(os.getuid()))
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(directory)
+    if (not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or
+            info.st_mode & 0o077):
+        raise RuntimeError(
+            "{} is not a directory only this user can access".format(directory))
+    return os.path.join(directory, SOCKET_NAME)
+
+
+"""
+Protocol
+"""
+
+
+def send_message(sock, message):
+    sock.sendall(json.dumps(message, sort_keys=True).encode("utf-8") + b"\n")
+
+
+def recv_message(sock):
+    """
+    Returns:
+        Optional[dict]: None if the connection closed before a full line.
+    """
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = sock.recv(65536)
+        if not chunk:
+            return None
+        data += chunk
+    return json.loads(data.decode("utf-8"))
+
+
+"""
+Server
+"""
+
+
+def warm_up():
+    """
+    Do everything that does not depend on the analyzed file before the first
+    fork, so workers inherit it.
+    """
+    from analyze import analyze_file, analysis_kwargs
+    import pytype
+    import summary_pack
+
+    pytype.load_builtin_vars()
+    summary_pack.pack_summaries()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".py") as f:
+        f.write("def f(x):\n    return x + 1\ny = f(1)\n")
+        f.flush()
+        analyze_file(f.name, **analysis_kwargs({}))
+
+
+def handle_request(request):
+    """
+    Answer a single analyze request. This runs in the forked worker.
+
+    Returns:
+        dict
+    """
+    from analyze import analyze_file, analysis_kwargs
+
+    cwd = request.get("cwd")
+    if cwd:
+        os.chdir(cwd)
+    kwargs = analysis_kwargs(request.get("options") or {})
+    path, records, error = analyze_file(request["path"], **kwargs)
+    return {"path": path, "records": records, "error": error}
+
+
+class Daemon:
+    def __init__(self, socket_path=None, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        """
+        Args:
+            socket_path (Optional[str]): Defaults to default_socket().
+            idle_timeout (float): Seconds without a request after which the
+                daemon exits.
+        """
+        self.__socket_path = socket_path or default_socket()
+        self.__idle_timeout = idle_timeout
+        self.__workers = set()  # set[int]
+        self.__served = 0
+
+    def served(self):
+        return self.__served
+
+    def serve(self):
+        """
+        Serve until shut down or idle for too long.
+
+        Raises:
+            RuntimeError: Another daemon answers on the socket, or something
+                other than a socket is at its path.
+        """
+        self.__remove_stale_socket()
+        warm_up()
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.__socket_path)
+        server.listen(64)
+
+        try:
+            while True:
+                readable, _, _ = select.select(
+                    [server], [], [], self.__idle_timeout)
+                self.__reap()
+                if not readable:
+                    break
+
+                conn, _ = server.accept()
+                if not self.__dispatch(conn):
+                    break
+        finally:
+            server.close()
+            if os.path.exists(self.__socket_path):
+                os.unlink(self.__socket_path)
+            while self.__workers:
+                self.__reap(block=True)
+
+    def __remove_stale_socket(self):
+        """Remove the socket of a daemon that is no longer running."""
+        try:
+            info = os.lstat(self.__socket_path)
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(info.st_mode):
+            raise RuntimeError("{} is not a socket".format(self.__socket_path))
+        try:
+            request({"op": "ping"}, socket_path=self.__socket_path,
+                    timeout=PING_TIMEOUT)
+        except (FileNotFoundError, ConnectionRefusedError):
+            os.unlink(self.__socket_path)
+            return
+        except OSError:
+            pass
+        raise RuntimeError("A daemon is already listening on {}".format(
+            self.__socket_path))
+
+    def __dispatch(self, conn):
+        """
+        Returns:
+            bool: False if the daemon should shut down.
+        """
+        with conn:
+            conn.settimeout(CLIENT_TIMEOUT)
+            try:
+                request = recv_message(conn)
+            except (OSError, ValueError):
+                return True
+            if request is None:
+                return True
+
+            op = request.get("op")
+            if op in ("ping", "shutdown"):
+                send_message(conn, {"ok": True})
+                return op == "ping"
+            if op != "analyze" or "path" not in request:
+                send_message(conn, {"error": "Unknown request"})
+                return True
+
+            self.__served += 1
+            pid = os.fork()
+            if pid == 0:
+                self.__work(conn, request)
+            self.__workers.add(pid)
+            return True
+
+    def __work(self, conn, request):
+        """Answer a request in the forked worker and exit."""
+        status = 0
+        try:
+            send_message(conn, handle_request(request))
+        except BaseException:
+            status = 1
+        finally:
+            os._exit(status)
+
+    def __reap(self, block=False):
+        for pid in list(self.__workers):
+            done, _ = os.waitpid(pid, 0 if block else os.WNOHANG)
+            if done:
+                self.__workers.discard(pid)
+
+
+"""
+Client
+"""
+
+
+def request(message, socket_path=None, timeout=CLIENT_TIMEOUT):
+    """
+    Send one request to a running daemon, on default_socket() unless a
+    socket path is given.
+
+    Returns:
+        dict
+
+    Raises:
+        OSError: No daemon is listening on the socket.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or default_socket())
+        send_message(sock, message)
+        response = recv_message(sock)
+    if response is None:
+        raise ConnectionError("The daemon closed the connection")
+    return response
+
+
+def analyze(path, socket_path=None, options=None,
+            timeout=CLIENT_TIMEOUT):
+    """
+    Analyze a file in the daemon, or in this process if no daemon is
+    running.
+
+    Args:
+        path (str)
+        socket_path (Optional[str]): Defaults to default_socket().
+        options (Optional[dict[str, Any]]): Values of
+            analyze.ANALYSIS_OPTIONS, the defaults of python -m analyze for
+            those left out.
+        timeout (float): Seconds to wait for the daemon.
+
+    Returns:
+        tuple[str, list[dict], Optional[str]]: The same as
+            analyze.analyze_file().
+
+    Raises:
+        OSError: The daemon did not answer in time, or failed otherwise
+            than by not running.
+    """
+    options = options or {}
+    try:
+        response = request({"op": "analyze", "path": path, "cwd": os.getcwd(),
+                            "options": options},
+                           socket_path=socket_path, timeout=timeout)
+    except (FileNotFoundError, ConnectionRefusedError):
+        from analyze import analyze_file, analysis_kwargs
+        return analyze_file(path, **analysis_kwargs(options))
+    return response["path"], response["records"], response["error"]
+
+
+def create_parser():
+    from analyze import add_analysis_arguments
+
+    parser = argparse.ArgumentParser(
+        prog="python -m daemon",
+        description="Keep a warm analyzer running for fast per file analysis.")
+    parser.add_argument("--socket",
+                        help="Unix socket the daemon listens on. Defaults to "
+                             "one in $XDG_RUNTIME_DIR or in a private "
+                             "directory of the temporary directory.")
+    commands = parser.add_subparsers(dest="command")
+
+    serve_parser = commands.add_parser("serve", help="Run the daemon.")
+    serve_parser.add_argument(
+        "--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT,
+        help="Seconds without requests before the daemon exits.")
+
+    analyze_parser = commands.add_parser(
+        "analyze", help="Analyze files with the daemon if it is running.")
+    analyze_parser.add_argument("paths", nargs="+")
+    add_analysis_arguments(analyze_parser)
+
+    commands.add_parser("stop", help="Stop a running daemon.")
+    return parser
+
+
+def main(argv=None):
+    from analyze import (EXIT_OK, EXIT_ANALYSIS_ERROR, EXIT_USAGE,
+                         analysis_options, write_record)
+
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    try:
+        socket_path = args.socket or default_socket()
+    except RuntimeError as e:
+        sys.stderr.write("{}\n".format(e))
+        return EXIT_USAGE
+
+    if args.command == "serve":
+        try:
+            Daemon(socket_path, idle_timeout=args.idle_timeout).serve()
+        except RuntimeError as e:
+            sys.stderr.write("{}\n".format(e))
+            return EXIT_USAGE
+        return EXIT_OK
+    elif args.command == "stop":
+        try:
+            request({"op": "shutdown"}, socket_path=socket_path)
+        except OSError:
+            sys.stderr.write("No daemon is running.\n")
+        return EXIT_OK
+    elif args.command == "analyze":
+        failed = 0
+        options = analysis_options(args)
+        for path in args.paths:
+            path, records, error = analyze(path, socket_path=socket_path,
+                                           options=options)
+            for record in records:
+                write_record(sys.stdout, record)
+            if error is not None:
+                failed += 1
+                write_record(sys.stdout, {"module": path, "error": error})
+        return EXIT_ANALYSIS_ERROR if failed else EXIT_OK
+
+    parser.print_usage(sys.stderr)
+    return EXIT_USAGE
+
+
+if __name__ == "__main__":
+    sys.exit(main())
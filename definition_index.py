@@ -0,0 +1,199 @@
+import ast
+
+
+class TopLevelStatement:
+    """
+    Summary of a statement in the body of a module, found without
+    interpreting it.
+    """
+    def __init__(self, index, node, defines=None, uses=None):
+        """
+        Args:
+            index (int): Position of the statement in the module body.
+            node (ast.stmt)
+            defines (Optional[set[str]]): Names the statement binds if
+                already known.
+            uses (Optional[set[str]]): Names the statement reads if already
+                known.
+        """
+        self.__index = index
+        self.__node = node
+        self.__span = (node.lineno, getattr(node, "end_lineno", None) or node.lineno)
+        self.__defines = defined_names(node) if defines is None else defines
+        self.__uses = used_names(node) if uses is None else uses
+
+    def index(self):
+        return self.__index
+
+    def node(self):
+        """
+        Returns:
+            Optional[ast.stmt]: None once released.
+        """
+        return self.__node
+
+    def release_node(self):
+        """Drop the node and only keep what was found from it."""
+        self.__node = None
+
+    def span(self):
+        """
+        Returns:
+            tuple[int, int]: The first and last line of the statement.
+        """
+        return self.__span
+
+    def defines(self):
+        """
+        Returns:
+            set[str]: Names this statement may bind in the module.
+        """
+        return self.__defines
+
+    def uses(self):
+        """
+        Returns:
+            set[str]: Names this statement may read, including names read in
+                the bodies of functions and classes it defines.
+        """
+        return self.__uses
+
+
+def defined_names(node):
+    """
+    Names bound by a statement at the scope the statement is in. Bodies of
+    functions and classes are not searched since they have their own scope.
+    """
+    names = set()
+    if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+        names.add(node.name)
+        return names
+    elif isinstance(node, ast.Import):
+        for alias in node.names:
+            names.add(alias.asname or alias.name)
+        return names
+    elif isinstance(node, ast.ImportFrom):
+        for alias in node.names:
+            names.add(alias.asname or alias.name)
+        return names
+    elif isinstance(node, ast.ExceptHandler) and node.name:
+        names.add(node.name)
+    elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+        names.add(node.id)
+
+    for child in ast.iter_child_nodes(node):
+        names |= defined_names(child)
+    return names
+
+
+def used_names(node):
+    return {n.id for n in ast.walk(node)
+            if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load)}
+
+
+class DefinitionIndex:
+    """
+    Index of the top level statements of a module by the names they define.
+    """
+    def __init__(self, module_node, statements=None):
+        """
+        Args:
+            module_node (ast.Module)
+            statements (Optional[list[TopLevelStatement]]): Summaries of the
+                statements in the module body if already made.
+        """
+        if statements is None:
+            statements = [TopLevelStatement(i, node)
+                          for i, node in enumerate(module_node.body)]
+        self.__statements = statements
+        self.__definitions = {}  # dict[str, list[TopLevelStatement]]
+        self.__users = {}  # dict[str, list[TopLevelStatement]]
+        for stmt in self.__statements:
+            for name in stmt.defines():
+                self.__definitions.setdefault(name, []).append(stmt)
+            for name in stmt.uses():
+                self.__users.setdefault(name, []).append(stmt)
+
+    def statements(self):
+        return self.__statements
+
+    def names(self):
+        return self.__definitions.keys()
+
+    def definitions(self, name):
+        """
+        Returns:
+            list[TopLevelStatement]: Statements that bind this name in order.
+        """
+        return self.__definitions.get(name, [])
+
+    def users(self, name):
+        """
+        Returns:
+            list[TopLevelStatement]: Statements that read this name in order.
+        """
+        return self.__users.get(name, [])
+
+    def dependency_slice(self, names):
+        """
+        Find the statements that need to be interpreted to know the types of
+        the given names. These are the statements that bind them, the
+        statements that only act on them (like x.append(1)), and recursively
+        the same for every name those statements read.
+
+        Args:
+            names (Iterable[str])
+
+        Returns:
+            list[TopLevelStatement]: In the order they appear in the module.
+        """
+        found = {}
+        pending = list(names)
+        seen = set()
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+
+            stmts = list(self.definitions(name))
+            stmts += [s for s in self.users(name) if not s.defines()]
+            for stmt in stmts:
+                if stmt.index() not in found:
+                    found[stmt.index()] = stmt
+                    pending.extend(stmt.uses())
+
+        return [found[i] for i in sorted(found)]
+
+    def reachable_names(self, names):
+        """
+        Names that may be read or bound when the given names are used,
+        following the statements that define them. Using a function for
+        example may read every name its body reads.
+
+        Returns:
+            set[str]
+        """
+        reached = set()
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            if name in reached:
+                continue
+            reached.add(name)
+            for stmt in self.definitions(name):
+                pending.extend(stmt.uses() - reached)
+        return reached
+
+    def last_uses(self):
+        """
+        Returns:
+            dict[str, int]: For each name, the index of the last statement
+                that may read or bind it, directly or through the definitions
+                it reaches. No statement after that can change its types.
+        """
+        last = {}
+        for stmt in self.__statements:
+            for name in self.reachable_names(stmt.defines() | stmt.uses()):
+                last[name] = stmt.index()
+        return last
@@ -3,6 +3,8 @@ import class_type
 
 
 class DictType(pytype.PyType):
+    __slots__ = ("__key_types", "__value_types")
+
     def __init__(self, key_types=None, value_types=None):
         """
         Args:
@@ -26,10 +28,18 @@ class DictType(pytype.PyType):
         return self.__value_types
 
     def add_keys(self, keys):
-        self.__key_types |= keys
+        if not keys <= self.__key_types:
+            self.__key_types |= keys
+            pytype.mutated()
 
     def add_values(self, values):
-        self.__value_types |= values
+        if not values <= self.__value_types:
+            self.__value_types |= values
+            pytype.mutated()
+
+    def element_types(self):
+        # Iterating over a dict yields its keys
+        return self.__key_types
 
     def merge_dict(self, dict_type):
         self.add_keys(dict_type.key_types())
@@ -56,6 +66,8 @@ class DictType(pytype.PyType):
 
 
 class DictPointer(DictType):
+    __slots__ = ("__original",)
+
     def __init__(self, original, **kwargs):
         super().__init__(**kwargs)
         self.__original = original
@@ -68,6 +80,8 @@ class DictPointer(DictType):
 
 
 class DictClass(class_type.ClassType):
+    __slots__ = ("__dict",)
+
     def __init__(self):
         super().__init__("dict")
         self.__dict = DictType()
@@ -75,6 +89,11 @@ class DictClass(class_type.ClassType):
     def instance(self):
         return self.__dict
 
+    def freeze(self, frozen=None):
+        frozen = set() if frozen is None else frozen
+        super().freeze(frozen)
+        self.__dict.freeze(frozen)
+
     def call(self, args=None):
         """
         Arguments can be nothing, **kwargs, a dict and **kwargs, or an iterable and
@@ -0,0 +1,140 @@
+"""
+Memo of evaluated expressions.
+
+The same expression is often evaluated several times while its inputs stay
+the same: the middle operands of comparison chains, loop bodies interpreted
+more than once, and the bodies of functions called again with arguments of
+types they were already called with. The memo keeps the result of each
+operation node in a side table next to the versions of the variables it
+read, and returns it while those versions stay the same.
+
+Environments give a variable a new version whenever its types change, so
+the versions say whether the names of an expression still have the same
+types. That is all the result depends on if those types are frozen builtin
+types, whose magic methods always return the same types and change nothing,
+so only such results are kept. Operations on other types call methods whose
+return types may grow and which may change their arguments. Expressions
+with calls, attributes or subscripts are never kept.
+"""
+
+import ast
+import weakref
+
+from type_set import type_set
+
+
+# Operations whose results are kept
+MEMOIZED_NODES = (ast.BinOp, ast.Compare)
+
+# Nodes the operands of a kept operation may be made of
+PURE_NODES = MEMOIZED_NODES + (ast.Name, ast.Constant, ast.UnaryOp,
+                               ast.operator, ast.cmpop, ast.unaryop,
+                               ast.expr_context)
+
+# An operation that is not kept
+_UNMEMOIZABLE = object()
+
+
+class EvalMemo:
+    def __init__(self, enabled=True):
+        """
+        Args:
+            enabled (bool): Evaluate every expression every time when False,
+                for debugging.
+        """
+        self.__enabled = enabled
+        # The entry of each operation, found with a single lookup on every
+        # evaluation. Nodes are weakly referenced so released function
+        # bodies can be collected.
+        self.__entries = weakref.WeakKeyDictionary()  # dict[ast.expr, list[names, key, TypeSet]]
+        self.__hits = 0
+        self.__misses = 0
+        self.__stores = 0
+
+    def enabled(self):
+        return self.__enabled
+
+    def stats(self):
+        """
+        Returns:
+            dict[str, float]: Lookups that found a result, lookups that did
+                not, results kept, and the share of lookups that found one.
+        """
+        lookups = self.__hits + self.__misses
+        return {
+            "hits": self.__hits,
+            "misses": self.__misses,
+            "stores": self.__stores,
+            "hit_rate": self.__hits / lookups if lookups else 0.0,
+        }
+
+    def entry(self, node):
+        """
+        The entry of an operation holds the names it reads and its last kept
+        result. The names are found once per node, and an operation reuses
+        the names of the operations it is made of instead of walking them
+        again.
+
+        Args:
+            node (ast.expr): One of MEMOIZED_NODES.
+
+        Returns:
+            Optional[list[tuple[str], Optional[tuple[Optional[int]]], Optional[TypeSet]]]:
+                The names, key and result of the node, or None if it has
+                nodes other than PURE_NODES and is never kept.
+        """
+        entry = self.__entries.get(node)
+        if entry is None:
+            names = set()
+            entry = [tuple(names), None, None] if self.__read_names(node, names) else _UNMEMOIZABLE
+            self.__entries[node] = entry
+        return None if entry is _UNMEMOIZABLE else entry
+
+    def __read_names(self, node, names):
+        """
+        Add the names read by the operands of a node.
+
+        Returns:
+            bool: False if an operand is not one of PURE_NODES.
+        """
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, MEMOIZED_NODES):
+                entry = self.entry(child)
+                if entry is None:
+                    return False
+                names.update(entry[0])
+            elif isinstance(child, ast.Name):
+                names.add(child.id)
+            elif not isinstance(child, PURE_NODES) or not self.__read_names(child, names):
+                return False
+        return True
+
+    def lookup(self, entry, key):
+        """
+        Args:
+            entry (list): The entry of a node.
+            key (tuple[Optional[int]]): The versions of the variables the
+                names of the node refer to, in the order of its names.
+
+        Returns:
+            Optional[TypeSet]: The result kept for the node if it was
+                evaluated with the same versions. It is shared, not copied.
+        """
+        if entry[2] is not None and entry[1] == key:
+            self.__hits += 1
+            return entry[2]
+        self.__misses += 1
+        return None
+
+    def store(self, entry, key, types):
+        """
+        Keep the result of an operation whose names only had frozen types.
+
+        Args:
+            entry (list)
+            key (tuple[Optional[int]])
+            types (set[pytype.PyType])
+        """
+        entry[1] = key
+        entry[2] = type_set(types)
+        self.__stores += 1
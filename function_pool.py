@@ -0,0 +1,137 @@
+"""
+Bounded memory for the environments of functions.
+
+Every function keeps an environment with the types of all its variables for
+as long as the analysis runs. With a limit on the number of resident
+environments or on the memory traced by tracemalloc, the environments of the
+least recently called functions are evicted: the function only keeps the
+types of its arguments, returns, yields and raises, which is all a later
+call needs. The environment is rebuilt when the function is called again or
+its variables are read, by interpreting its body with the kept argument
+types. Like any later call, that can bind more types than the environment
+had before it was evicted if the functions it calls were called with more
+types in the meantime.
+
+Functions that are running are never evicted.
+"""
+
+import contextlib
+import tracemalloc
+
+from collections import Counter, OrderedDict
+
+
+# Reading the traced memory after every call would be wasteful
+BYTES_CHECK_INTERVAL = 32
+
+
+class FunctionEnvPool:
+    def __init__(self, max_functions=None, max_bytes=None,
+                 check_interval=BYTES_CHECK_INTERVAL):
+        """
+        Args:
+            max_functions (Optional[int]): Number of function environments
+                kept at once.
+            max_bytes (Optional[int]): Memory traced by tracemalloc above
+                which environments are evicted. Tracing is started if it is
+                not already. The limit should leave room for what the
+                analysis needs besides function environments.
+            check_interval (int): Calls between reads of the traced memory.
+
+        Without either limit nothing is evicted.
+        """
+        self.__max_functions = max_functions
+        self.__max_bytes = max_bytes
+        self.__check_interval = check_interval
+        self.__limited = max_functions is not None or max_bytes is not None
+        if max_bytes is not None and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        self.__resident = OrderedDict()  # OrderedDict[FunctionType, None]
+        self.__running = Counter()  # Counter[FunctionType]
+        self.__touches = 0
+        self.__evictions = 0
+        self.__rebuilds = 0
+
+    def limited(self):
+        return self.__limited
+
+    def resident(self):
+        """
+        Returns:
+            list[function_type.FunctionType]: Functions with an environment,
+                least recently used first.
+        """
+        return list(self.__resident)
+
+    def stats(self):
+        """
+        Returns:
+            dict[str, int]: Counts of evictions and rebuilds, the number of
+                resident environments, and the current and peak traced memory
+                in bytes if tracemalloc is tracing.
+        """
+        stats = {
+            "evictions": self.__evictions,
+            "rebuilds": self.__rebuilds,
+            "resident": len(self.__resident),
+        }
+        if tracemalloc.is_tracing():
+            stats["traced_bytes"], stats["peak_traced_bytes"] = \
+                tracemalloc.get_traced_memory()
+        return stats
+
+    @contextlib.contextmanager
+    def running(self, func):
+        """
+        Mark a function as the most recently used and keep its environment
+        while it runs.
+        """
+        if not self.__limited or func.ref_node() is None:
+            yield
+            return
+
+        self.__resident.pop(func, None)
+        self.__resident[func] = None
+        self.__running[func] += 1
+        try:
+            self.__trim()
+            yield
+        finally:
+            self.__running[func] -= 1
+            if not self.__running[func]:
+                del self.__running[func]
+
+    def rebuilt(self, func):
+        self.__rebuilds += 1
+        if self.__limited:
+            self.__resident[func] = None
+
+    def __over_limit(self):
+        if self.__max_functions is not None and \
+                len(self.__resident) > self.__max_functions:
+            return True
+        if self.__max_bytes is not None and \
+                self.__touches % self.__check_interval == 0:
+            return tracemalloc.get_traced_memory()[0] > self.__max_bytes
+        return False
+
+    def __trim(self):
+        self.__touches += 1
+        if not self.__over_limit():
+            return
+
+        for func in list(self.__resident):
+            if func in self.__running:
+                continue
+            del self.__resident[func]
+            func.evict()
+            self.__evictions += 1
+
+            if self.__max_functions is not None and \
+                    len(self.__resident) > self.__max_functions:
+                continue
+            if self.__max_bytes is not None and \
+                    tracemalloc.get_traced_memory()[0] > self.__max_bytes:
+                continue
+            break
@@ -1,11 +1,19 @@
 import ast
 import pytype
 
+from type_set import TYPE_SETS
+
 
 class FunctionType(pytype.PyType):
     """
     Type that can contain code to be executed.
     """
+    __slots__ = (
+        "__ref_node", "__defined_name", "__env", "__parent_env", "__summary",
+        "__pos_args", "__keywords", "__vararg", "__kwonlyargs", "__kwarg",
+        "__keyword_defaults", "__kwonly_defaults", "__origin", "__session",
+    )
+
     def __init__(self, env, node, *args, pos_args=None, keywords=None,
                  vararg=None, kwonlyargs=None, kwarg=None,
                  keyword_defaults=None, kwonly_defaults=None,
@@ -29,6 +37,7 @@ class FunctionType(pytype.PyType):
                 If the function is created dynamically at runtime, this may be None.
         """
         from inference import Environment
+        from session import current_session
         super().__init__("function", *args, **kwargs)
         self.__ref_node = node
 
@@ -39,25 +48,36 @@ class FunctionType(pytype.PyType):
         else:
             self.__defined_name = None
         self.__env = env or Environment(self.__defined_name)
+        self.__parent_env = self.__env.parent()
+
+        self.__origin = None
+
+        # Evicted environments are rebuilt in the session the function was
+        # created in, whatever session is current when they are read.
+        # Builtin functions are shared by every session and never evicted.
+        self.__session = current_session() if node is not None else None
 
-        self.__pos_args = pos_args or []
-        self.__keywords = keywords or []
+        # Types kept while the environment is evicted
+        self.__summary = None  # Optional[tuple[dict[str, set[PyType]], set, set, set]]
+
+        # Most functions have no keywords, so the empty ones share a tuple
+        self.__pos_args = pos_args or ()
+        self.__keywords = keywords or ()
         self.__vararg = vararg
-        self.__kwonlyargs = kwonlyargs or []
+        self.__kwonlyargs = kwonlyargs or ()
         self.__kwarg = kwarg
 
-        self.__keyword_defaults = keyword_defaults or []
-        self.__kwonly_defaults = kwonly_defaults or []
-        self.__owner = None
+        self.__keyword_defaults = keyword_defaults or ()
+        self.__kwonly_defaults = kwonly_defaults or ()
 
         # Type checks
         assert len(self.__keywords) == len(self.__keyword_defaults)
         assert len(self.__kwonlyargs) == len(self.__kwonly_defaults)
 
-        assert all(isinstance(x, set) for x in self.__keyword_defaults)
+        assert all(isinstance(x, TYPE_SETS) for x in self.__keyword_defaults)
         for default in self.__keyword_defaults:
             assert all(isinstance(x, pytype.PyType) for x in default)
-        assert all(isinstance(x, set) for x in self.__kwonly_defaults)
+        assert all(isinstance(x, TYPE_SETS) for x in self.__kwonly_defaults)
         for default in self.__kwonly_defaults:
             assert all(isinstance(x, pytype.PyType) for x in default)
 
@@ -145,9 +165,22 @@ and {} variable keyword argument were left unhandled.
         Returns:
             set[PyType] x3: Return types and yielded types.
         """
+        from budget import BudgetExceeded
         from builtin_types import NONE_TYPE
+        from released_ast import function_body
+        from session import current_session
+        from unknown_type import UNKNOWN_TYPE
+
+        meter = current_session().budget_meter()
+        if meter.exhausted(self):
+            return {UNKNOWN_TYPE}
+        try:
+            with meter.function(self), self.env().running_function(self.__ref_node):
+                self.env().parse_sequence(function_body(self.__ref_node))
+        except BudgetExceeded:
+            # The function is flagged by the meter
+            return {UNKNOWN_TYPE}
 
-        self.env().parse_sequence(self.__ref_node.body)
         returns = self.env().returns()
         yields = self.env().yields()
 
@@ -167,9 +200,7 @@ and {} variable keyword argument were left unhandled.
         The args passed to this method are adjusted to include self as the
         first positional argument if called by an instance.
         """
-        print(self.env().variables())
         self.update_env(args)
-        print(self.env().variables())
         return self.returns()
 
     def call(self, args):
@@ -177,19 +208,149 @@ and {} variable keyword argument were left unhandled.
         Call this function, update its environment based on the arguments,
         and return possible return types of this function.
         """
-        print(args)
-        if self.is_bound_method():
-            args.prepend_owner(self.owner())
+        from session import current_session
+
+        if self.__env is None:
+            # The call interprets the body anyway
+            self.__restore(interpret=False)
+
+        with current_session().function_pool().running(self):
+            if self.is_bound_method():
+                args.prepend_owner(self.owner())
 
-        results = self.adjusted_call(args)
+            results = self.adjusted_call(args)
 
-        if self.is_bound_method():
-            self.unbind_method()
+            if self.is_bound_method():
+                self.unbind_method()
+            self.__merge_into_origin()
         return results
 
     def env(self):
+        if self.__env is None:
+            self.__restore(interpret=True)
         return self.__env
 
+    """
+    Contexts
+    """
+
+    def context(self):
+        """
+        Returns:
+            FunctionType: A copy of this function with an environment of its
+                own, so calls to it do not share argument types with calls to
+                this one.
+        """
+        from inference import Environment
+
+        env = Environment(self.__ref_node.name, parent_env=self.__parent_env)
+        for name in self.argument_names():
+            env.bind(name, set())
+        for name, default in zip(self.__keywords, self.__keyword_defaults):
+            env.bind(name, default)
+        for name, default in zip(self.__kwonlyargs, self.__kwonly_defaults):
+            env.bind(name, default)
+
+        context = type(self)(env, self.__ref_node,
+                             pos_args=self.__pos_args,
+                             keywords=self.__keywords,
+                             vararg=self.__vararg,
+                             kwonlyargs=self.__kwonlyargs,
+                             kwarg=self.__kwarg,
+                             keyword_defaults=self.__keyword_defaults,
+                             kwonly_defaults=self.__kwonly_defaults)
+        context.__origin = self
+        return context
+
+    def session(self):
+        """
+        Returns:
+            Optional[session.AnalysisSession]: The session this function
+                was created in, or None for builtin functions.
+        """
+        return self.__session
+
+    def origin(self):
+        """
+        Returns:
+            Optional[FunctionType]: The function this is a context of.
+        """
+        return self.__origin
+
+    def __merge_into_origin(self):
+        """
+        Add the types of this context to the function it is a context of.
+        This is for reporting only, so an evicted origin is skipped since
+        rebuilding it would interpret its body with self bound to every
+        instance.
+        """
+        origin = self.__origin
+        if origin is None or origin.evicted():
+            return
+        env = self.env()
+        origin_env = origin.env()
+        for name, types in env.variables().items():
+            origin_env.bind(name, types)
+        origin_env.returns().update(env.returns())
+        origin_env.yields().update(env.yields())
+        origin_env.raises().update(env.raises())
+
+    """
+    Eviction
+    """
+
+    def argument_names(self):
+        names = list(self.__pos_args) + list(self.__keywords) + list(self.__kwonlyargs)
+        for name in (self.__vararg, self.__kwarg):
+            if name:
+                names.append(name)
+        return names
+
+    def evicted(self):
+        return self.__env is None
+
+    def evict(self):
+        """
+        Drop the environment of this function and only keep the types a
+        later call needs. Only functions defined in the analyzed code can be
+        evicted.
+        """
+        if self.__ref_node is None or self.__env is None:
+            return
+        env = self.__env
+        variables = env.variables()
+        arguments = {name: set(variables[name]) for name in self.argument_names()
+                     if name in variables}
+        self.__summary = (arguments, set(env.returns()), set(env.yields()),
+                          set(env.raises()))
+        self.__env = None
+
+    def __restore(self, interpret):
+        """
+        Create the environment of an evicted function again.
+
+        Args:
+            interpret (bool): Interpret the body to bind the other variables.
+        """
+        from inference import Environment
+
+        with self.__session.activate():
+            arguments, returns, yields, raises = self.__summary
+            env = Environment(self.__ref_node.name, parent_env=self.__parent_env)
+            for name, types in arguments.items():
+                env.bind(name, types)
+            env.returns().update(returns)
+            env.yields().update(yields)
+            env.raises().update(raises)
+            self.__env = env
+            self.__summary = None
+
+            pool = self.__session.function_pool()
+            pool.rebuilt(self)
+            if interpret:
+                with pool.running(self):
+                    self.returns()
+
     @classmethod
     def from_node_and_env(cls, node, parent_env):
         """
@@ -258,25 +419,53 @@ and {} variable keyword argument were left unhandled.
     def ref_node(self):
         return self.__ref_node
 
+    """
+    The owner of a bound method is kept in the current session since the same
+    function can be bound to different instances in different analyses.
+    """
+
     def bind_method(self, owner):
         from instance_type import InstanceType
+        from session import current_session
         assert isinstance(owner, InstanceType)
-        self.__owner = owner
+        current_session().bind_method(self, owner)
 
     def unbind_method(self):
-        self.__owner = None
+        from session import current_session
+        current_session().unbind_method(self)
 
     def is_bound_method(self):
-        return self.__owner is not None
+        return self.owner() is not None
 
     def owner(self):
-        return self.__owner
+        from session import current_session
+        return current_session().method_owner(self)
 
 
 class BuiltinFunction(FunctionType):
+    __slots__ = ()
+
     def __init__(self, defined_name, *args, **kwargs):
         super().__init__(None, None, *args, defined_name=defined_name, **kwargs)
 
+    def env(self):
+        """
+        Builtin functions are shared by every analysis, so the arguments of
+        each call are bound in a new environment held by the session for the
+        duration of the call.
+        """
+        from session import current_session
+        return current_session().builtin_call_env(self) or super().env()
+
+    def adjusted_call(self, args):
+        from inference import Environment
+        from session import current_session
+
+        env = Environment(self.defined_name())
+        with current_session().builtin_call(self, env):
+            self.update_env(args)
+            return self.returns()
+
     def returns(self):
         raise NotImplementedError
 
@@ -7,6 +7,8 @@ GENERATOR_NAME = "generator"
 
 
 class GeneratorType(InstanceType):
+    __slots__ = ("__yields", "__returns")
+
     def __init__(self, yields=None, returns=None, *args, **kwargs):
         super().__init__("generator", *args, **kwargs)
 
@@ -19,6 +21,9 @@ class GeneratorType(InstanceType):
     def returns(self):
         return self.__returns
 
+    def element_types(self):
+        return self.__yields
+
     def __hash__(self):
         return hash(self.name())
 
@@ -38,6 +43,8 @@ class GeneratorType(InstanceType):
 
 
 class GeneratorClass(ClassType):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(
             defined_name=GENERATOR_NAME,
@@ -0,0 +1,205 @@
+"""
+Heap abstractions.
+
+An abstract instance stands for the objects created by calling a class. The
+heap of a session decides how many of them a class gets:
+
+- ClassHeap: One instance per class for every allocation. This is the
+  cheapest and least precise, and the default.
+- AllocationSiteHeap: One instance per call node that creates it, so
+  a = Box(1) and b = Box('a') keep the types of their attributes apart.
+- CallerContextHeap: One instance per allocation site and the k call sites
+  that led to it, so objects created by the same factory function for
+  different callers are also kept apart. Functions are interpreted in a
+  context of their own for each k call sites too, otherwise the arguments of
+  every caller would still meet in the factory.
+
+Separate instances would be merged again if their methods ran in one
+environment, where self holds every instance the method was called on. With
+a heap other than ClassHeap, the methods of a class defined in the analyzed
+code are interpreted in a context of their own for each instance. The
+variables of every context are merged into the function for reporting.
+
+Builtin classes are frozen and shared by every session, so they keep one
+instance whatever the heap.
+"""
+
+import contextlib
+
+from instance_type import InstanceType
+
+
+class SiteInstanceType(InstanceType):
+    """Instance of a class for the allocations that share a key."""
+    __slots__ = ("__key",)
+
+    def __init__(self, cls, key):
+        """
+        Args:
+            cls (class_type.ClassType)
+            key (Hashable)
+        """
+        super().__init__(cls.defined_name(), parents=[cls])
+        self.__key = key
+
+    def allocation_key(self):
+        return self.__key
+
+
+class ClassHeap:
+    def __init__(self):
+        self.__call_sites = []  # list[ast.Call]
+        self.__instances = {}  # dict[tuple[ClassType, Hashable], SiteInstanceType]
+        self.__contexts = {}  # dict[tuple[FunctionType, InstanceType], FunctionType]
+        self.__context_functions = set()  # set[FunctionType]
+
+    def allocation_key(self, call_sites):
+        """
+        Args:
+            call_sites (list[ast.Call]): The calls being evaluated, innermost
+                last. The last one is the call that allocates.
+
+        Returns:
+            Optional[Hashable]: Allocations with the same key share an
+                instance. None for the one instance of the class.
+        """
+        return None
+
+    def tracks_call_sites(self):
+        return False
+
+    def call_sites(self):
+        return self.__call_sites
+
+    def stats(self):
+        """
+        Returns:
+            dict[str, int]: Instances created besides the one of each class,
+                and contexts methods were interpreted in.
+        """
+        return {
+            "instances": len(self.__instances),
+            "contexts": len(self.__contexts),
+        }
+
+    @contextlib.contextmanager
+    def call_site(self, node):
+        """Evaluate a call from a call node."""
+        if not self.tracks_call_sites():
+            yield
+            return
+
+        self.__call_sites.append(node)
+        try:
+            yield
+        finally:
+            self.__call_sites.pop()
+
+    def instance(self, cls):
+        """
+        Returns:
+            instance_type.InstanceType: The instance allocated by calling a
+                class at the current call site.
+        """
+        key = None if cls.is_frozen() else self.allocation_key(self.__call_sites)
+        if key is None:
+            return cls.instance()
+
+        inst = self.__instances.get((cls, key))
+        if inst is None:
+            inst = SiteInstanceType(cls, key)
+            self.__instances[(cls, key)] = inst
+        return inst
+
+    def context(self, func, key):
+        """
+        Returns:
+            function_type.FunctionType: The context of a function for a key,
+                or the function itself if it is already a context or is not
+                defined in the analyzed code.
+        """
+        if func.ref_node() is None or func in self.__context_functions:
+            return func
+
+        context = self.__contexts.get((func, key))
+        if context is None:
+            context = func.context()
+            self.__contexts[(func, key)] = context
+            self.__context_functions.add(context)
+        return context
+
+    def method_context(self, func, owner):
+        """
+        Returns:
+            function_type.FunctionType: The function a method bound to an
+                instance is interpreted in.
+        """
+        if not isinstance(owner, SiteInstanceType):
+            return func
+        return self.context(func, owner)
+
+    def call_context(self, func):
+        """
+        Returns:
+            pytype.PyType: What a type called at the current call site is
+                interpreted as.
+        """
+        return func
+
+
+class AllocationSiteHeap(ClassHeap):
+    def allocation_key(self, call_sites):
+        return call_sites[-1] if call_sites else None
+
+    def tracks_call_sites(self):
+        return True
+
+
+class CallerContextHeap(ClassHeap):
+    def __init__(self, depth=1):
+        """
+        Args:
+            depth (int): Call sites before the allocation site in the key.
+        """
+        super().__init__()
+        self.__depth = depth
+
+    def depth(self):
+        return self.__depth
+
+    def allocation_key(self, call_sites):
+        return tuple(call_sites[-self.__depth - 1:]) if call_sites else None
+
+    def tracks_call_sites(self):
+        return True
+
+    def call_context(self, func):
+        from function_type import FunctionType
+
+        # Bound methods already have a context for their instance
+        if not isinstance(func, FunctionType) or func.is_bound_method():
+            return func
+        return self.context(func, tuple(self.call_sites()[-self.__depth:]))
+
+
+HEAP_POLICIES = {
+    "class": ClassHeap,
+    "site": AllocationSiteHeap,
+    "context": CallerContextHeap,
+}
+
+
+def create_heap(policy="class", depth=1):
+    """
+    Args:
+        policy (str): A key of HEAP_POLICIES.
+        depth (int): Caller call sites kept by the context policy.
+
+    Returns:
+        ClassHeap
+    """
+    if policy not in HEAP_POLICIES:
+        raise RuntimeError("Unknown heap policy '{}'".format(policy))
+    if policy == "context":
+        return CallerContextHeap(depth)
+    return HEAP_POLICIES[policy]()
@@ -0,0 +1,511 @@
+"""
+Incremental analysis of a module that is edited over time.
+
+The top level statements of a module are split into independent components:
+two statements are in the same component if one binds or reads a module name
+the other binds or reads, or if both import the same module. Types only flow
+between statements through those names, so each component can be
+interpreted on its own and gives the same types as interpreting the whole
+module.
+
+The names a statement reads are the ones the module environment saw it look
+up the last time it was interpreted, including lookups from the bodies of
+the functions it defines wherever they were called from. Until a statement
+was interpreted, or if a function it defines never ran to the end, every
+name in its source counts instead.
+
+After an edit, a component keeps its results if an earlier component
+contained all of its statements and no other statement of that earlier
+component touched its names. Only the remaining components are interpreted
+again, which covers every statement depending on a changed one.
+"""
+
+import ast
+
+from collections import Counter
+
+from definition_index import DefinitionIndex, TopLevelStatement
+
+
+def statement_key(lines, node):
+    """
+    Key of a top level statement that does not change when the statement
+    only moves. The source of the statement is cheaper to get than dumping
+    its tree.
+
+    Args:
+        lines (list[str]): Lines of the module.
+        node (ast.stmt)
+
+    Returns:
+        tuple[str, int, int]
+    """
+    first = min([node.lineno] + [d.lineno for d in
+                                 getattr(node, "decorator_list", [])])
+    text = "".join(lines[first - 1:node.end_lineno])
+    # Statements can share a line
+    return text, node.col_offset, node.end_col_offset
+
+
+def imported_modules(node):
+    """
+    Returns:
+        set[str]: Names of the modules a statement imports.
+    """
+    if isinstance(node, ast.Import):
+        return {alias.name for alias in node.names}
+    elif isinstance(node, ast.ImportFrom):
+        return {"." * node.level + (node.module or "")}
+    return set()
+
+
+def link_names(stmt, module_names, reads=None):
+    """
+    Names that connect a statement to the other statements in its component.
+
+    Args:
+        stmt (definition_index.TopLevelStatement)
+        module_names (set[str]): Names bound somewhere in the module. Reading
+            only a builtin does not connect statements.
+        reads (Optional[set[str]]): Names the statement was seen reading.
+            Defaults to every name it uses.
+
+    Returns:
+        set[str]
+    """
+    used = stmt.uses() if reads is None else reads
+    names = stmt.defines() | (used & module_names)
+    # Imported modules are shared by every statement importing them
+    names |= {"import:" + name for name in imported_modules(stmt.node())}
+    return names
+
+
+def components(index, link=link_names):
+    """
+    Group the statements of a module into independent components.
+
+    Args:
+        index (definition_index.DefinitionIndex)
+        link (Callable): Takes a statement and the names bound in the module
+            and returns the names connecting the statement to others.
+
+    Returns:
+        list[list[definition_index.TopLevelStatement]]: Statements of each
+            component are in module order. Components are ordered by their
+            first statement.
+    """
+    statements = index.statements()
+    module_names = set(index.names())
+    parent = list(range(len(statements)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner = {}  # dict[str, int]
+    for stmt in statements:
+        for name in link(stmt, module_names):
+            if name in owner:
+                root, other = find(stmt.index()), find(owner[name])
+                if root != other:
+                    parent[max(root, other)] = min(root, other)
+            else:
+                owner[name] = stmt.index()
+
+    groups = {}
+    for stmt in statements:
+        groups.setdefault(find(stmt.index()), []).append(stmt)
+    return [groups[root] for root in sorted(groups)]
+
+
+def top_level_name(scope, name):
+    """The module name a (scope, name) binding belongs to."""
+    return scope.split(".")[0] if scope else name
+
+
+class ComponentResult:
+    """
+    Types found by interpreting one component, and what each of its
+    statements read.
+    """
+    def __init__(self, key, types, errors, reads, links):
+        """
+        Args:
+            key (tuple): Keys of the statements of the component in order.
+            types (dict[tuple[str, str], set[pytype.PyType]]): Types of each
+                (scope, name).
+            errors (list[tuple[tuple, str]]): Key and error message of the
+                statements that could not be interpreted.
+            reads (dict[tuple, Optional[set[str]]]): Names each statement was
+                seen reading, or None if some of its code did not run.
+            links (dict[tuple, set[str]]): Names each statement bound or
+                read while the component was interpreted.
+        """
+        self.__key = key
+        self.__types = types
+        self.__errors = errors
+        self.__reads = reads
+        self.__links = links
+
+    def key(self):
+        return self.__key
+
+    def types(self):
+        return self.__types
+
+    def types_of(self, names):
+        """
+        Returns:
+            dict[tuple[str, str], set[pytype.PyType]]: Types of the bindings
+                that belong to the given module names.
+        """
+        return {(scope, name): types
+                for (scope, name), types in self.__types.items()
+                if top_level_name(scope, name) in names}
+
+    def errors(self):
+        return self.__errors
+
+    def reads(self):
+        return self.__reads
+
+    def links(self):
+        return self.__links
+
+
+def analyze_component(key, stmts, links, module_location=None, session=None):
+    """
+    Interpret the statements of a component in a new module environment and
+    session, so nothing is shared with the previous results of the
+    component.
+
+    Args:
+        key (tuple)
+        stmts (list[definition_index.TopLevelStatement])
+        links (dict[tuple, set[str]]): Names connecting each statement.
+        module_location (Optional[str])
+        session (Optional[session.AnalysisSession]): A new session to
+            interpret them in. Defaults to one without options.
+
+    Returns:
+        ComponentResult
+    """
+    from inference import ModuleEnv, scope_bindings
+    from session import AnalysisSession
+
+    env = ModuleEnv(module_location=module_location,
+                    session=session or AnalysisSession())
+    errors = []
+    failed = set()
+    with env.session().activate():
+        for stmt_key, stmt in zip(key, stmts):
+            try:
+                env.parse(stmt.node())
+            except Exception as e:
+                errors.append((stmt_key, "{}: {}".format(type(e).__name__, e)))
+                failed.add(stmt_key)
+
+        types = {}
+        for scope, name, var_types, _ in scope_bindings(env):
+            types.setdefault((scope, name), set()).update(var_types)
+
+    # What each statement touched in this run is known exactly once all of
+    # its code ran
+    completed = env.completed_functions()
+    reads = {}
+    touched = dict(links)
+    for stmt_key, stmt in zip(key, stmts):
+        functions = [n for n in ast.walk(stmt.node())
+                     if isinstance(n, ast.FunctionDef)]
+        if stmt_key in failed or not all(f in completed for f in functions):
+            reads[stmt_key] = None
+        else:
+            reads[stmt_key] = env.statement_reads(stmt.node())
+            touched[stmt_key] = (link_names(stmt, set()) |
+                                 reads[stmt_key])
+
+    return ComponentResult(key, types, errors, reads, touched)
+
+
+class IncrementalModule:
+    """
+    Analysis results of one module that are updated after every edit.
+    """
+    def __init__(self, module_location=None, profile=None, max_functions=None,
+                 max_bytes=None, memoize=True):
+        """
+        Args:
+            module_location (Optional[str]): Used to find modules next to
+                this one.
+            profile (Optional[profiles.Profile])
+            max_functions (Optional[int])
+            max_bytes (Optional[int])
+            memoize (bool): The same as for analyze.analyze_file(). Budgets
+                apply to each component analyzed.
+        """
+        self.__module_location = module_location
+        self.__profile = profile
+        self.__max_functions = max_functions
+        self.__max_bytes = max_bytes
+        self.__memoize = memoize
+        self.__results = []  # list[ComponentResult]
+        self.__names = {}  # dict[tuple, tuple[set[str], set[str]]]
+        self.__reads = {}  # dict[tuple, Optional[set[str]]]
+        self.__types = {}  # dict[tuple[str, str], set[pytype.PyType]]
+        self.__errors = []  # list[tuple[int, str]]
+        self.__node = None
+        self.__analyzed = 0
+        self.__reused = 0
+
+    def update(self, source):
+        """
+        Analyze a new version of the module, reusing the results of the
+        components that did not change.
+
+        Raises:
+            SyntaxError: The previous results are kept.
+        """
+        node = ast.parse(source)
+        lines = source.splitlines(True)
+
+        # Only find the names of new statements
+        keys = []
+        names = {}
+        statements = []
+        for i, stmt_node in enumerate(node.body):
+            key = statement_key(lines, stmt_node)
+            keys.append(key)
+            if key in self.__names:
+                names[key] = self.__names[key]
+                stmt = TopLevelStatement(i, stmt_node, *names[key])
+            else:
+                stmt = TopLevelStatement(i, stmt_node)
+                names[key] = (stmt.defines(), stmt.uses())
+            statements.append(stmt)
+        index = DefinitionIndex(node, statements=statements)
+
+        links = {}  # dict[int, set[str]]
+
+        def link(stmt, module_names):
+            links[stmt.index()] = link_names(
+                stmt, module_names, self.__reads.get(keys[stmt.index()]))
+            return links[stmt.index()]
+
+        containing = {}  # dict[tuple, ComponentResult]
+        for result in self.__results:
+            for key in result.key():
+                containing[key] = result
+
+        results = []
+        types = {}
+        errors = []
+        reads = {}
+        self.__analyzed = self.__reused = 0
+        for stmts in components(index, link):
+            key = tuple(keys[stmt.index()] for stmt in stmts)
+            stmt_links = {keys[stmt.index()]: links[stmt.index()]
+                          for stmt in stmts}
+
+            result = self.__reusable(key, stmt_links, containing)
+            if result is None:
+                result = analyze_component(
+                    key, stmts, stmt_links,
+                    module_location=self.__module_location,
+                    session=self.__create_session())
+                self.__analyzed += len(stmts)
+            else:
+                self.__reused += len(stmts)
+            results.append(result)
+
+            defined = set()
+            for stmt in stmts:
+                defined |= stmt.defines()
+            types.update(result.types_of(defined))
+
+            lines_of = {}
+            for stmt_key, stmt in zip(key, stmts):
+                lines_of.setdefault(stmt_key, stmt.span()[0])
+                reads[stmt_key] = result.reads()[stmt_key]
+            errors += [(lines_of[stmt_key], message)
+                       for stmt_key, message in result.errors()
+                       if stmt_key in lines_of]
+
+        self.__node = node
+        self.__names = names
+        self.__reads = reads
+        self.__results = results
+        self.__types = types
+        self.__errors = sorted(errors)
+
+    def __create_session(self):
+        from function_pool import FunctionEnvPool
+        from profiles import DEFAULT_PROFILE
+
+        pool = FunctionEnvPool(max_functions=self.__max_functions,
+                               max_bytes=self.__max_bytes)
+        return (self.__profile or DEFAULT_PROFILE).create_session(
+            function_pool=pool, memoize=self.__memoize)
+
+    def __reusable(self, key, links, containing):
+        """
+        Find an earlier result that still holds for a component. The earlier
+        component must contain every statement of this one, and its other
+        statements must not have touched any name this one touches.
+
+        Returns:
+            Optional[ComponentResult]
+        """
+        result = containing.get(key[0])
+        if result is None:
+            return None
+        if result.key() == key:
+            return result
+
+        others = Counter(result.key())
+        needed = Counter(key)
+        if any(count > others[stmt_key] for stmt_key, count in needed.items()):
+            return None
+        others.subtract(needed)
+
+        touched = set()
+        for names in links.values():
+            touched |= names
+        for stmt_key, count in others.items():
+            if count > 0 and result.links()[stmt_key] & touched:
+                return None
+        return result
+
+    def node(self):
+        """
+        Returns:
+            Optional[ast.Module]: The last version of the module that was
+                analyzed.
+        """
+        return self.__node
+
+    def types(self):
+        """
+        Returns:
+            dict[tuple[str, str], set[pytype.PyType]]: Types of each
+                (scope, name) where the scope is dot separated.
+        """
+        return self.__types
+
+    def lookup(self, scope, name):
+        """
+        Find the types of a name as seen from a scope, searching the
+        enclosing scopes if the name is not bound in it.
+
+        Returns:
+            Optional[set[pytype.PyType]]
+        """
+        parts = scope.split(".") if scope else []
+        while True:
+            key = (".".join(parts), name)
+            if key in self.__types:
+                return self.__types[key]
+            if not parts:
+                return None
+            parts.pop()
+
+    def errors(self):
+        return self.__errors
+
+    def analyzed_statements(self):
+        """Number of statements interpreted by the last update."""
+        return self.__analyzed
+
+    def reused_statements(self):
+        """Number of statements whose results were kept by the last update."""
+        return self.__reused
+
+
+"""
+Differential checking against a cold analysis
+"""
+
+
+def describe_type(t, depth=3):
+    """
+    Describe a type including the contents of containers, so two analyses
+    can be compared without the types being the same objects.
+
+    Returns:
+        str
+    """
+    from summary_pack import type_descriptor
+
+    descriptor = type_descriptor(t)
+    contents = getattr(t, "contents", None)
+    if contents is None or depth == 0:
+        return descriptor
+
+    contents = contents()
+    if isinstance(contents, set):
+        return "{}[{}]".format(descriptor, describe_types(contents, depth - 1))
+    return "{}({})".format(
+        descriptor,
+        ", ".join("[{}]".format(describe_types(types, depth - 1))
+                  for types in contents))
+
+
+def describe_types(types, depth=3):
+    return " | ".join(sorted({describe_type(t, depth) for t in types}))
+
+
+def cold_types(source, module_location=None, session=None):
+    """
+    Interpret a whole module at once, in a new session unless one is given.
+
+    Returns:
+        dict[tuple[str, str], set[pytype.PyType]]
+
+    Raises:
+        Exception: Any error that stops the interpretation.
+    """
+    from inference import ModuleEnv, scope_bindings
+    from session import AnalysisSession
+
+    env = ModuleEnv(module_location=module_location,
+                    session=session or AnalysisSession())
+    env.parse_code(source)
+    types = {}
+    with env.session().activate():
+        for scope, name, var_types, _ in scope_bindings(env):
+            types.setdefault((scope, name), set()).update(var_types)
+    return types
+
+
+def differential_check(versions, module_location=None):
+    """
+    Update an IncrementalModule with each version of a module in turn and
+    compare its types with interpreting that version from scratch. Versions
+    the cold analysis cannot interpret are skipped.
+
+    Args:
+        versions (Iterable[str]): Sources of the module.
+        module_location (Optional[str])
+
+    Returns:
+        list[tuple[int, tuple[str, str], str, str]]: For every difference,
+            the index of the version, the (scope, name), the cold types and
+            the incremental types. Empty if both agree.
+    """
+    module = IncrementalModule(module_location=module_location)
+    mismatches = []
+    for i, source in enumerate(versions):
+        module.update(source)
+        try:
+            expected = cold_types(source, module_location=module_location)
+        except Exception:
+            continue
+
+        found = module.types()
+        for key in sorted(expected.keys() | found.keys()):
+            cold = describe_types(expected.get(key, set()))
+            incremental = describe_types(found.get(key, set()))
+            if cold != incremental:
+                mismatches.append((i, key, cold, incremental))
+    return mismatches
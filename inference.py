@@ -1,24 +1,88 @@
 # -*- coding: utf-8 -*-
 
 import ast
+import contextlib
+import functools
+import itertools
 import sys
 import os
 import astor
 import pytype
 
-from arguments import Arguments, empty_args
+from collections import namedtuple
+
+from arguments import Arguments
+from definition_index import DefinitionIndex
+from eval_memo import MEMOIZED_NODES
+from node_index import ExprTypes
+from type_set import TYPE_SETS, TypeSet, type_set
+
+
+"""
+A variable in some scope whose types will not change anymore.
+
+scope (str): Dot separated names of the functions and classes the variable is
+    in. The module scope is the empty string.
+name (str)
+types (set[pytype.PyType])
+lineno (Optional[int]): Line the variable is first bound on.
+"""
+Binding = namedtuple("Binding", ["scope", "name", "types", "lineno"])
+
+_VERSIONS = itertools.count()
 
 
 class Environment:
+    __slots__ = ("__name", "__variables", "__builtins", "__parent",
+                 "__call_stack", "__returns", "__yields", "__raises",
+                 "__module_location", "__versions", "__expr_types", "__meter",
+                 "__memo")
+
     def __init__(self, name, init_vars=None, parent_env=None,
-                 module_location=None):
+                 module_location=None, builtins=None, expr_types=None,
+                 meter=None, memo=None):
+        """
+        Args:
+            name (str)
+            init_vars (Optional[dict[str, set[pytype.PyType]]])
+            parent_env (Optional[Environment])
+            module_location (Optional[str])
+            builtins (Optional[Mapping[str, set[pytype.PyType]]]): Read only
+                variables looked up after every other env. Binding one of
+                these names binds a copy in this env.
+            expr_types (Optional[node_index.ExprTypes]): Where the types of
+                evaluated expressions are recorded. Nested envs record in the
+                table of their parent.
+            meter (Optional[budget.BudgetMeter]): The meter evaluated nodes
+                are charged to. Defaults to the meter of the parent env, or
+                of the current session.
+            memo (Optional[eval_memo.EvalMemo]): The memo operations are
+                looked up in, defaulting like the meter.
+        """
         self.__name = name
-        self.__variables = dict(init_vars or {})  # dict[str, set[pytype.PyType]]
+        # Bound types are replaced, never changed, so lookups share them
+        self.__variables = {name: type_set(types) for name, types in
+                            (init_vars or {}).items()}  # dict[str, TypeSet]
+        self.__builtins = builtins or pytype.EMPTY_ATTRS
         self.__parent = parent_env
         if self.__parent:
             self.__call_stack = self.__parent.call_stack()
+            self.__expr_types = self.__parent.expr_types()
+            meter = self.__parent.__meter
+            memo = self.__parent.__memo
         else:
             self.__call_stack = set()
+            self.__expr_types = expr_types
+            if meter is None or memo is None:
+                from session import current_session
+                session = current_session()
+                if meter is None:
+                    meter = session.budget_meter()
+                if memo is None:
+                    memo = session.eval_memo()
+        # Kept once for every node evaluated, and not at all without limits
+        self.__meter = meter if meter is not None and meter.limited() else None
+        self.__memo = memo if memo is not None and memo.enabled() else None
 
         self.__returns = set()
         self.__yields = set()
@@ -27,6 +91,10 @@ class Environment:
         # Modules
         self.__module_location = module_location
 
+        # The version of each variable changes whenever its types do.
+        # Versions are unique across variables and environments.
+        self.__versions = {name: next(_VERSIONS) for name in self.__variables}  # dict[str, int]
+
     def returns(self):
         return self.__returns
 
@@ -42,12 +110,41 @@ class Environment:
     def call_stack(self):
         return self.__call_stack
 
+    def parent(self):
+        return self.__parent
+
+    def expr_types(self):
+        """
+        The types every expression of the module evaluated to, in any env,
+        looked up by node or by the line and column it starts at. Lines start
+        at 1 and columns at 0, like in the AST.
+
+        Returns:
+            Optional[node_index.ExprTypes]: None unless the module env was
+                created with record_expr_types.
+        """
+        return self.__expr_types
+
     def variables(self):
         return self.__variables
 
+    def version(self, varname):
+        """
+        Returns:
+            Optional[int]: The version of the variable a name refers to in
+                this environment, which stays the same while its types do.
+                None for builtins and undefined names.
+        """
+        env = self
+        while env is not None:
+            if varname in env.__variables:
+                return env.__versions[varname]
+            env = env.__parent
+        return None
+
     def all_variables(self):
         """Includes variables in higher level envs."""
-        vars = {}
+        vars = dict(self.__builtins)
         if self.__parent:
             vars.update(self.__parent.all_variables())
         vars.update(self.variables())
@@ -62,13 +159,42 @@ class Environment:
             types (set[pytype.PyType])
         """
         assert isinstance(varname, str)
-        assert isinstance(types, set)
+        assert isinstance(types, TYPE_SETS)
         assert all(isinstance(x, pytype.PyType) for x in types)
 
-        if varname in self.__variables:
-            self.__variables[varname] |= types
+        old = self.__variables.get(varname)
+        if old is None:
+            builtin = self.__builtins.get(varname)
+            bound = type_set(types) if builtin is None else type_set(builtin) | types
         else:
-            self.__variables[varname] = set(types)  # The types are always copied
+            bound = old | types
+            if bound is old:
+                return
+        if len(bound) > 1:
+            bound = self.__widen(bound)
+            if bound == old:
+                return
+        self.__variables[varname] = bound
+        self.__versions[varname] = next(_VERSIONS)
+        if old is not None:
+            pytype.mutated()
+
+    def __widen(self, types):
+        """
+        With a limit on the types of variables in the profile of the session,
+        types past the limit are widened to unknown. Unknown absorbs every
+        type added to it afterwards, so a widened variable stays widened.
+
+        Returns:
+            TypeSet: The types, or only unknown.
+        """
+        from session import current_session
+        from unknown_type import UNKNOWN_TYPE
+
+        limit = current_session().profile().max_union_size()
+        if limit is not None and (len(types) > limit or UNKNOWN_TYPE in types):
+            return TypeSet([UNKNOWN_TYPE])
+        return types
 
     def bind_attr(self, node, types):
         """
@@ -91,6 +217,8 @@ class Environment:
         """
         Lookup a variable only in this environment.
         """
+        if varname not in self.__variables and varname in self.__builtins:
+            return self.__builtins[varname]
         return self.__variables[varname]
 
     def lookup(self, varname, init_env=None):
@@ -106,6 +234,9 @@ class Environment:
         if self.__parent:
             return self.__parent.lookup(varname, init_env=init_env)
 
+        if varname in self.__builtins:
+            return self.__builtins[varname]
+
         raise KeyError("'{}' does not exist in environment of '{}'".format(varname, init_env))
 
     def unpack_assign(self, target, types):
@@ -121,13 +252,12 @@ class Environment:
         elif isinstance(target, ast.Tuple):
             # Iterate through each tuple value and set the nth content to
             # the nth target
-            for t in types:
-                assert len(target.elts) == len(t.contents())
-
             src_types = [set() for i in target.elts]
             for t in types:
+                contents = t.contents()
+                assert len(target.elts) == len(contents)
                 for i in range(len(src_types)):
-                    src_types[i] |= t.contents()[i]
+                    src_types[i] |= contents[i]
 
             for i, elt in enumerate(target.elts):
                 self.unpack_assign(elt, src_types[i])
@@ -163,42 +293,85 @@ class Environment:
     def eval_list(self, node):
         from builtin_types import LIST_CLASS
         return {
-            LIST_CLASS.from_list(list(map(self.eval, node.elts)))
+            LIST_CLASS.from_list([types for types, _ in self.eval_runs(node.elts)])
         }
 
     def eval_tuple(self, node):
         from tuple_type import TUPLE_CLASS
         return {
-            TUPLE_CLASS.create_tuple(
-                init_contents=tuple(self.eval(n) for n in node.elts)
-            )
+            TUPLE_CLASS.create_tuple(runs=self.eval_runs(node.elts))
         }
 
+    def eval_runs(self, nodes):
+        """
+        Evaluate the elements of a list or tuple. Literal constants are
+        classified by their python type without a full eval, and each run of
+        neighbouring constants of the same type shares one set, as do all
+        constants of a type.
+
+        Returns:
+            tuple[tuple[set[pytype.PyType], int]]: The types of each run of
+                elements and the number of elements in it.
+        """
+        runs = []  # list[list]
+        shared = {}  # dict[pytype.PyType, set[pytype.PyType]]
+        last = None  # The type of the last run if it is a run of literals
+        literals = 0
+        constant_types = literal_types()
+        table = self.__expr_types
+        for node in nodes:
+            t = None
+            if type(node) is ast.Constant:
+                t = constant_types.get(type(node.value))
+                if t is not None and table is not None:
+                    table.record_literal(node, t)
+            if t is None:
+                runs.append([self.eval(node), 1])
+                last = None
+            elif t is last:
+                runs[-1][1] += 1
+                literals += 1
+            else:
+                types = shared.get(t)
+                if types is None:
+                    types = shared[t] = {t}
+                runs.append([types, 1])
+                last = t
+                literals += 1
+
+        if literals:
+            self.charge(None, literals)
+        return tuple((types, count) for types, count in runs)
+
     def eval_call(self, node):
         """
         Call, update, and evaluate the function.
         """
+        from session import current_session
+
         ret_types = set()
 
         func_types = self.eval(node.func)  # set[PyType]
 
-        for func in func_types:
-            if func not in self.__call_stack:
-                self.__call_stack.add(func)
-
-                # Create new arguments since these are mutated
-                args = Arguments.from_call_node(node, self)
-                ret_types |= func.call(args)
-
-                self.__call_stack.remove(func)
+        heap = current_session().heap()
+        with heap.call_site(node):
+            for func in func_types:
+                if func not in self.__call_stack:
+                    self.__call_stack.add(func)
+                    try:
+                        # Create new arguments since these are mutated
+                        args = Arguments.from_call_node(node, self)
+                        ret_types |= heap.call_context(func).call(args)
+                    finally:
+                        self.__call_stack.remove(func)
 
         return ret_types
 
     def eval_name(self, node):
         """
-        Return a copy of the set.
+        Return the bound TypeSet, which is never changed, without a copy.
         """
-        return set(self.lookup(node.id))
+        return self.lookup(node.id)
 
     def eval_bin_op_from_types(self, left, op, right, aug=False):
         results = set()
@@ -296,8 +469,6 @@ class Environment:
         ret_types = set()
         for value in values:
             args = Arguments([key_types])
-            print(args)
-            print(value)
             ret_types |= value.call_getitem(args)
         return ret_types
 
@@ -342,6 +513,43 @@ class Environment:
             return {BOOL_TYPE}
 
     def eval(self, node):
+        meter = self.__meter
+        if meter is not None:
+            meter.charge()
+        memo = self.__memo
+        if memo is not None and isinstance(node, MEMOIZED_NODES):
+            types = self.__eval_memoized(node, memo)
+        else:
+            types = self.eval_node(node)
+
+        table = self.__expr_types
+        if table is not None:
+            table.record(node, types)
+        return types
+
+    def __eval_memoized(self, node, memo):
+        """
+        Evaluate an operation with the eval memo of the session. The nodes of
+        a result found in the memo are not charged again.
+        """
+        entry = memo.entry(node)
+        if entry is None:
+            return self.eval_node(node)
+
+        names = entry[0]
+        key = tuple(self.version(name) for name in names)
+        types = memo.lookup(entry, key)
+        if types is None:
+            types = self.eval_node(node)
+            if (tuple(self.version(name) for name in names) == key and
+                    all(t.is_frozen() for name in names for t in self.lookup(name))):
+                memo.store(entry, key, types)
+        return types
+
+    def eval_node(self, node):
+        """
+        Evaluate a node without charging it or using the eval memo.
+        """
         if isinstance(node, ast.Num):
             return self.eval_num(node)
         elif isinstance(node, ast.Str):
@@ -385,6 +593,18 @@ class Environment:
         else:
             raise NotImplementedError("Unable to evaluate type for node '{}' on line {}".format(node, node.lineno))
 
+    def charge(self, node, nodes=1):
+        """
+        Count a node, or the given number of nodes under it, against the
+        budget of the session this env was created in. Nothing is counted
+        if the budget has no limits.
+
+        Raises:
+            budget.BudgetExceeded
+        """
+        if self.__meter is not None:
+            self.__meter.charge(nodes)
+
     """
     Node parsing
     """
@@ -443,8 +663,32 @@ class Environment:
         """
         from function_type import FunctionType
         func_type = FunctionType.from_node_and_env(node, self)
+        self.define_function(node)
         self.bind(node.name, {func_type})
 
+    def define_function(self, node):
+        """
+        Called when a function is defined in this environment or any
+        environment inside it.
+
+        Args:
+            node (ast.FunctionDef)
+        """
+        if self.__parent:
+            self.__parent.define_function(node)
+
+    def running_function(self, node):
+        """
+        Context manager around interpreting the body of a function defined in
+        this environment or any environment inside it.
+
+        Args:
+            node (ast.FunctionDef)
+        """
+        if self.__parent:
+            return self.__parent.running_function(node)
+        return contextlib.nullcontext()
+
     def parse_class_def(self, node):
         from class_type import ClassType
         cls_type = ClassType.from_node_and_env(node, self)
@@ -492,17 +736,29 @@ class Environment:
         iter_types = self.eval(iter_node)
         contents = set()
         for t in iter_types:
-            #contents |= t.all_contents()
-            iterator_types = t.call_iter(empty_args())  # iterator
-            for iter_t in iterator_types:
-                # The next value
-                contents |= iter_t.call_next(empty_args())
+            contents |= t.element_types()
         self.unpack_assign(target, contents)
 
-        # Parse both the body and orelse
-        self.parse_sequence(body)
+        # Parse the body until the types of the variables stop changing,
+        # then the orelse
+        from session import current_session
+        iterations = current_session().profile().loop_iterations()
+        for i in range(iterations):
+            before = self.__loop_state() if i < iterations - 1 else None
+            self.parse_sequence(body)
+            if before == self.__loop_state():
+                break
         self.parse_sequence(orelse)
 
+    def __loop_state(self):
+        """
+        Versions and mutations only grow, so this changes whenever the types
+        of any variable of this env do, including when they are widened, and
+        whenever the body adds types to a container, an attribute, or a
+        variable of another env.
+        """
+        return max(self.__versions.values(), default=None), pytype.mutations()
+
     def parse_try(self, node):
         """
         Parse the body, handlers, orelse, and finalbody in that order.
@@ -548,6 +804,7 @@ class Environment:
         self.unpack_assign(node.target, results)
 
     def parse(self, node):
+        self.charge(node)
         if isinstance(node, ast.Assign):
             self.parse_assign(node)
         elif isinstance(node, ast.FunctionDef):
@@ -591,12 +848,379 @@ class Environment:
 
 
 class ModuleEnv(Environment):
-    def __init__(self, module_location=None):
+    __slots__ = ("__module_node", "__session", "__reads", "__readers",
+                 "__function_owners", "__completed_functions")
+
+    def __init__(self, module_location=None, session=None, profile=None,
+                 record_expr_types=False):
+        """
+        Args:
+            module_location (Optional[str])
+            session (Optional[session.AnalysisSession]): Defaults to the
+                current session, or a new session for the profile if there is
+                one.
+            profile (Optional[Union[str, profiles.Profile]]): The profile or
+                the name of the preset profile a new session is configured
+                by. Sessions already have a profile of their own.
+            record_expr_types (bool): Record the types of every evaluated
+                expression in expr_types(). Off by default since it costs
+                time on every eval.
+        """
+        from session import current_session
+
+        if profile is not None:
+            from profiles import get_profile
+            if session is not None:
+                raise RuntimeError("A module env takes a session or a profile, not both")
+            if isinstance(profile, str):
+                profile = get_profile(profile)
+            session = profile.create_session()
+        session = session or current_session()
+
         super().__init__(
             "__main__",
-            init_vars=pytype.load_builtin_vars(),
-            module_location=module_location)
-
-        # Also add this location to the pythonpath
+            builtins=pytype.load_builtin_vars(),
+            module_location=module_location,
+            expr_types=ExprTypes() if record_expr_types else None,
+            meter=session.budget_meter(),
+            memo=session.eval_memo())
+        self.__module_node = None
+        self.__session = session
+
+        # Names looked up in this env by the code of each top level
+        # statement, including the bodies of the functions it defines when
+        # they are called from anywhere
+        self.__reads = {}  # dict[ast.stmt, set[str]]
+        self.__readers = []  # list[ast.stmt]
+        self.__function_owners = {}  # dict[ast.FunctionDef, ast.stmt]
+        self.__completed_functions = set()  # set[ast.FunctionDef]
+
+        # Modules next to this one can be imported
         if module_location is not None:
-            sys.path.insert(1, os.path.dirname(module_location))
+            self.__session.add_search_path(os.path.dirname(module_location))
+
+    def session(self):
+        return self.__session
+
+    def parse(self, node):
+        if self.__readers:
+            return super().parse(node)
+
+        # A top level statement
+        self.__readers.append(node)
+        try:
+            super().parse(node)
+        finally:
+            self.__readers.pop()
+
+    def lookup(self, varname, init_env=None):
+        if self.__readers:
+            self.__reads.setdefault(self.__readers[-1], set()).add(varname)
+        return super().lookup(varname, init_env=init_env)
+
+    def define_function(self, node):
+        if self.__readers:
+            self.__function_owners[node] = self.__readers[-1]
+
+    @contextlib.contextmanager
+    def running_function(self, node):
+        owner = self.__function_owners.get(node)
+        if owner is None:
+            yield
+            return
+
+        self.__readers.append(owner)
+        try:
+            yield
+        finally:
+            self.__readers.pop()
+        self.__completed_functions.add(node)
+
+    def statement_reads(self, node):
+        """
+        Args:
+            node (ast.stmt): A top level statement that was parsed.
+
+        Returns:
+            set[str]: Names the statement looked up in the module, directly
+                or from the bodies of the functions it defines.
+        """
+        return self.__reads.get(node, set())
+
+    def completed_functions(self):
+        """
+        Returns:
+            set[ast.FunctionDef]: Functions whose body was interpreted to the
+                end at least once.
+        """
+        return self.__completed_functions
+
+    def module_variables(self):
+        """
+        Variables bound by the module itself. Builtins are only included if
+        the module rebinds them.
+
+        Returns:
+            dict[str, set[pytype.PyType]]
+        """
+        return dict(self.variables())
+
+    def iter_parse(self, code, release_ast=False):
+        """
+        Parse code and yield bindings as soon as no remaining statement can
+        change them. A module variable is final once no remaining statement
+        reads or binds it, directly or through a function it calls. The
+        variables in a function are final at the same point as the name the
+        function is bound to.
+
+        Args:
+            code (str)
+            release_ast (bool): Parse the top level statements one at a
+                time when they are interpreted instead of the whole module
+                at once, and drop the bodies of functions from the AST once
+                their bindings were yielded. They are parsed again from the
+                source if they are interpreted again.
+
+        Yields:
+            Binding
+        """
+        from released_ast import parse_span, release_types
+
+        lines = code.splitlines(True)
+        if release_ast:
+            index, spans = self.__released_index(code, lines)
+        else:
+            index = DefinitionIndex(ast.parse(code))
+        last_uses = index.last_uses()
+
+        finals = {}  # dict[int, list[str]]
+        for name, i in last_uses.items():
+            finals.setdefault(i, []).append(name)
+
+        emitted = set()
+        parsed = {}  # dict[tuple[int, int], list[ast.stmt]]
+        for stmt in index.statements():
+            node = stmt.node()
+            if node is None:
+                span, position = spans[stmt.index()]
+                if span not in parsed:
+                    parsed = {span: parse_span(lines, span)}
+                node = parsed[span][position]
+
+            self.__number(node)
+            # Only active while parsing since the consumer of the bindings
+            # runs in the same context between yields
+            with self.__session.activate():
+                self.parse(node)
+            assert not self.call_stack()
+            if release_ast:
+                # Nothing reads them back while the module is parsed this way
+                self.__reads.pop(node, None)
+
+            variables = self.module_variables()
+            for name in sorted(finals.get(stmt.index(), [])):
+                if name in variables:
+                    emitted.add(name)
+                    yield from self.__name_bindings(index, name, variables[name])
+                    if release_ast:
+                        release_types(variables[name], lines)
+
+        # Names not found by the index, like comprehension variables
+        variables = self.module_variables()
+        for name in sorted(variables.keys() - emitted):
+            yield from self.__name_bindings(index, name, variables[name])
+
+    def __released_index(self, code, lines):
+        """
+        Index the top level statements of a module parsing one span at a
+        time, and drop their nodes.
+
+        Returns:
+            tuple[DefinitionIndex, list[tuple[tuple[int, int], int]]]: The
+                index, and the span of each statement with its position among
+                the statements of the span.
+        """
+        from definition_index import TopLevelStatement
+        from released_ast import parse_span, statement_spans
+
+        try:
+            statements = []
+            spans = []
+            for span in statement_spans(code):
+                for position, node in enumerate(parse_span(lines, span)):
+                    stmt = TopLevelStatement(len(statements), node)
+                    stmt.release_node()
+                    statements.append(stmt)
+                    spans.append((span, position))
+        except SyntaxError:
+            # Report the error of the whole module
+            ast.parse(code)
+            raise
+        return DefinitionIndex(None, statements=statements), spans
+
+    def parse_module(self, node):
+        self.__module_node = node
+        self.__number(node)
+        with self.__session.activate():
+            super().parse_module(node)
+
+    def __number(self, node):
+        """
+        Number the expressions of a module or statement in source order
+        before they are interpreted, if their types are recorded.
+        """
+        table = self.expr_types()
+        if table is not None:
+            table.node_index().number(node)
+
+    def bindings(self):
+        """
+        All bindings of an already parsed module. They are collected in the
+        session of the module before any is yielded, since reading the env
+        of an evicted function interprets its body again.
+
+        Yields:
+            Binding
+        """
+        index = DefinitionIndex(self.__module_node or ast.Module(body=[]))
+        bindings = []
+        with self.__session.activate():
+            for scope, name, types, node in scope_bindings(self):
+                if scope:
+                    lineno = binding_line(node, name)
+                else:
+                    defs = index.definitions(name)
+                    lineno = defs[0].span()[0] if defs else None
+                bindings.append(Binding(scope, name, types, lineno))
+        yield from bindings
+
+    def __name_bindings(self, index, name, types):
+        """
+        Returns:
+            list[Binding]: The bindings of a module variable and the variables
+                of the functions in it, collected in the session of the
+                module.
+        """
+        defs = index.definitions(name)
+        lineno = defs[0].span()[0] if defs else None
+        bindings = [Binding("", name, types, lineno)]
+        with self.__session.activate():
+            for scope, var, var_types, node in nested_bindings(name, types):
+                bindings.append(Binding(scope, var, var_types, binding_line(node, var)))
+        return bindings
+
+
+@functools.lru_cache(maxsize=None)
+def literal_types():
+    """
+    Returns:
+        dict[type, pytype.PyType]: The type of constants of each python type
+            that can be evaluated without a full eval.
+    """
+    from builtin_types import (BOOL_TYPE, BYTES_TYPE, FLOAT_TYPE, INT_TYPE,
+                               NONE_TYPE, STR_TYPE)
+    return {
+        int: INT_TYPE,
+        float: FLOAT_TYPE,
+        str: STR_TYPE,
+        bytes: BYTES_TYPE,
+        bool: BOOL_TYPE,
+        type(None): NONE_TYPE,
+    }
+
+
+def join_scope(*names):
+    return ".".join(name for name in names if name)
+
+
+def nested_bindings(name, types, scope=""):
+    """
+    Walk the environments of the functions and methods in a set of types
+    bound to a name. This must run in the session the functions were created
+    in, since reading the env of an evicted function interprets its body
+    again.
+
+    Raises:
+        RuntimeError: If another session is current.
+
+    Yields:
+        tuple[str, str, set[pytype.PyType], ast.AST]: Scope, variable, types,
+            and the node of the function the variable is in.
+    """
+    from function_type import FunctionType
+    from class_type import ClassType
+
+    for t in types:
+        if isinstance(t, FunctionType) and t.ref_node() is not None:
+            check_function_session(t)
+            yield from scope_bindings(t.env(), join_scope(scope, name), t.ref_node())
+        elif isinstance(t, ClassType):
+            for attr, attr_types in sorted(t.attrs().items()):
+                for attr_t in attr_types:
+                    if isinstance(attr_t, FunctionType) and attr_t.ref_node() is not None:
+                        check_function_session(attr_t)
+                        yield from scope_bindings(
+                            attr_t.env(), join_scope(scope, name, attr),
+                            attr_t.ref_node())
+
+
+def check_function_session(func):
+    """
+    Raises:
+        RuntimeError: If the session a function was created in is not the
+            current session.
+    """
+    from session import current_session
+
+    if func.session() is not current_session():
+        raise RuntimeError("The bindings of '{}' must be walked in the session "
+                           "it was analyzed in".format(func.defined_name()))
+
+
+def scope_bindings(env, scope="", node=None):
+    """
+    Walk the variables of an environment and the environments of the
+    functions and classes defined in it. Like nested_bindings(), this must
+    run in the session the environment was analyzed in.
+
+    Args:
+        env (Environment)
+        scope (str): Dot separated path of the environment.
+        node (Optional[ast.AST]): The node the environment was created for.
+
+    Yields:
+        tuple[str, str, set[pytype.PyType], ast.AST]: Scope, variable, types,
+            and the node of the scope.
+    """
+    if isinstance(env, ModuleEnv):
+        variables = env.module_variables()
+    else:
+        variables = env.variables()
+
+    for name in sorted(variables):
+        yield scope, name, variables[name], node
+    for name in sorted(variables):
+        yield from nested_bindings(name, variables[name], scope)
+
+
+def binding_line(node, name):
+    """
+    Returns:
+        Optional[int]: The first line a name is bound on in a node.
+    """
+    from released_ast import function_body
+
+    if node is None:
+        return None
+    if isinstance(node, ast.FunctionDef):
+        function_body(node)
+
+    lines = []
+    for n in ast.walk(node):
+        if isinstance(n, ast.arg) and n.arg == name:
+            lines.append(getattr(n, "lineno", node.lineno))
+        elif isinstance(n, ast.Name) and n.id == name and isinstance(n.ctx, ast.Store):
+            lines.append(n.lineno)
+        elif isinstance(n, (ast.FunctionDef, ast.ClassDef)) and n.name == name and n is not node:
+            lines.append(n.lineno)
+    return min(lines) if lines else None
@@ -1,23 +1,50 @@
 import pytype
 
+from type_set import TypeSet
+
 
 class InstanceType(pytype.PyType):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         assert self.parents(), "PyType '{}' does not have a ClassType to create it".format(self.name())
 
     def get_attr(self, attr):
         from function_type import FunctionType
+        from session import current_session
 
+        heap = current_session().heap()
         types = super().get_attr(attr)
+        contexts = {}  # dict[FunctionType, FunctionType]
         for t in types:
             if isinstance(t, FunctionType):
-                t.bind_method(self)
+                # Methods of instances with an allocation of their own run in
+                # a context for the instance
+                context = heap.method_context(t, self)
+                if context is not t:
+                    contexts[t] = context
+                context.bind_method(self)
 
+        if contexts:
+            # The types are shared with the class
+            types = TypeSet(contexts.get(t, t) for t in types)
         return types
 
+    def allocation_key(self):
+        """
+        Returns:
+            Optional[Hashable]: The allocations this instance stands for
+                under the heap of the session, or None for every allocation
+                of its class.
+        """
+        return None
+
     def __hash__(self):
         return hash(self.name())
 
     def __eq__(self, other):
+        if isinstance(other, InstanceType) and \
+                self.allocation_key() != other.allocation_key():
+            return False
         return self.name() == other.name()
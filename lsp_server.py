@@ -0,0 +1,480 @@
+"""
+Language server for hover types and inlay hints.
+
+Speaks the Language Server Protocol over stdin and stdout:
+
+    python -m lsp_server
+
+Every open document keeps an IncrementalModule, so an edit only interprets
+the statements connected to what changed. Hovers and inlay hints are
+answered from the stored results without interpreting anything.
+
+Supported messages:
+    initialize, initialized, shutdown, exit
+    textDocument/didOpen, textDocument/didChange, textDocument/didClose
+    textDocument/hover, textDocument/inlayHint
+"""
+
+import ast
+import json
+import sys
+
+from incremental import IncrementalModule, statement_key
+
+
+SYNC_INCREMENTAL = 2
+INLAY_HINT_TYPE = 1
+SEVERITY_ERROR = 1
+
+METHOD_NOT_FOUND = -32601
+REQUEST_FAILED = -32803
+
+
+"""
+Transport
+"""
+
+
+def read_message(stream):
+    """
+    Read one message framed by a Content-Length header.
+
+    Args:
+        stream: Binary input stream.
+
+    Returns:
+        Optional[dict]: None at the end of the stream.
+    """
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.decode("ascii").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value.strip())
+
+    if length is None:
+        raise RuntimeError("Message without a Content-Length header")
+    return json.loads(stream.read(length).decode("utf-8"))
+
+
+def write_message(stream, message):
+    """
+    Args:
+        stream: Binary output stream.
+        message (dict)
+    """
+    body = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    stream.write("Content-Length: {}\r\n\r\n".format(len(body)).encode("ascii"))
+    stream.write(body)
+    stream.flush()
+
+
+"""
+Documents
+"""
+
+
+def position_offset(lines, position):
+    """
+    Args:
+        lines (list[str]): Lines of a document including line endings.
+        position (dict): Zero based line and character.
+
+    Returns:
+        int: Offset in the document text.
+    """
+    line = position["line"]
+    if line >= len(lines):
+        return sum(len(l) for l in lines)
+    return sum(len(l) for l in lines[:line]) + min(position["character"],
+                                                   len(lines[line]))
+
+
+def apply_change(text, change):
+    """
+    Apply one content change of a didChange notification.
+
+    Returns:
+        str
+    """
+    if "range" not in change:
+        return change["text"]
+    lines = text.splitlines(True)
+    start = position_offset(lines, change["range"]["start"])
+    end = position_offset(lines, change["range"]["end"])
+    return text[:start] + change["text"] + text[end:]
+
+
+def format_types(types):
+    from summary_pack import types_descriptors
+    return " | ".join(types_descriptors(types)) or "unknown"
+
+
+def named_nodes(node, scope=""):
+    """
+    Walk the nodes under a node that bind or read a name, with the scope
+    they are in.
+
+    Yields:
+        tuple[str, str, int, int, bool]: Scope, name, line (one based),
+            column of the name (zero based), and whether the node binds the
+            name.
+    """
+    for child in ast.iter_child_nodes(node):
+        yield from named_node(child, scope)
+
+
+def named_node(node, scope):
+    if isinstance(node, ast.Name):
+        yield (scope, node.id, node.lineno, node.col_offset,
+               isinstance(node.ctx, ast.Store))
+    elif isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+        # The name of a definition comes after the keyword
+        keyword = "class " if isinstance(node, ast.ClassDef) else "def "
+        yield scope, node.name, node.lineno, node.col_offset + len(keyword), True
+
+        inner = scope + "." + node.name if scope else node.name
+        for decorator in node.decorator_list:
+            yield from named_node(decorator, scope)
+        if isinstance(node, ast.FunctionDef):
+            # Defaults are evaluated in the enclosing scope
+            yield from named_nodes(node.args, scope)
+            for arg in ast.walk(node.args):
+                if isinstance(arg, ast.arg):
+                    yield inner, arg.arg, arg.lineno, arg.col_offset, True
+        else:
+            for base in node.bases:
+                yield from named_node(base, scope)
+        for stmt in node.body:
+            yield from named_node(stmt, inner)
+    else:
+        yield from named_nodes(node, scope)
+
+
+class Document:
+    def __init__(self, uri, text, version=None):
+        self.__uri = uri
+        self.__text = text
+        self.__version = version
+        self.__module = IncrementalModule(module_location=uri_path(uri))
+        self.__syntax_error = None
+        self.__analyzed_text = ""
+        # Named nodes of each statement with lines relative to its start
+        self.__statement_names = {}  # dict[tuple, list[tuple]]
+        self.__names = None  # Optional[list[tuple[str, str, int, int, bool]]]
+        self.__names_by_line = None  # Optional[dict[int, list[tuple]]]
+        self.analyze()
+
+    def uri(self):
+        return self.__uri
+
+    def text(self):
+        return self.__text
+
+    def version(self):
+        return self.__version
+
+    def module(self):
+        return self.__module
+
+    def change(self, changes, version=None):
+        for change in changes:
+            self.__text = apply_change(self.__text, change)
+        self.__version = version
+        self.analyze()
+
+    def analyze(self):
+        """Update the analysis. Results from before a syntax error are kept."""
+        try:
+            self.__module.update(self.__text)
+        except SyntaxError as e:
+            self.__syntax_error = e
+        else:
+            self.__syntax_error = None
+            self.__analyzed_text = self.__text
+            # Found when a hover or hint needs them
+            self.__names = self.__names_by_line = None
+
+    def names(self):
+        """
+        Named nodes of the last analyzed text, sorted by position. Those of
+        statements that did not change are reused.
+
+        Returns:
+            list[tuple[str, str, int, int, bool]]: See named_nodes().
+        """
+        if self.__names is not None:
+            return self.__names
+
+        lines = self.__analyzed_text.splitlines(True)
+        statement_names = {}
+        self.__names = []
+        for stmt in self.__module.node().body:
+            key = statement_key(lines, stmt)
+            if key in self.__statement_names:
+                relative = self.__statement_names[key]
+            else:
+                first = stmt.lineno - 1
+                relative = sorted(
+                    ((scope, var, lineno - first, col, store)
+                     for scope, var, lineno, col, store in named_node(stmt, "")),
+                    key=lambda n: (n[2], n[3]))
+            statement_names[key] = relative
+
+            first = stmt.lineno - 1
+            self.__names += [(scope, var, lineno + first, col, store)
+                             for scope, var, lineno, col, store in relative]
+        self.__statement_names = statement_names
+
+        self.__names_by_line = {}
+        for name in self.__names:
+            self.__names_by_line.setdefault(name[2], []).append(name)
+        return self.__names
+
+    def name_at(self, line, character):
+        """
+        Args:
+            line (int): Zero based.
+            character (int): Zero based.
+
+        Returns:
+            Optional[tuple[str, str, int, int, bool]]
+        """
+        self.names()
+        for name in self.__names_by_line.get(line + 1, []):
+            scope, var, lineno, col, _ = name
+            if col <= character <= col + len(var):
+                return name
+        return None
+
+    def hover(self, line, character):
+        """
+        Returns:
+            Optional[dict]
+        """
+        found = self.name_at(line, character)
+        if found is None:
+            return None
+        scope, var, lineno, col, _ = found
+        types = self.__module.lookup(scope, var)
+        if types is None:
+            return None
+        return {
+            "contents": {
+                "kind": "markdown",
+                "value": "```python\n{}: {}\n```".format(var, format_types(types)),
+            },
+            "range": {
+                "start": {"line": lineno - 1, "character": col},
+                "end": {"line": lineno - 1, "character": col + len(var)},
+            },
+        }
+
+    def inlay_hints(self, start_line=0, end_line=None):
+        """
+        A hint after the first binding of every variable in each scope.
+
+        Returns:
+            list[dict]
+        """
+        hints = []
+        seen = set()
+        for scope, var, lineno, col, store in self.names():
+            if not store or (scope, var) in seen:
+                continue
+            seen.add((scope, var))
+            if lineno - 1 < start_line or (end_line is not None and lineno - 1 > end_line):
+                continue
+            types = self.__module.types().get((scope, var))
+            if types is None:
+                continue
+            hints.append({
+                "position": {"line": lineno - 1, "character": col + len(var)},
+                "label": ": " + format_types(types),
+                "kind": INLAY_HINT_TYPE,
+                "paddingLeft": False,
+            })
+        return hints
+
+    def diagnostics(self):
+        diagnostics = []
+        errors = list(self.__module.errors())
+        if self.__syntax_error is not None:
+            errors.append((self.__syntax_error.lineno or 1,
+                           "SyntaxError: {}".format(self.__syntax_error.msg)))
+        for lineno, message in errors:
+            diagnostics.append({
+                "range": {
+                    "start": {"line": lineno - 1, "character": 0},
+                    "end": {"line": lineno, "character": 0},
+                },
+                "severity": SEVERITY_ERROR,
+                "source": "python-type-inference",
+                "message": message,
+            })
+        return diagnostics
+
+
+def uri_path(uri):
+    """
+    Returns:
+        Optional[str]: The file path of a file uri.
+    """
+    from urllib.parse import unquote, urlparse
+    parsed = urlparse(uri)
+    if parsed.scheme != "file":
+        return None
+    return unquote(parsed.path)
+
+
+"""
+Server
+"""
+
+
+class LanguageServer:
+    def __init__(self, out_stream):
+        """
+        Args:
+            out_stream: Binary stream responses and notifications are
+                written to.
+        """
+        self.__out = out_stream
+        self.__documents = {}  # dict[str, Document]
+        self.__shutdown = False
+        self.__exited = False
+
+    def documents(self):
+        return self.__documents
+
+    def exited(self):
+        return self.__exited
+
+    def serve(self, in_stream):
+        """Handle messages until exit or the end of the input."""
+        while not self.__exited:
+            message = read_message(in_stream)
+            if message is None:
+                break
+            self.handle(message)
+        return 0 if self.__shutdown else 1
+
+    def handle(self, message):
+        method = message.get("method")
+        params = message.get("params") or {}
+        handler = getattr(self, "on_" + (method or "").replace("/", "_"), None)
+
+        if "id" not in message:
+            # Notifications never get a response
+            if handler is not None:
+                handler(params)
+            return
+
+        if handler is None:
+            self.__respond(message["id"], error={
+                "code": METHOD_NOT_FOUND,
+                "message": "Unsupported method {}".format(method)})
+            return
+        try:
+            result = handler(params)
+        except Exception as e:
+            self.__respond(message["id"], error={
+                "code": REQUEST_FAILED,
+                "message": "{}: {}".format(type(e).__name__, e)})
+        else:
+            self.__respond(message["id"], result=result)
+
+    def __respond(self, msg_id, result=None, error=None):
+        response = {"jsonrpc": "2.0", "id": msg_id}
+        if error is not None:
+            response["error"] = error
+        else:
+            response["result"] = result
+        write_message(self.__out, response)
+
+    def __notify(self, method, params):
+        write_message(self.__out, {"jsonrpc": "2.0", "method": method,
+                                   "params": params})
+
+    def __publish_diagnostics(self, doc):
+        self.__notify("textDocument/publishDiagnostics", {
+            "uri": doc.uri(),
+            "version": doc.version(),
+            "diagnostics": doc.diagnostics(),
+        })
+
+    """
+    Lifecycle
+    """
+
+    def on_initialize(self, params):
+        return {
+            "capabilities": {
+                "textDocumentSync": {
+                    "openClose": True,
+                    "change": SYNC_INCREMENTAL,
+                },
+                "hoverProvider": True,
+                "inlayHintProvider": True,
+            },
+            "serverInfo": {"name": "python-type-inference"},
+        }
+
+    def on_initialized(self, params):
+        pass
+
+    def on_shutdown(self, params):
+        self.__shutdown = True
+        return None
+
+    def on_exit(self, params):
+        self.__exited = True
+
+    """
+    Documents
+    """
+
+    def on_textDocument_didOpen(self, params):
+        item = params["textDocument"]
+        doc = Document(item["uri"], item["text"], version=item.get("version"))
+        self.__documents[item["uri"]] = doc
+        self.__publish_diagnostics(doc)
+
+    def on_textDocument_didChange(self, params):
+        ident = params["textDocument"]
+        doc = self.__documents[ident["uri"]]
+        doc.change(params["contentChanges"], version=ident.get("version"))
+        self.__publish_diagnostics(doc)
+
+    def on_textDocument_didClose(self, params):
+        self.__documents.pop(params["textDocument"]["uri"], None)
+
+    def on_textDocument_hover(self, params):
+        doc = self.__documents.get(params["textDocument"]["uri"])
+        if doc is None:
+            return None
+        pos = params["position"]
+        return doc.hover(pos["line"], pos["character"])
+
+    def on_textDocument_inlayHint(self, params):
+        doc = self.__documents.get(params["textDocument"]["uri"])
+        if doc is None:
+            return []
+        rng = params.get("range")
+        if rng is None:
+            return doc.inlay_hints()
+        return doc.inlay_hints(rng["start"]["line"], rng["end"]["line"])
+
+
+def main():
+    server = LanguageServer(sys.stdout.buffer)
+    return server.serve(sys.stdin.buffer)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
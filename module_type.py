@@ -1,21 +1,31 @@
 import pytype
 import astor
-import pkgutil
 import sys
 
-from importlib.machinery import SourceFileLoader
+from importlib.machinery import PathFinder, SourceFileLoader
 
 
-def module_path_from_name(name):
+def module_path_from_name(name, search_path=None):
     """
+    Args:
+        name (str)
+        search_path (Optional[list[str]]): Directories searched before
+            sys.path.
+
     Returns:
         (None, str): None if the module cannot be imported. The string path
             otherwise (absolute).
     """
-    loader = pkgutil.get_loader(name)
-    if not isinstance(loader, SourceFileLoader):
+    path = list(search_path or []) + sys.path
+    spec = None
+    for part in name.split("."):
+        spec = PathFinder.find_spec(part, path)
+        if spec is None:
+            return None
+        path = spec.submodule_search_locations or []
+    if not isinstance(spec.loader, SourceFileLoader):
         return None
-    return loader.path
+    return spec.origin
 
 
 def module_node_from_path(path):
@@ -35,29 +45,170 @@ def load_module(name):
     Raises:
         RuntimeError
     """
-    # Check the sys path first
-    mod_location = module_path_from_name(name)
+    # Modules with hand written types
+    if name in BUILTIN_MODULES:
+        return BUILTIN_MODULES[name]
+
+    # Then modules with precomputed summaries
+    from summary_pack import load_summary_module
+    mod_t = load_summary_module(name)
+    if mod_t is not None:
+        return mod_t
+
+    # Then check the search path of the session and the sys path
+    from session import current_session
+    session = current_session()
+    mod_location = module_path_from_name(name, session.search_path())
     if mod_location:
+        source_modules = session.source_modules()
+        if mod_location in source_modules:
+            return source_modules[mod_location]
         mod_node = module_node_from_path(mod_location)
         if mod_node:
-            return ModuleType.from_node(mod_node)
+            mod_t = ModuleType.from_node(mod_node, name, mod_location)
+            source_modules[mod_location] = mod_t
+            return mod_t
 
-    # Then check the builtins that were implemented
-    if name in BUILTIN_MODULES:
-        return BUILTIN_MODULES[name]
-    else:
-        raise RuntimeError("The module '{}' is probably implemented in C and does not have a python implementation. This module should have a pre-built ModuleType.".format(name))
+    raise RuntimeError("The module '{}' is probably implemented in C and does not have a python implementation. This module should have a pre-built ModuleType.".format(name))
 
 
 class ModuleType(pytype.PyType):
-    def __init__(self, ref_node, *args, **kwargs):
+    __slots__ = ("__ref_node", "__defined_name", "__location", "__index",
+                 "__env", "__parsed")
+
+    def __init__(self, ref_node, *args, defined_name=None, location=None,
+                 **kwargs):
+        """
+        Args:
+            ref_node (Optional[ast.Module]): Members of the module are only
+                inferred from this node once they are accessed.
+            defined_name (Optional[str])
+            location (Optional[str]): Path of the module source.
+        """
         super().__init__("module", *args, **kwargs)
         self.__ref_node = ref_node
+        self.__defined_name = defined_name
+        self.__location = location
+
+        if ref_node is None:
+            self.__index = None
+        else:
+            from definition_index import DefinitionIndex
+            self.__index = DefinitionIndex(ref_node)
+        self.__env = None
+        self.__parsed = set()  # Indexes of the statements already interpreted
+
+    @classmethod
+    def from_node(cls, node, name=None, location=None):
+        """
+        Args:
+            node (ast.Module)
+            name (Optional[str])
+            location (Optional[str])
+        """
+        return cls(node, defined_name=name, location=location)
+
+    def defined_name(self):
+        return self.__defined_name
+
+    def ref_node(self):
+        return self.__ref_node
+
+    def index(self):
+        return self.__index
+
+    def env(self):
+        """The environment the members of this module are inferred in."""
+        if self.__env is None:
+            from inference import ModuleEnv
+            self.__env = ModuleEnv(module_location=self.__location)
+        return self.__env
+
+    def materialize(self, attr):
+        """
+        Infer the types of a member of this module by interpreting only the
+        statements it depends on.
+        """
+        index = self.__index
+        if index is None or attr not in index.names() or self.exclusive_has_attr(attr):
+            return
+
+        env = self.env()
+        for stmt in index.dependency_slice([attr]):
+            if stmt.index() not in self.__parsed:
+                self.__parsed.add(stmt.index())
+                env.parse(stmt.node())
+        if attr in env.variables():
+            self.set_attr(attr, env.exclusive_lookup(attr))
+
+    def has_attr(self, attr):
+        if self.__index is not None and attr in self.__index.names():
+            return True
+        # Avoid attrs() since it infers every member
+        return pytype.PyType.has_attr(self, attr)
+
+    def get_attr(self, attr):
+        self.materialize(attr)
+        if self.exclusive_has_attr(attr):
+            return pytype.PyType.lookup_attr(self, attr)
+        return super().get_attr(attr)
+
+    def attrs(self):
+        if self.__index is not None:
+            for attr in self.__index.names():
+                self.materialize(attr)
+        return super().attrs()
+
+    def __hash__(self):
+        return hash((self.name(), self.defined_name()))
+
+    def __eq__(self, other):
+        return (isinstance(other, ModuleType) and
+                self.defined_name() == other.defined_name())
+
+
+class SummaryModuleType(ModuleType):
+    """
+    Module created from a precomputed summary. Attributes are only turned into
+    pytypes the first time they are accessed.
+    """
+    __slots__ = ("__summary", "__decode")
+
+    def __init__(self, name, summary, decode):
+        """
+        Args:
+            name (str)
+            summary (dict[str, list[str]]): Attribute -> type descriptors
+            decode (Callable[[list[str], str], set[pytype.PyType]])
+        """
+        super().__init__(None, defined_name=name)
+        self.__summary = summary
+        self.__decode = decode
+
+    def materialize(self, attr):
+        if not self.exclusive_has_attr(attr) and attr in self.__summary:
+            self.set_attr(attr, self.__decode(self.__summary[attr], attr))
+
+    def has_attr(self, attr):
+        return attr in self.__summary or super().has_attr(attr)
+
+    def get_attr(self, attr):
+        self.materialize(attr)
+        if self.exclusive_has_attr(attr):
+            return pytype.PyType.lookup_attr(self, attr)
+        return super().get_attr(attr)
+
+    def attrs(self):
+        for attr in self.__summary:
+            self.materialize(attr)
+        return super().attrs()
 
 
 class MathModuleType(ModuleType):
+    __slots__ = ()
+
     def __init__(self):
-        super().__init__(None)
+        super().__init__(None, defined_name="math")
 
     def __hash__(self):
         return hash(self.name())
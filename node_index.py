@@ -0,0 +1,232 @@
+"""
+Dense numbering of the expressions of a module, and the types inferred for
+each of them.
+
+Every expression of a module gets an integer id the first time it is
+numbered, counting up from 0, so the types of all expressions fit in a list
+and their spans in arrays. Module environments number each module, or each
+top level statement parsed on its own, before interpreting it, so ids follow
+the source. Expressions that were not numbered, like those of code parsed
+by other means, are numbered when their types are first recorded. Ids are keyed by the type and span of the node,
+not stored on it, so a tree parsed again from the same code, like a function
+body released from the AST, or parsed by another env, gets the same ids.
+"""
+
+import array
+import ast
+
+from type_set import TypeSet, type_set
+
+
+# Columns are below this in the keys of positions
+_COLUMNS = 1 << 32
+
+
+def node_key(node):
+    """
+    Returns:
+        tuple[type, int, int, int, int]: The type and span of an expression
+            node, -1 for missing ends.
+    """
+    end_lineno = getattr(node, "end_lineno", None)
+    end_col_offset = getattr(node, "end_col_offset", None)
+    return (type(node), node.lineno, node.col_offset,
+            -1 if end_lineno is None else end_lineno,
+            -1 if end_col_offset is None else end_col_offset)
+
+
+class NodeIndex:
+    __slots__ = ("__lines", "__cols", "__end_lines", "__end_cols", "__ids",
+                 "__positions")
+
+    def __init__(self):
+        # The span of each id, -1 for missing ends
+        self.__lines = array.array("l")
+        self.__cols = array.array("l")
+        self.__end_lines = array.array("l")
+        self.__end_cols = array.array("l")
+        self.__ids = {}  # dict[tuple[type, int, int, int, int], int]
+        # The outermost expression starting at each line and column
+        self.__positions = {}  # dict[int, int]
+
+    def number(self, tree):
+        """
+        Number every expression of a tree depth first, parents before their
+        children, so ids follow the source rather than the order expressions
+        are evaluated in.
+
+        Args:
+            tree (ast.AST): A module, statement, or expression.
+        """
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, ast.expr):
+                self.node_id(node, create=True)
+            stack.extend(reversed(list(ast.iter_child_nodes(node))))
+
+    def node_id(self, node, create=False):
+        """
+        Args:
+            node (ast.expr)
+            create (bool): Number the node if it was not numbered yet.
+
+        Returns:
+            Optional[int]: The id of the node.
+        """
+        key = node_key(node)
+        i = self.__ids.get(key)
+        if i is None and create:
+            i = len(self.__ids)
+            self.__ids[key] = i
+            _, line, col, end_line, end_col = key
+            self.__lines.append(line)
+            self.__cols.append(col)
+            self.__end_lines.append(end_line)
+            self.__end_cols.append(end_col)
+
+            position = line * _COLUMNS + col
+            outer = self.__positions.get(position)
+            if outer is None or self.__ends_before(outer, end_line, end_col):
+                self.__positions[position] = i
+        return i
+
+    def __ends_before(self, i, end_line, end_col):
+        return (self.__end_lines[i], self.__end_cols[i]) < (end_line, end_col)
+
+    def span(self, i):
+        """
+        Returns:
+            tuple[int, int, Optional[int], Optional[int]]: The line and column
+                an expression starts on and ends on. Lines start at 1 and
+                columns at 0, like in the AST.
+        """
+        end_line = self.__end_lines[i]
+        end_col = self.__end_cols[i]
+        return (self.__lines[i], self.__cols[i],
+                None if end_line < 0 else end_line,
+                None if end_col < 0 else end_col)
+
+    def at(self, line, col):
+        """
+        Returns:
+            Optional[int]: The id of the outermost expression starting at a
+                line and column.
+        """
+        return self.__positions.get(line * _COLUMNS + col)
+
+    def __len__(self):
+        return len(self.__ids)
+
+
+class ExprTypes:
+    """
+    The types of every expression of a module, over every environment it was
+    evaluated in.
+    """
+    __slots__ = ("__index", "__types")
+
+    def __init__(self, index=None):
+        """
+        Args:
+            index (Optional[NodeIndex])
+        """
+        self.__index = index or NodeIndex()
+        # The types of each id, or the one type of a literal
+        self.__types = []  # list[Optional[Union[TypeSet, pytype.PyType]]]
+
+    def node_index(self):
+        return self.__index
+
+    def __slot(self, node):
+        i = self.__index.node_id(node, create=True)
+        table = self.__types
+        if i >= len(table):
+            table.extend([None] * (i + 1 - len(table)))
+        return i
+
+    def record(self, node, types):
+        """
+        Add the types an expression node evaluated to.
+
+        Args:
+            node (ast.expr)
+            types (set[pytype.PyType])
+        """
+        if not isinstance(node, ast.expr):
+            return
+        i = self.__slot(node)
+        table = self.__types
+        slot = table[i]
+        if slot is None:
+            table[i] = type_set(types)
+        elif isinstance(slot, TypeSet):
+            table[i] = slot | types
+        else:
+            table[i] = TypeSet([slot]) | types
+
+    def record_literal(self, node, t):
+        """
+        Add the type of a literal constant. Only the type is kept, not a
+        TypeSet, since constants are the most common expressions in large
+        literals.
+
+        Args:
+            node (ast.Constant)
+            t (pytype.PyType)
+        """
+        i = self.__slot(node)
+        table = self.__types
+        slot = table[i]
+        if slot is None:
+            table[i] = t
+        elif isinstance(slot, TypeSet):
+            if t not in slot:
+                table[i] = TypeSet([t]) | slot
+        elif slot is not t:
+            table[i] = TypeSet([slot, t])
+
+    def types(self, node):
+        """
+        Returns:
+            Optional[TypeSet]: The types of an expression node, or None if it
+                was never evaluated.
+        """
+        i = self.__index.node_id(node)
+        return self.__by_id(i) if i is not None else None
+
+    def at(self, line, col):
+        """
+        Returns:
+            Optional[TypeSet]: The types of the outermost expression starting
+                at a line and column, or None if there is none or it was never
+                evaluated.
+        """
+        i = self.__index.at(line, col)
+        return self.__by_id(i) if i is not None else None
+
+    def __by_id(self, i):
+        slot = self.__types[i] if i < len(self.__types) else None
+        if slot is None or isinstance(slot, TypeSet):
+            return slot
+        return TypeSet([slot])
+
+    def summary(self):
+        """
+        Returns:
+            list[list]: The span and type descriptors of every expression that
+                was evaluated, ordered by position with outer expressions
+                first. Json serializable like the module summaries.
+        """
+        from summary_pack import types_descriptors
+
+        rows = []
+        for i in range(len(self.__types)):
+            types = self.__by_id(i)
+            if types is not None:
+                rows.append(list(self.__index.span(i)) + [types_descriptors(types)])
+        rows.sort(key=lambda row: (row[0], row[1], -(row[2] or 0), -(row[3] or 0)))
+        return rows
+
+    def __len__(self):
+        return sum(1 for types in self.__types if types is not None)
@@ -0,0 +1,195 @@
+"""
+Analysis profiles.
+
+The cost of an analysis is set by a few independent levers: how precisely
+the heap tells objects apart, how many times loop bodies are interpreted,
+how many types a variable may hold before it is widened to unknown, and the
+budgets of each function and module. A profile picks a value for each of
+them so precision can be traded for speed with one setting:
+
+- fast: One instance per class, loop bodies interpreted once, variables
+  widened past 4 types, and small budgets, so no function or file takes
+  long whatever the code.
+- balanced: One instance per allocation site, loop bodies interpreted until
+  their variables stop changing for up to 3 times, variables widened past 16
+  types, and the budgets of the command line.
+- precise: Instances and function contexts per allocation site and its
+  2 callers, loop bodies interpreted until their variables stop changing for
+  up to 10 times, no widening, and generous budgets.
+
+Profile() is the configuration of an analysis that does not ask for a
+profile: the class heap, loop bodies interpreted once, no widening and no
+budgets.
+"""
+
+
+class Profile:
+    __slots__ = ("__name", "__heap_policy", "__heap_depth",
+                 "__loop_iterations", "__max_union_size", "__function_nodes",
+                 "__function_seconds", "__module_nodes", "__module_seconds")
+
+    def __init__(self, name="default", heap_policy="class", heap_depth=1,
+                 loop_iterations=1, max_union_size=None, function_nodes=None,
+                 function_seconds=None, module_nodes=None,
+                 module_seconds=None):
+        """
+        Args:
+            name (str)
+            heap_policy (str): A key of heap.HEAP_POLICIES.
+            heap_depth (int): Caller call sites kept by the context heap.
+            loop_iterations (int): Times the body of a loop is interpreted at
+                most. It stops earlier once the variables of its environment
+                stop changing.
+            max_union_size (Optional[int]): Types a variable may hold before it
+                is widened to unknown. None to never widen.
+            function_nodes (Optional[int])
+            function_seconds (Optional[float])
+            module_nodes (Optional[int])
+            module_seconds (Optional[float]): Limits of the budget. None for
+                no limit.
+        """
+        if loop_iterations < 1:
+            raise RuntimeError("Loop bodies must be interpreted at least once")
+        if max_union_size is not None and max_union_size < 1:
+            raise RuntimeError("Variables must be allowed at least one type")
+
+        self.__name = name
+        self.__heap_policy = heap_policy
+        self.__heap_depth = heap_depth
+        self.__loop_iterations = loop_iterations
+        self.__max_union_size = max_union_size
+        self.__function_nodes = function_nodes
+        self.__function_seconds = function_seconds
+        self.__module_nodes = module_nodes
+        self.__module_seconds = module_seconds
+
+    def name(self):
+        return self.__name
+
+    def heap_policy(self):
+        return self.__heap_policy
+
+    def heap_depth(self):
+        return self.__heap_depth
+
+    def loop_iterations(self):
+        return self.__loop_iterations
+
+    def max_union_size(self):
+        return self.__max_union_size
+
+    def function_nodes(self):
+        return self.__function_nodes
+
+    def function_seconds(self):
+        return self.__function_seconds
+
+    def module_nodes(self):
+        return self.__module_nodes
+
+    def module_seconds(self):
+        return self.__module_seconds
+
+    def settings(self):
+        """
+        Returns:
+            dict[str, object]: The value of every lever by the name of its
+                argument.
+        """
+        return {
+            "heap_policy": self.__heap_policy,
+            "heap_depth": self.__heap_depth,
+            "loop_iterations": self.__loop_iterations,
+            "max_union_size": self.__max_union_size,
+            "function_nodes": self.__function_nodes,
+            "function_seconds": self.__function_seconds,
+            "module_nodes": self.__module_nodes,
+            "module_seconds": self.__module_seconds,
+        }
+
+    def replace(self, **overrides):
+        """
+        Args:
+            **overrides: Levers to change, by the name of their argument.
+
+        Returns:
+            Profile: A copy of this profile with some levers changed.
+        """
+        settings = self.settings()
+        for key in overrides:
+            if key not in settings:
+                raise RuntimeError("Unknown profile setting '{}'".format(key))
+        settings.update(overrides)
+        return Profile(self.__name, **settings)
+
+    def budget(self):
+        """
+        Returns:
+            budget.Budget
+        """
+        from budget import Budget
+        return Budget(function_nodes=self.__function_nodes,
+                      function_seconds=self.__function_seconds,
+                      module_nodes=self.__module_nodes,
+                      module_seconds=self.__module_seconds)
+
+    def create_heap(self):
+        """
+        Returns:
+            heap.ClassHeap: A new heap of the policy of this profile.
+        """
+        from heap import create_heap
+        return create_heap(self.__heap_policy, self.__heap_depth)
+
+    def create_session(self, budget=None, **kwargs):
+        """
+        Args:
+            budget (Optional[budget.Budget]): Replaces the budget of this
+                profile.
+            **kwargs: Other arguments of the session.
+
+        Returns:
+            session.AnalysisSession: A new session configured by this profile.
+        """
+        from session import AnalysisSession
+        return AnalysisSession(budget=budget or self.budget(),
+                               heap=self.create_heap(), profile=self,
+                               **kwargs)
+
+    def __repr__(self):
+        return "Profile({}, {})".format(
+            self.__name,
+            ", ".join("{}={}".format(k, v) for k, v in self.settings().items()))
+
+
+DEFAULT_PROFILE = Profile()
+
+PROFILES = {
+    "fast": Profile("fast", heap_policy="class", loop_iterations=1,
+                    max_union_size=4, function_nodes=2000,
+                    function_seconds=1.0, module_seconds=10.0),
+    "balanced": Profile("balanced", heap_policy="site", loop_iterations=3,
+                        max_union_size=16, function_seconds=10.0,
+                        module_seconds=60.0),
+    "precise": Profile("precise", heap_policy="context", heap_depth=2,
+                       loop_iterations=10, function_seconds=60.0,
+                       module_seconds=600.0),
+}
+
+
+def get_profile(name, **overrides):
+    """
+    Args:
+        name (str): A key of PROFILES.
+        **overrides: Levers to change, by the name of their argument. None
+            values keep the lever of the profile.
+
+    Returns:
+        Profile
+    """
+    if name not in PROFILES:
+        raise RuntimeError("Unknown profile '{}'".format(name))
+    overrides = {k: v for k, v in overrides.items() if v is not None}
+    if not overrides:
+        return PROFILES[name]
+    return PROFILES[name].replace(**overrides)
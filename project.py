@@ -0,0 +1,623 @@
+"""
+Whole project analysis.
+
+Modules of a project are analyzed in waves following the import graph. All
+modules in a wave only import modules from earlier waves (or each other if
+they import each other), so a wave can be spread over a process pool. Each
+finished module is reduced to a summary (the same format as summary packs)
+that is shipped to the workers of later waves, so imports of project modules
+do not have to be analyzed again.
+
+With a summary cache, only the modules changed between two git revisions and
+the modules that import them (directly or not) are analyzed again:
+
+    python -m project src --base origin/main --head HEAD --cache-dir .types
+
+The working tree is expected to be checked out at the head revision. Modules
+with uncommitted changes are analyzed again, but the cache is only updated
+from a clean tree.
+"""
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+
+
+"""
+Import graph
+"""
+
+
+def module_name_from_path(path, root):
+    """
+    Args:
+        path (str): Path of a python file under the root.
+        root (str)
+
+    Returns:
+        str: The dotted module name.
+    """
+    rel = os.path.relpath(path, root)
+    parts = rel[:-len(".py")].split(os.sep)
+    if parts[-1] == "__init__" and len(parts) > 1:
+        parts.pop()
+    return ".".join(parts)
+
+
+def discover_modules(root):
+    """
+    Find the python files under a directory.
+
+    Returns:
+        dict[str, str]: Module name -> path
+    """
+    modules = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in sorted(filenames):
+            if filename.endswith(".py"):
+                path = os.path.join(dirpath, filename)
+                modules[module_name_from_path(path, root)] = path
+    return modules
+
+
+def imported_names(node, module_name, is_package=False):
+    """
+    Names of all the modules a module imports, including the packages they
+    are in, since importing a module runs the __init__ of each of its
+    packages.
+
+    Args:
+        node (ast.Module)
+        module_name (str): Used to resolve relative imports.
+        is_package (bool): The module is the __init__ of a package, so its
+            relative imports are resolved in the package itself.
+
+    Returns:
+        set[str]
+    """
+    package = module_name.split(".")
+    if not is_package:
+        package.pop()
+    names = set()
+
+    def add(parts):
+        for i in range(1, len(parts) + 1):
+            names.add(".".join(parts[:i]))
+
+    for n in ast.walk(node):
+        if isinstance(n, ast.Import):
+            for alias in n.names:
+                add(alias.name.split("."))
+        elif isinstance(n, ast.ImportFrom):
+            base = package[:len(package) - n.level + 1] if n.level else []
+            if n.module:
+                base = base + n.module.split(".")
+            add(base)
+            for alias in n.names:
+                add(base + [alias.name])
+    return names
+
+
+def module_imports(name, modules):
+    """
+    Returns:
+        set[str]: Names of the project modules a module imports.
+    """
+    path = modules[name]
+    with open(path, "r") as f:
+        try:
+            node = ast.parse(f.read(), filename=path)
+        except SyntaxError:
+            return set()
+    is_package = os.path.basename(path) == "__init__.py"
+    return {imp for imp in imported_names(node, name, is_package)
+            if imp in modules and imp != name}
+
+
+def import_graph(modules, known=None):
+    """
+    Args:
+        modules (dict[str, str]): Module name -> path
+        known (Optional[dict[str, set[str]]]): Imports already found for some
+            modules. Only the imports of the other modules are parsed.
+
+    Returns:
+        dict[str, set[str]]: Module name -> names of the project modules it
+            imports.
+    """
+    known = known or {}
+    graph = {}
+    for name in modules:
+        if name in known:
+            graph[name] = {imp for imp in known[name] if imp in modules}
+        else:
+            graph[name] = module_imports(name, modules)
+    return graph
+
+
+def dependents(graph, names):
+    """
+    Args:
+        graph (dict[str, set[str]]): Module name -> modules it imports.
+        names (Iterable[str])
+
+    Returns:
+        set[str]: The names and every module that imports any of them
+            directly or through other modules.
+    """
+    importers = {}
+    for name, imports in graph.items():
+        for imp in imports:
+            importers.setdefault(imp, set()).add(name)
+
+    found = set(names)
+    stack = list(found)
+    while stack:
+        for importer in importers.get(stack.pop(), ()):
+            if importer not in found:
+                found.add(importer)
+                stack.append(importer)
+    return found
+
+
+def strongly_connected_components(graph):
+    """
+    Tarjan's algorithm, iteratively so deep import chains do not hit the
+    recursion limit.
+
+    Returns:
+        list[list[str]]
+    """
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+
+    for start in sorted(graph):
+        if start in index:
+            continue
+        work = [(start, iter(sorted(graph[start])))]
+        index[start] = lowlink[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(sorted(graph[child]))))
+                    break
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+
+    return components
+
+
+def topological_waves(graph):
+    """
+    Group modules so every module only depends on modules from earlier
+    waves. Modules that import each other end up in the same wave.
+
+    Returns:
+        list[list[str]]: Each wave is sorted.
+    """
+    components = strongly_connected_components(graph)
+    component_of = {}
+    for i, component in enumerate(components):
+        for name in component:
+            component_of[name] = i
+
+    depth = {}
+    # Tarjan emits components after every component they depend on
+    for i, component in enumerate(components):
+        deps = {component_of[dep] for name in component for dep in graph[name]}
+        deps.discard(i)
+        depth[i] = 1 + max((depth[d] for d in deps), default=-1)
+
+    waves = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+    for i, component in enumerate(components):
+        waves[depth[i]].extend(component)
+    return [sorted(wave) for wave in waves]
+
+
+"""
+Analysis
+"""
+
+
+def analyze_module_file(name, path, dependency_summaries):
+    """
+    Analyze a single module. This runs inside worker processes.
+
+    Args:
+        name (str)
+        path (str)
+        dependency_summaries (str): Json serialized summaries of the modules
+            this module imports.
+
+    Returns:
+        tuple[str, dict[str, list[str]], Optional[str]]: The module name, its
+            summary, and the error that stopped its analysis if any.
+    """
+    from inference import ModuleEnv
+    from session import AnalysisSession
+    from summary_pack import types_descriptors
+
+    session = AnalysisSession()
+    for dep_name, summary in json.loads(dependency_summaries).items():
+        session.register_summary(dep_name, summary)
+
+    env = ModuleEnv(module_location=path, session=session)
+    error = None
+    try:
+        with open(path, "r") as f:
+            env.parse_code(f.read())
+    except Exception as e:
+        error = "{}: {}".format(type(e).__name__, e)
+
+    summary = {var: types_descriptors(types)
+               for var, types in sorted(env.module_variables().items())}
+    return name, summary, error
+
+
+class ProjectResult:
+    def __init__(self, summaries, errors):
+        """
+        Args:
+            summaries (dict[str, dict[str, list[str]]])
+            errors (dict[str, str])
+        """
+        self.__summaries = summaries
+        self.__errors = errors
+
+    def summaries(self):
+        return self.__summaries
+
+    def errors(self):
+        return self.__errors
+
+    def to_json(self):
+        return json.dumps({"summaries": self.__summaries,
+                           "errors": self.__errors},
+                          sort_keys=True, separators=(",", ":"))
+
+
+class ProjectAnalyzer:
+    def __init__(self, root, workers=1, graph=None):
+        """
+        Args:
+            root (str): Directory containing the project modules.
+            workers (int): Number of processes to analyze modules in. With 1
+                worker, modules are analyzed in this process.
+            graph (Optional[dict[str, set[str]]]): Imports already known for
+                some modules, like those of a summary cache.
+        """
+        self.__root = os.path.abspath(root)
+        self.__workers = workers
+        self.__modules = discover_modules(self.__root)
+        self.__graph = import_graph(self.__modules, known=graph)
+
+    def root(self):
+        return self.__root
+
+    def modules(self):
+        return self.__modules
+
+    def graph(self):
+        return self.__graph
+
+    def waves(self):
+        return topological_waves(self.__graph)
+
+    def dependency_summaries(self, name, summaries):
+        deps = {dep: summaries[dep] for dep in sorted(self.__graph[name])
+                if dep in summaries}
+        return json.dumps(deps, sort_keys=True, separators=(",", ":"))
+
+    def analyze(self, names=None, summaries=None, errors=None):
+        """
+        Args:
+            names (Optional[set[str]]): Modules to analyze. Defaults to all of
+                them.
+            summaries (Optional[dict[str, dict[str, list[str]]]]): Summaries
+                of the modules that are not analyzed.
+            errors (Optional[dict[str, str]]): Errors of the modules that are
+                not analyzed.
+
+        Returns:
+            ProjectResult
+        """
+        summaries = {name: summary for name, summary in (summaries or {}).items()
+                     if name in self.__modules}
+        errors = {name: error for name, error in (errors or {}).items()
+                  if name in self.__modules}
+        waves = self.waves()
+        if names is not None:
+            for name in names:
+                errors.pop(name, None)
+            waves = [[name for name in wave if name in names] for wave in waves]
+
+        if self.__workers <= 1:
+            for wave in waves:
+                for name in wave:
+                    result = analyze_module_file(
+                        name, self.__modules[name],
+                        self.dependency_summaries(name, summaries))
+                    self.__merge(result, summaries, errors)
+        else:
+            with ProcessPoolExecutor(max_workers=self.__workers) as executor:
+                for wave in waves:
+                    futures = [executor.submit(
+                        analyze_module_file, name, self.__modules[name],
+                        self.dependency_summaries(name, summaries))
+                        for name in wave]
+                    # Merge in wave order regardless of completion order
+                    for future in futures:
+                        self.__merge(future.result(), summaries, errors)
+
+        return ProjectResult(
+            {name: summaries[name] for name in sorted(summaries)},
+            {name: errors[name] for name in sorted(errors)}
+        )
+
+    def __merge(self, result, summaries, errors):
+        name, summary, error = result
+        summaries[name] = summary
+        if error is not None:
+            errors[name] = error
+
+
+"""
+Changed files
+"""
+
+
+def git(root, *args):
+    """
+    Run a git command in a directory.
+
+    Returns:
+        str: Its output.
+    """
+    proc = subprocess.run(["git"] + list(args), cwd=root,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+    if proc.returncode != 0:
+        raise RuntimeError("git {} failed: {}".format(
+            " ".join(args), proc.stderr.strip()))
+    return proc.stdout
+
+
+def resolve_revision(root, revision):
+    """
+    Returns:
+        str: The commit hash of a revision.
+    """
+    return git(root, "rev-parse", "--verify", revision + "^{commit}").strip()
+
+
+def changed_modules(root, base, head):
+    """
+    Modules added, modified, or deleted between two revisions.
+
+    Args:
+        root (str): Directory containing the project modules. It can be
+            anywhere inside the git work tree.
+        base (str)
+        head (str)
+
+    Returns:
+        set[str]: Module names relative to the root.
+    """
+    root = os.path.abspath(root)
+    output = git(root, "diff", "--name-only", "--relative", "--no-renames",
+                 base, head, "--", "*.py")
+    return {module_name_from_path(os.path.join(root, path), root)
+            for path in output.splitlines() if path.endswith(".py")}
+
+
+def dirty_modules(root):
+    """
+    Modules of the work tree that differ from the commit checked out:
+    modified, deleted, or untracked and not ignored.
+
+    Args:
+        root (str): Directory containing the project modules.
+
+    Returns:
+        set[str]: Module names relative to the root.
+    """
+    root = os.path.abspath(root)
+    output = git(root, "diff", "--name-only", "--relative", "--no-renames",
+                 "HEAD", "--", "*.py")
+    output += git(root, "ls-files", "--others", "--exclude-standard",
+                  "--", "*.py")
+    return {module_name_from_path(os.path.join(root, path), root)
+            for path in output.splitlines() if path.endswith(".py")}
+
+
+class SummaryCache:
+    """
+    Summaries, errors, and imports of every module of a project as they were
+    at one revision, kept in a json file between runs.
+    """
+
+    VERSION = 1
+    FILENAME = "project.json"
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory (str): Created when the cache is saved.
+        """
+        self.__path = os.path.join(directory, self.FILENAME)
+        self.__revision = None
+        self.__summaries = {}
+        self.__errors = {}
+        self.__graph = {}
+        self.load()
+
+    def revision(self):
+        return self.__revision
+
+    def summaries(self):
+        return self.__summaries
+
+    def errors(self):
+        return self.__errors
+
+    def graph(self):
+        return self.__graph
+
+    def load(self):
+        """Read the cache. A missing, broken or outdated file is empty."""
+        try:
+            with open(self.__path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != self.VERSION:
+            return
+        self.__revision = data["revision"]
+        self.__summaries = data["summaries"]
+        self.__errors = data["errors"]
+        self.__graph = {name: set(imports)
+                        for name, imports in data["imports"].items()}
+
+    def save(self, revision, result, graph):
+        """
+        Args:
+            revision (str): Commit hash the result is for.
+            result (ProjectResult)
+            graph (dict[str, set[str]])
+        """
+        self.__revision = revision
+        self.__summaries = result.summaries()
+        self.__errors = result.errors()
+        self.__graph = graph
+
+        os.makedirs(os.path.dirname(self.__path), exist_ok=True)
+        tmp = self.__path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({
+                "version": self.VERSION,
+                "revision": revision,
+                "summaries": self.__summaries,
+                "errors": self.__errors,
+                "imports": {name: sorted(imports)
+                            for name, imports in sorted(graph.items())},
+            }, f, sort_keys=True, separators=(",", ":"))
+        os.replace(tmp, self.__path)
+
+
+def analyze_changes(root, base, head, cache_dir, workers=1):
+    """
+    Analyze the modules changed between two revisions and the modules that
+    depend on them. Everything else comes from the cache, which is updated
+    to the head revision.
+
+    If the cache is not for the base revision, every module is analyzed.
+    Modules with uncommitted changes are analyzed too, but then the result
+    is not the head revision and the cache is left as it was.
+
+    Returns:
+        tuple[ProjectResult, set[str]]: The result for the whole project and
+            the names of the modules that were analyzed.
+    """
+    cache = SummaryCache(cache_dir)
+    base_revision = resolve_revision(root, base)
+    head_revision = resolve_revision(root, head)
+    dirty = dirty_modules(root)
+
+    if cache.revision() != base_revision:
+        analyzer = ProjectAnalyzer(root, workers=workers)
+        names = set(analyzer.modules())
+    else:
+        changed = changed_modules(root, base_revision, head_revision) | dirty
+        known = {name: imports for name, imports in cache.graph().items()
+                 if name not in changed}
+        analyzer = ProjectAnalyzer(root, workers=workers, graph=known)
+
+        # Importers of deleted modules are only in the cached graph
+        old, new = cache.graph(), analyzer.graph()
+        graph = {name: old.get(name, set()) | new.get(name, set())
+                 for name in old.keys() | new.keys()}
+        names = dependents(graph, changed)
+        names |= analyzer.modules().keys() - cache.summaries().keys()
+        names &= analyzer.modules().keys()
+
+    result = analyzer.analyze(names, summaries=cache.summaries(),
+                              errors=cache.errors())
+    if not dirty:
+        cache.save(head_revision, result, analyzer.graph())
+    return result, names
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m project",
+        description="Analyze the modules of a project in import order.")
+    parser.add_argument("root", help="Directory containing the modules.")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="Number of worker processes.")
+    parser.add_argument("--base",
+                        help="Only analyze modules changed since this git "
+                             "revision and the modules importing them.")
+    parser.add_argument("--head", default="HEAD",
+                        help="Revision the work tree is at. Defaults to HEAD.")
+    parser.add_argument("--cache-dir", default=".python-type-inference",
+                        help="Directory summaries are kept in between runs.")
+    return parser
+
+
+def main(argv=None):
+    args = create_parser().parse_args(argv)
+
+    if args.base is None:
+        result = ProjectAnalyzer(args.root, workers=args.workers).analyze()
+        analyzed = set(result.summaries())
+    else:
+        result, analyzed = analyze_changes(args.root, args.base, args.head,
+                                           args.cache_dir, workers=args.workers)
+
+    for name in sorted(analyzed):
+        record = {"module": name, "summary": result.summaries()[name]}
+        if name in result.errors():
+            record["error"] = result.errors()[name]
+        sys.stdout.write(json.dumps(record, sort_keys=True))
+        sys.stdout.write("\n")
+    sys.stderr.write("{} of {} modules analyzed, {} failed\n".format(
+        len(analyzed), len(result.summaries()),
+        len(set(result.errors()) & analyzed)))
+    return 1 if result.errors() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
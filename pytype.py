@@ -1,4 +1,33 @@
+import threading
+
+from types import MappingProxyType
+
+from shape import ROOT_SHAPE
+from type_set import EMPTY_TYPES, TYPE_SETS, type_set
+
+
+# Shared read only mapping for empty attributes and variables
+EMPTY_ATTRS = MappingProxyType({})
+
+# Times types were added to the attributes or contents of a type, or to a
+# variable bound before. Loops compare it to tell if their body changed
+# anything outside of the variables of their env.
+_MUTATIONS = [0]
+
+
+def mutations():
+    return _MUTATIONS[0]
+
+
+def mutated():
+    _MUTATIONS[0] += 1
+
+
 class PyType:
+    # Types are allocated for every call and iteration, so none of them keep
+    # a __dict__. Subclasses declare the private attributes they set.
+    __slots__ = ("__name", "__shape", "__values", "__parents", "__frozen")
+
     NEW_METHOD = "__new__"
     INIT_METHOD = "__init__"
     DEL_METHOD = "__del__"
@@ -46,12 +75,76 @@ class PyType:
         assert isinstance(name, str)
 
         self.__name = name
-        self.__attrs = init_attrs or {}  # dict[str, set[PyType]]
-        self.__parents = parents or []
+        # The types of the attributes of this type in the order of its shape.
+        # Types without attributes share the empty tuple.
+        self.__shape = ROOT_SHAPE
+        self.__values = ()  # list[TypeSet]
+        self.__parents = parents or ()
+        self.__frozen = False
+
+        for attr, types in (init_attrs or EMPTY_ATTRS).items():
+            self.__add_attr(attr, types)
+
+    def freeze(self, frozen=None):
+        """
+        Make this type and every type reachable from its parents and
+        attributes read only. Attributes set on a frozen type afterwards are
+        kept in an overlay of the current session, so frozen types can be
+        shared by every analysis.
+
+        Args:
+            frozen (Optional[set[int]]): Ids of the types already frozen in
+                this pass.
+        """
+        frozen = set() if frozen is None else frozen
+        if id(self) in frozen:
+            return
+        frozen.add(id(self))
+
+        self.__frozen = True
+        for parent in self.__parents:
+            parent.freeze(frozen)
+        for types in self.__values:
+            for t in types:
+                t.freeze(frozen)
+
+    def is_frozen(self):
+        return self.__frozen
+
+    def __overlay(self, create=False):
+        """
+        Returns:
+            Optional[dict[str, TypeSet]]: The attributes set on this type in
+                the current session if it is frozen.
+        """
+        if not self.__frozen:
+            return None
+        from session import current_session
+        return current_session().attr_overlay(self, create=create)
 
     def parents(self):
         return self.__parents
 
+    def shape(self):
+        return self.__shape
+
+    def __add_attr(self, attr, types):
+        """Add an attribute this type does not have yet."""
+        self.__shape = self.__shape.with_attr(attr)
+        if not self.__values:
+            self.__values = []
+        # Attribute types are replaced, never changed, so reads share them
+        self.__values.append(type_set(types))
+
+    def __own_attr(self, attr):
+        """
+        Returns:
+            Optional[TypeSet]: The types of an attribute set on this type and
+                not its parents.
+        """
+        i = self.__shape.index(attr)
+        return None if i is None else self.__values[i]
+
     def name(self):
         """
         The name of this type. This is equivalent to the result
@@ -62,30 +155,73 @@ class PyType:
     def attrs(self):
         """
         Returns:
-            dict[str, set[PyType]]
+            dict[str, TypeSet]: A new dict of the types of every attribute.
+                The types are shared with this type and its parents.
         """
         attrs = {}
 
         for parent in self.parents():
             for attr, types in parent.attrs().items():
                 if attr in attrs:
-                    attrs[attr] |= types
+                    attrs[attr] = attrs[attr] | types
                 else:
-                    attrs[attr] = set(types)
+                    attrs[attr] = types
 
-        for attr, types in self.__attrs.items():
-            if attr in attrs:
-                attrs[attr] |= types
-            else:
-                attrs[attr] = set(types)
+        own_attrs = [zip(self.__shape.names(), self.__values)]
+        overlay = self.__overlay()
+        if overlay:
+            own_attrs.append(overlay.items())
+
+        for own in own_attrs:
+            for attr, types in own:
+                if attr in attrs:
+                    attrs[attr] = attrs[attr] | types
+                else:
+                    attrs[attr] = types
 
         return attrs
 
+    def lookup_attr(self, attr):
+        """
+        The types of one attribute from this type and its parents. This is
+        attrs().get(attr) without merging every other attribute.
+
+        Returns:
+            Optional[TypeSet]: The types, or None if neither this type nor
+                its parents have the attribute.
+        """
+        found = None
+        for parent in self.parents():
+            types = parent.lookup_attr(attr)
+            if types is not None:
+                if found is None:
+                    found = types
+                else:
+                    found = found | types
+
+        own = [self.__own_attr(attr)]
+        overlay = self.__overlay()
+        if overlay:
+            own.append(overlay.get(attr))
+
+        for types in own:
+            if types is not None:
+                if found is None:
+                    found = types
+                else:
+                    found = found | types
+        return found
+
     def has_attr(self, attr):
-        return attr in self.attrs()
+        if self.exclusive_has_attr(attr):
+            return True
+        return any(parent.has_attr(attr) for parent in self.parents())
 
     def exclusive_has_attr(self, attr):
-        return attr in self.__attrs
+        if self.__shape.index(attr) is not None:
+            return True
+        overlay = self.__overlay()
+        return bool(overlay) and attr in overlay
 
     def is_type(self, other):
         """
@@ -106,17 +242,33 @@ class PyType:
     """
 
     def set_attr(self, attr, types):
-        assert isinstance(types, set)
+        assert isinstance(types, TYPE_SETS)
         assert all(isinstance(x, PyType) for x in types)
 
-        if self.exclusive_has_attr(attr):
-            self.__attrs[attr] |= types
+        if self.__frozen:
+            attrs = self.__overlay(create=True)
+            old = attrs.get(attr, EMPTY_TYPES)
+            new = old | types
+            if new is not old:
+                attrs[attr] = new
+                mutated()
+            return
+
+        i = self.__shape.index(attr)
+        if i is None:
+            self.__add_attr(attr, types)
+            mutated()
         else:
-            self.__attrs[attr] = set(types)
+            old = self.__values[i]
+            new = old | types
+            if new is not old:
+                self.__values[i] = new
+                mutated()
 
     def get_attr(self, attr):
-        if self.has_attr(attr):
-            return self.attrs()[attr]
+        types = self.lookup_attr(attr)
+        if types is not None:
+            return types
         else:
             from class_type import ClassType
             if isinstance(self, ClassType):
@@ -384,6 +536,24 @@ class PyType:
     def call_next(self, args):
         return self.call_attr(self.NEXT_METHOD, args)
 
+    def element_types(self):
+        """
+        The types of the values this type yields when iterated over. Builtin
+        containers know these without calling __iter__ and __next__, which
+        is only done for other types.
+
+        Equivalent to: [x for x in self]
+
+        Returns:
+            set[PyType]: Not to be changed by the caller.
+        """
+        from arguments import empty_args
+
+        types = set()
+        for iter_t in self.call_iter(empty_args()):
+            types |= iter_t.call_next(empty_args())
+        return types
+
     def __ne__(self, other):
         return not (self == other)
 
@@ -404,51 +574,42 @@ def load_buultin_constants():
     }
 
 
+_builtin_vars = None
+_builtin_vars_lock = threading.Lock()
+
+
 def load_builtin_vars():
-    from function_type import BuiltinFunction
-    from instance_type import InstanceType
-    from tuple_type import TUPLE_CLASS
-    from dict_type import DICT_CLASS
+    """
+    The builtin universe is built and frozen the first time it is needed and
+    shared afterwards, so creating an environment does not construct any
+    types and forked workers share the builtin types with their parent.
+
+    Returns:
+        MappingProxyType[str, TypeSet]: Read only.
+    """
+    global _builtin_vars
+    if _builtin_vars is None:
+        with _builtin_vars_lock:
+            if _builtin_vars is None:
+                _builtin_vars = create_builtin_vars()
+    return _builtin_vars
+
+
+def create_builtin_vars():
+    # builtin_types must be imported before tuple_type to avoid a circular
+    # import through generator_type
     from builtin_types import (
         INT_CLASS, FLOAT_CLASS, BOOL_CLASS, STR_CLASS, FILE_CLASS,
-        NONE_TYPE, INT_TYPE, FILE_TYPE, BOOL_TYPE, STR_TYPE
+        NONE_CLASS, BYTES_CLASS, SLICE_CLASS, LIST_CLASS
     )
-
+    from builtin_functions import PRINT_FUNCTION, INPUT_FUNCTION
+    from tuple_type import TUPLE_CLASS, EMPTY_TUPLE
+    from dict_type import DICT_CLASS
+    from generator_type import GENERATOR_CLASS
+    from exception_type import EXCEPTION_CLASS
     from value_error_type import VALUE_ERROR_CLASS
-
-
-    """
-    Builtin functions
-    """
-    class PrintFunction(BuiltinFunction):
-        def __init__(self):
-            super().__init__(
-                "print",
-                vararg="objects",
-                kwonlyargs=["sep", "end", "file", "flush"],
-                kwonly_defaults=[
-                    {STR_TYPE},
-                    {STR_TYPE},
-                    {FILE_TYPE},
-                    {BOOL_TYPE},
-                ]
-            )
-
-        def call(self, args):
-            return {NONE_TYPE}
-    print_func = PrintFunction()
-
-
-    class InputFunction(BuiltinFunction):
-        def __init__(self):
-            super().__init__(
-                "input",
-                keywords=["prompt"],
-                keyword_defaults=[{STR_TYPE}],
-            )
-        def call(self, args):
-            return {STR_TYPE}
-    input_func = InputFunction()
+    from unknown_type import UNKNOWN_CLASS
+    from module_type import BUILTIN_MODULES
 
     builtins = {
         "int": {INT_CLASS},
@@ -457,12 +618,24 @@ def load_builtin_vars():
         "str": {STR_CLASS},
         "tuple": {TUPLE_CLASS},
         "dict": {DICT_CLASS},
-        "print": {print_func},
-        "input": {input_func},
+        "print": {PRINT_FUNCTION},
+        "input": {INPUT_FUNCTION},
 
         "ValueError": {VALUE_ERROR_CLASS},
     }
     builtins.update(load_buultin_constants())
 
-    return builtins
+    # Builtin types that are not builtin names are shared just the same
+    universe = [
+        FILE_CLASS, NONE_CLASS, BYTES_CLASS, SLICE_CLASS, LIST_CLASS,
+        GENERATOR_CLASS, EXCEPTION_CLASS, UNKNOWN_CLASS, EMPTY_TUPLE,
+    ]
+    universe += BUILTIN_MODULES.values()
+    for types in builtins.values():
+        universe += types
+
+    frozen = set()
+    for t in universe:
+        t.freeze(frozen)
 
+    return MappingProxyType({name: type_set(types) for name, types in builtins.items()})
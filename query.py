@@ -0,0 +1,216 @@
+"""
+Demand driven queries for the types of a single variable.
+
+Instead of interpreting a whole module, only the statements that can affect
+the queried binding are interpreted: the statements defining the scope the
+variable is in, everything that may call into that scope, and the
+dependencies of both.
+
+    >>> query(source, "func", "x")
+    >>> query(source, "A.method", "self")
+    >>> query(source, "", "CONSTANT")
+"""
+
+import ast
+import hashlib
+
+from definition_index import DefinitionIndex
+
+
+def split_scope_path(scope_path):
+    """
+    Args:
+        scope_path (Union[str, Iterable[str]]): Either dot separated names
+            or a sequence of names. The empty string is the module scope.
+
+    Returns:
+        tuple[str]
+    """
+    if isinstance(scope_path, str):
+        return tuple(name for name in scope_path.split(".") if name)
+    return tuple(scope_path)
+
+
+class ModuleQueries:
+    """
+    State kept between queries on the same module source.
+    """
+    def __init__(self, source, module_location=None, session=None):
+        self.__index = DefinitionIndex(ast.parse(source))
+        self.__module_location = module_location
+        self.__session = session
+        self.__env = None
+        self.__parsed = []  # Indexes of interpreted statements in order
+
+    def index(self):
+        return self.__index
+
+    def caller_names(self, name):
+        """
+        Names whose definitions may end up calling into the given name.
+
+        Returns:
+            set[str]: Includes the name itself.
+        """
+        names = {name}
+        pending = [name]
+        while pending:
+            for stmt in self.__index.users(pending.pop()):
+                for defined in stmt.defines() - names:
+                    names.add(defined)
+                    pending.append(defined)
+        return names
+
+    def relevant_statements(self, scope, varname):
+        """
+        Returns:
+            list[definition_index.TopLevelStatement]
+        """
+        if not scope:
+            return self.__index.dependency_slice([varname])
+
+        names = self.caller_names(scope[0])
+        stmts = {}
+        for name in names:
+            for stmt in self.__index.users(name):
+                stmts[stmt.index()] = stmt
+        for stmt in self.__index.dependency_slice(names):
+            stmts[stmt.index()] = stmt
+        return [stmts[i] for i in sorted(stmts)]
+
+    def env(self, stmts):
+        """
+        Get a module environment where at least the given statements were
+        interpreted.
+
+        The environment from previous queries is reused if the new statements
+        all come after the ones already interpreted. Otherwise a new
+        environment is created so the statements are still interpreted in the
+        same order as a full run would.
+        """
+        from inference import ModuleEnv
+
+        parsed = set(self.__parsed)
+        missing = [stmt for stmt in stmts if stmt.index() not in parsed]
+        if not missing and self.__env is not None:
+            return self.__env
+
+        if (self.__env is None or
+                (self.__parsed and missing[0].index() < self.__parsed[-1])):
+            indexes = sorted(parsed | {stmt.index() for stmt in stmts})
+            self.__env = ModuleEnv(module_location=self.__module_location,
+                                   session=self.__session)
+            self.__parsed = []
+            missing = [self.__index.statements()[i] for i in indexes]
+
+        for stmt in missing:
+            self.__env.parse(stmt.node())
+            self.__parsed.append(stmt.index())
+        return self.__env
+
+    def query(self, scope, varname):
+        """
+        Returns:
+            set[pytype.PyType]
+        """
+        env = self.env(self.relevant_statements(scope, varname))
+        if not scope:
+            return set(env.exclusive_lookup(varname))
+
+        types = set()
+        for scope_env in scope_envs(env, scope, varname):
+            if varname in scope_env.variables():
+                types |= scope_env.exclusive_lookup(varname)
+        return types
+
+
+def scope_envs(module_env, scope, varname):
+    """
+    Find the environments of the functions a scope path refers to.
+
+    Args:
+        module_env (inference.ModuleEnv)
+        scope (tuple[str])
+        varname (str): The variable that will be looked up in them.
+
+    Returns:
+        list[inference.Environment]
+    """
+    from function_type import FunctionType
+    from class_type import ClassType
+
+    candidates = set(module_env.exclusive_lookup(scope[0]))
+    for name in scope[1:]:
+        found = set()
+        for t in candidates:
+            if isinstance(t, ClassType):
+                found |= t.get_attr(name)
+            elif isinstance(t, FunctionType):
+                func_env = function_body_env(t, name)
+                if name in func_env.variables():
+                    found |= func_env.exclusive_lookup(name)
+        candidates = found
+
+    return [function_body_env(t, varname) for t in candidates
+            if isinstance(t, FunctionType)]
+
+
+def function_body_env(func, name):
+    """
+    The environment of a function that should contain a name assigned in
+    its body. Bodies are only interpreted when the function is called, so
+    interpret it once more if the name is missing.
+    """
+    env = func.env()
+    if name not in env.variables() and func.ref_node() is not None:
+        func.returns()
+    return env
+
+
+class QueryEngine:
+    """
+    Answers queries and memoizes the results for the lifetime of the engine.
+    """
+    def __init__(self, session=None):
+        """
+        Args:
+            session (Optional[session.AnalysisSession]): The session modules
+                are analyzed in. Defaults to a new session.
+        """
+        from session import AnalysisSession
+        self.__session = session or AnalysisSession()
+        self.__modules = {}  # dict[str, ModuleQueries]
+        self.__results = {}  # dict[tuple, set[pytype.PyType]]
+
+    def module_queries(self, module_source, module_location=None):
+        key = hashlib.sha1(module_source.encode("utf-8")).hexdigest()
+        if key not in self.__modules:
+            self.__modules[key] = ModuleQueries(
+                module_source, module_location, session=self.__session)
+        return key, self.__modules[key]
+
+    def query(self, module_source, scope_path, varname, module_location=None):
+        """
+        Args:
+            module_source (str)
+            scope_path (Union[str, Iterable[str]])
+            varname (str)
+            module_location (Optional[str])
+
+        Returns:
+            set[pytype.PyType]
+        """
+        scope = split_scope_path(scope_path)
+        key, queries = self.module_queries(module_source, module_location)
+        result_key = (key, scope, varname)
+        if result_key not in self.__results:
+            with self.__session.activate():
+                self.__results[result_key] = queries.query(scope, varname)
+        return self.__results[result_key]
+
+
+def query(module_source, scope_path, varname, module_location=None):
+    """Query using the engine of the current session."""
+    from session import current_session
+    return current_session().query_engine().query(
+        module_source, scope_path, varname, module_location=module_location)
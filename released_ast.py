@@ -0,0 +1,174 @@
+"""
+Function bodies dropped from the AST.
+
+AST nodes take far more memory than the source they were parsed from. Once
+the types of a function can no longer change, its body can be replaced by
+the span of its source, and parsed again from that span if the function is
+interpreted again, like a closure that escaped and is called later.
+
+The span is kept on the FunctionDef node itself since every FunctionType
+created from the same definition shares the node.
+
+The top level statements of a module can also be parsed one at a time from
+their spans, so the tree of the whole module never exists at once.
+"""
+
+import ast
+import io
+import tokenize
+
+
+SPAN_ATTR = "released_span"
+
+
+def is_released(node):
+    return hasattr(node, SPAN_ATTR)
+
+
+def release_body(node, lines):
+    """
+    Drop the body of a function definition.
+
+    Args:
+        node (ast.FunctionDef)
+        lines (list[str]): Lines of the module the node was parsed from,
+            including line endings. The list is shared and not copied.
+
+    Returns:
+        bool: Whether the body was dropped.
+    """
+    if is_released(node) or getattr(node, "end_lineno", None) is None:
+        return False
+    setattr(node, SPAN_ATTR, (lines, node.lineno, node.end_lineno, node.col_offset))
+    node.body = []
+    return True
+
+
+def restore_body(node):
+    """Parse the body of a released function definition from its span."""
+    lines, start, end, col = getattr(node, SPAN_ATTR)
+    segment = "".join(lines[start - 1:end])
+    if col:
+        # Nested in a block so the lines keep their indentation, and the
+        # contents of multiline strings stay the same
+        parsed = ast.parse("if 1:\n" + segment).body[0].body[0]
+        ast.increment_lineno(parsed, start - 2)
+    else:
+        parsed = ast.parse(segment).body[0]
+        ast.increment_lineno(parsed, start - 1)
+
+    node.body = parsed.body
+    delattr(node, SPAN_ATTR)
+
+
+def function_body(node):
+    """
+    Returns:
+        list[ast.stmt]: The body of a function definition, parsed again if it
+            was released.
+    """
+    if is_released(node):
+        restore_body(node)
+    return node.body
+
+
+def release_types(types, lines, seen=None):
+    """
+    Release the bodies of the functions in a set of types, the functions in
+    their environments, and the methods of classes.
+
+    Args:
+        types (Iterable[pytype.PyType])
+        lines (list[str])
+        seen (Optional[set[int]]): Ids of the types already visited.
+
+    Returns:
+        int: Number of bodies released.
+    """
+    from class_type import ClassType
+    from function_type import FunctionType
+
+    seen = set() if seen is None else seen
+    released = 0
+    for t in types:
+        if id(t) in seen:
+            continue
+        seen.add(id(t))
+
+        if isinstance(t, FunctionType) and t.ref_node() is not None:
+            released += release_body(t.ref_node(), lines)
+            # An evicted environment would be rebuilt by reading it
+            if not t.evicted():
+                for var_types in t.env().variables().values():
+                    released += release_types(var_types, lines, seen)
+        elif isinstance(t, ClassType):
+            for attr_types in t.attrs().values():
+                released += release_types(attr_types, lines, seen)
+    return released
+
+
+"""
+Top level statements
+"""
+
+
+# Lines at the top level that continue the statement before them
+CONTINUATION_KEYWORDS = frozenset(["else", "elif", "except", "finally"])
+
+
+def statement_spans(code):
+    """
+    Split a module into the spans of its top level statements without
+    parsing it. Statements sharing a line (like a = 1; b = 2) share a span.
+
+    Returns:
+        list[tuple[int, int]]: First and last line of each span.
+
+    Raises:
+        SyntaxError: The code could not be tokenized.
+    """
+    starts = []
+    depth = 0
+    line_start = True
+    after_decorator = False
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(code).readline):
+            if tok.type == tokenize.INDENT:
+                depth += 1
+            elif tok.type == tokenize.DEDENT:
+                depth -= 1
+            elif tok.type == tokenize.NEWLINE:
+                line_start = True
+            elif tok.type in (tokenize.NL, tokenize.COMMENT, tokenize.ENDMARKER):
+                pass
+            elif line_start:
+                line_start = False
+                if depth:
+                    continue
+                continues = after_decorator or (
+                    tok.type == tokenize.NAME and tok.string in CONTINUATION_KEYWORDS)
+                if not continues:
+                    starts.append(tok.start[0])
+                after_decorator = tok.type == tokenize.OP and tok.string == "@"
+    except (tokenize.TokenError, IndentationError) as e:
+        raise SyntaxError(str(e))
+
+    last = code.count("\n") + (0 if code.endswith("\n") else 1)
+    return [(start, end - 1) for start, end in zip(starts, starts[1:] + [last + 1])]
+
+
+def parse_span(lines, span):
+    """
+    Parse the statements in a span of lines of a module.
+
+    Args:
+        lines (list[str])
+        span (tuple[int, int])
+
+    Returns:
+        list[ast.stmt]: With the line numbers they have in the module.
+    """
+    start, end = span
+    tree = ast.parse("".join(lines[start - 1:end]))
+    ast.increment_lineno(tree, start - 1)
+    return tree.body
@@ -0,0 +1,238 @@
+"""
+Analysis sessions.
+
+A session owns all state that changes during an analysis and is not part of
+the types of a single module: loaded modules, registered summaries, memoized
+queries, the owners of bound methods, the environments of builtin functions
+while they are called, attributes set on the frozen builtin types, the
+nodes charged to the analysis budget, the function environments kept in
+memory, the instances allocated by its heap, and the results of evaluated
+expressions. Its profile sets how much precision the analysis trades for
+speed. Every session is independent, so separate analyses can run on
+separate threads without affecting each other.
+
+The session an analysis runs in is held in a context variable. ModuleEnv
+activates its session while it parses, and code deeper in the analysis finds
+it with current_session(). Outside of any active session, each thread has a
+default session of its own.
+"""
+
+import contextlib
+import contextvars
+import threading
+
+
+_active_session = contextvars.ContextVar("active_session", default=None)
+_thread_defaults = threading.local()
+
+
+def current_session():
+    """
+    Returns:
+        AnalysisSession: The active session, or the default session of the
+            current thread if none is active.
+    """
+    session = _active_session.get()
+    if session is not None:
+        return session
+
+    session = getattr(_thread_defaults, "session", None)
+    if session is None:
+        session = AnalysisSession()
+        _thread_defaults.session = session
+    return session
+
+
+class AnalysisSession:
+    def __init__(self, search_path=None, budget=None, function_pool=None,
+                 heap=None, profile=None, memoize=True):
+        """
+        Args:
+            search_path (Optional[list[str]]): Directories searched for source
+                modules before sys.path.
+            budget (Optional[budget.Budget]): Limits of the analysis. Defaults
+                to unlimited.
+            function_pool (Optional[function_pool.FunctionEnvPool]): Evicts
+                function environments. Defaults to keeping all of them.
+            heap (Optional[heap.ClassHeap]): Decides which allocations share
+                an instance. Defaults to one instance per class.
+            profile (Optional[profiles.Profile]): Loop iterations and
+                widening of the analysis. Defaults to interpreting loops once
+                and never widening. Use Profile.create_session() for a
+                session whose budget and heap follow the profile too.
+            memoize (bool): Keep the results of evaluated expressions whose
+                inputs did not change. Turn off for debugging.
+        """
+        from budget import BudgetMeter
+        from eval_memo import EvalMemo
+        from function_pool import FunctionEnvPool
+        from heap import ClassHeap
+        from profiles import DEFAULT_PROFILE
+
+        self.__search_path = list(search_path or [])
+        self.__budget_meter = BudgetMeter(budget)
+        self.__function_pool = function_pool or FunctionEnvPool()
+        self.__heap = heap or ClassHeap()
+        self.__profile = profile or DEFAULT_PROFILE
+        self.__eval_memo = EvalMemo(enabled=memoize)
+        self.__summaries = {}  # dict[str, dict[str, list[str]]]
+        self.__summary_modules = {}  # dict[str, module_type.ModuleType]
+        self.__source_modules = {}  # dict[str, module_type.ModuleType]
+        self.__query_engine = None
+        self.__method_owners = {}  # dict[FunctionType, InstanceType]
+        self.__builtin_call_envs = {}  # dict[FunctionType, list[Environment]]
+        self.__attr_overlays = {}  # dict[int, dict[str, set[PyType]]]
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Make this the session returned by current_session()."""
+        token = _active_session.set(self)
+        try:
+            yield self
+        finally:
+            _active_session.reset(token)
+
+    """
+    Modules
+    """
+
+    def search_path(self):
+        return self.__search_path
+
+    def add_search_path(self, directory):
+        if directory not in self.__search_path:
+            self.__search_path.insert(0, directory)
+
+    def register_summary(self, name, summary):
+        """
+        Make a module summary available to load_module() in this session,
+        replacing any summary of the module from the packs.
+
+        Args:
+            name (str)
+            summary (dict[str, list[str]])
+        """
+        self.__summaries[name] = summary
+        self.__summary_modules.pop(name, None)
+
+    def registered_summary(self, name):
+        """
+        Returns:
+            Optional[dict[str, list[str]]]
+        """
+        return self.__summaries.get(name)
+
+    def summary_modules(self):
+        """
+        Returns:
+            dict[str, module_type.ModuleType]: Modules already created from
+                summaries, by module name.
+        """
+        return self.__summary_modules
+
+    def source_modules(self):
+        """
+        Returns:
+            dict[str, module_type.ModuleType]: Modules loaded from source, by
+                location.
+        """
+        return self.__source_modules
+
+    """
+    Queries
+    """
+
+    def query_engine(self):
+        if self.__query_engine is None:
+            from query import QueryEngine
+            self.__query_engine = QueryEngine(session=self)
+        return self.__query_engine
+
+    """
+    Budgets
+    """
+
+    def budget_meter(self):
+        return self.__budget_meter
+
+    """
+    Memory
+    """
+
+    def function_pool(self):
+        return self.__function_pool
+
+    def heap(self):
+        return self.__heap
+
+    """
+    Precision
+    """
+
+    def profile(self):
+        return self.__profile
+
+    def eval_memo(self):
+        return self.__eval_memo
+
+    """
+    Frozen types
+    """
+
+    def attr_overlay(self, pytype, create=False):
+        """
+        Attributes set on a frozen type in this session. Frozen types live as
+        long as the process, so they are keyed by id.
+
+        Args:
+            pytype (pytype.PyType)
+            create (bool): Create an empty overlay if there is none yet.
+
+        Returns:
+            Optional[dict[str, type_set.TypeSet]]
+        """
+        if create:
+            return self.__attr_overlays.setdefault(id(pytype), {})
+        return self.__attr_overlays.get(id(pytype))
+
+    """
+    Calls
+    """
+
+    def bind_method(self, func, owner):
+        self.__method_owners[func] = owner
+
+    def unbind_method(self, func):
+        self.__method_owners.pop(func, None)
+
+    def method_owner(self, func):
+        """
+        Returns:
+            Optional[instance_type.InstanceType]
+        """
+        return self.__method_owners.get(func)
+
+    @contextlib.contextmanager
+    def builtin_call(self, func, env):
+        """
+        Use an environment for the arguments of a builtin function for the
+        duration of one call so calls do not accumulate argument types in an
+        environment shared by every analysis.
+        """
+        stack = self.__builtin_call_envs.setdefault(func, [])
+        stack.append(env)
+        try:
+            yield env
+        finally:
+            stack.pop()
+            if not stack:
+                del self.__builtin_call_envs[func]
+
+    def builtin_call_env(self, func):
+        """
+        Returns:
+            Optional[inference.Environment]: The environment of the innermost
+                call to a builtin function.
+        """
+        stack = self.__builtin_call_envs.get(func)
+        return stack[-1] if stack else None
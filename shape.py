@@ -0,0 +1,101 @@
+"""
+Layouts of the attributes set on a type, shared like the hidden classes of
+JavaScript engines.
+
+A type starts with the empty shape and moves to a child shape each time an
+attribute it does not have is set, keeping the types of its attributes in a
+list in the order the shape gives. Types that set the same attributes in the
+same order, like the instances of classes whose __init__ methods assign the
+same names, end up with the same shape, so the names and their positions are
+stored once.
+
+A shape and its first child share one list of names and one index of their
+positions, and the child only appends its attribute to them. A shape reads
+the first len(shape) names, so the names its descendants added are ignored.
+Only a second child of the same shape copies them. Children are weakly
+referenced, so shapes go away with the last type or child using them, like
+the types of a finished analysis.
+"""
+
+import threading
+import weakref
+
+
+# Shapes are shared by every analysis in the process, and the names and
+# index of a shape with those of its descendants
+_LOCK = threading.Lock()
+
+
+class Shape:
+    __slots__ = ("__parent", "__length", "__names", "__index", "__transitions",
+                 "__weakref__")
+
+    def __init__(self, parent=None, attr=None):
+        """
+        Args:
+            parent (Optional[Shape]): The shape this one adds an attribute to.
+            attr (Optional[str]): The attribute added.
+        """
+        # Keeps the shared names alive for as long as this shape
+        self.__parent = parent
+        if parent is None:
+            self.__length = 0
+            self.__names = []  # list[str]
+            self.__index = {}  # dict[str, int]
+        else:
+            self.__length = len(parent) + 1
+            self.__names, self.__index = parent.__extend(attr)
+        self.__transitions = weakref.WeakValueDictionary()  # dict[str, Shape]
+
+    def __extend(self, attr):
+        """
+        Returns:
+            tuple[list[str], dict[str, int]]: The names and index of a child
+                adding an attribute, shared with this shape unless a
+                descendant already added to them.
+        """
+        names = self.__names
+        index = self.__index
+        if len(names) != self.__length:
+            names = names[:self.__length]
+            index = {name: i for i, name in enumerate(names)}
+        names.append(attr)
+        index[attr] = self.__length
+        return names, index
+
+    def names(self):
+        """
+        Returns:
+            tuple[str]: Attributes in the order they were added.
+        """
+        return tuple(self.__names[:self.__length])
+
+    def index(self, attr):
+        """
+        Returns:
+            Optional[int]: Position of the types of an attribute in the
+                values of a type with this shape.
+        """
+        i = self.__index.get(attr)
+        return i if i is not None and i < self.__length else None
+
+    def with_attr(self, attr):
+        """
+        Returns:
+            Shape: The shape of a type with this shape once an attribute is
+                added to it.
+        """
+        child = self.__transitions.get(attr)
+        if child is None:
+            with _LOCK:
+                child = self.__transitions.get(attr)
+                if child is None:
+                    child = Shape(self, attr)
+                    self.__transitions[attr] = child
+        return child
+
+    def __len__(self):
+        return self.__length
+
+
+ROOT_SHAPE = Shape()
@@ -0,0 +1,326 @@
+"""
+Precomputed summaries of modules.
+
+Interpreting a module like os or collections from source is slow and usually
+runs into nodes this package does not handle yet. Instead, the public
+attributes of those modules are summarized once into a pack (a json file
+mapping module name -> attribute -> type descriptors) that load_module() checks
+before touching any source.
+
+Build the default pack with:
+
+    python summary_pack.py
+
+or summarize specific modules with:
+
+    python summary_pack.py os collections -o summary_packs/mine.json
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import threading
+import types
+
+from function_type import BuiltinFunction, FunctionType
+from class_type import ClassType
+from module_type import ModuleType, SummaryModuleType
+
+
+PACK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "summary_packs")
+PACK_VERSION = 1
+
+DEFAULT_MODULES = (
+    "abc", "argparse", "bisect", "collections", "copy", "csv", "datetime",
+    "enum", "fnmatch", "functools", "glob", "heapq", "io", "itertools",
+    "json", "logging", "operator", "os", "os.path", "pathlib", "pickle",
+    "posixpath", "random", "re", "shutil", "string", "struct", "subprocess",
+    "sys", "tempfile", "textwrap", "time", "typing", "unittest",
+)
+
+UNKNOWN_DESCRIPTOR = "unknown"
+FUNCTION_DESCRIPTOR = "function"
+CLASS_PREFIX = "class:"
+MODULE_PREFIX = "module:"
+
+
+"""
+Descriptors
+
+A descriptor is the string form of a single pytype. Summaries only need to be
+precise enough to keep analysis going past an import, so anything that cannot
+be described is stored as unknown.
+"""
+
+
+def value_descriptor(value):
+    """
+    Describe a python object found while importing a module.
+
+    Returns:
+        str
+    """
+    if value is None:
+        return "None"
+    # bool is a subclass of int so it must be checked first
+    for py_type in (bool, int, float, str, bytes, list, tuple, dict):
+        if isinstance(value, py_type):
+            return py_type.__name__
+    if isinstance(value, types.ModuleType):
+        return MODULE_PREFIX + value.__name__
+    if isinstance(value, type):
+        return CLASS_PREFIX + value.__name__
+    if callable(value):
+        return FUNCTION_DESCRIPTOR
+    return UNKNOWN_DESCRIPTOR
+
+
+def type_descriptor(t):
+    """
+    Describe a pytype produced by the analysis.
+
+    Args:
+        t (pytype.PyType)
+
+    Returns:
+        str
+    """
+    if isinstance(t, FunctionType):
+        return FUNCTION_DESCRIPTOR
+    elif isinstance(t, ClassType):
+        return CLASS_PREFIX + t.defined_name()
+    elif isinstance(t, ModuleType):
+        return MODULE_PREFIX + t.defined_name()
+    return t.name()
+
+
+def types_descriptors(types):
+    """
+    Returns:
+        list[str]: Sorted and without duplicates so summaries are stable.
+    """
+    return sorted({type_descriptor(t) for t in types})
+
+
+def types_from_descriptors(descriptors, name=None):
+    """
+    Inverse of types_descriptors().
+
+    Args:
+        descriptors (list[str])
+        name (Optional[str]): The attribute name the types are for. Used to
+            name summarized functions.
+
+    Returns:
+        set[pytype.PyType]
+    """
+    from builtin_types import (
+        INT_TYPE, FLOAT_TYPE, BOOL_TYPE, STR_TYPE, BYTES_TYPE, NONE_TYPE,
+        FILE_TYPE, SLICE_TYPE, LIST_CLASS
+    )
+    from tuple_type import TUPLE_CLASS
+    from dict_type import DICT_CLASS
+    from unknown_type import UNKNOWN_TYPE
+
+    simple = {
+        "int": INT_TYPE,
+        "float": FLOAT_TYPE,
+        "bool": BOOL_TYPE,
+        "str": STR_TYPE,
+        "bytes": BYTES_TYPE,
+        "None": NONE_TYPE,
+        "file": FILE_TYPE,
+        "slice": SLICE_TYPE,
+    }
+
+    types = set()
+    for desc in descriptors:
+        if desc in simple:
+            types.add(simple[desc])
+        elif desc == "list":
+            types.add(LIST_CLASS.instance())
+        elif desc == "tuple":
+            types.add(TUPLE_CLASS.create_tuple())
+        elif desc == "dict":
+            types.add(DICT_CLASS.instance().new_container())
+        elif desc == FUNCTION_DESCRIPTOR:
+            types.add(SummaryFunction(name or FUNCTION_DESCRIPTOR))
+        elif desc.startswith(CLASS_PREFIX):
+            types.add(SummaryClass(desc[len(CLASS_PREFIX):]))
+        elif desc.startswith(MODULE_PREFIX):
+            mod_t = load_summary_module(desc[len(MODULE_PREFIX):])
+            types.add(mod_t or UNKNOWN_TYPE)
+        else:
+            types.add(UNKNOWN_TYPE)
+    return types
+
+
+"""
+Summarized pytypes
+"""
+
+
+class SummaryFunction(BuiltinFunction):
+    """Function whose body was not available. Accepts anything."""
+    def __init__(self, defined_name):
+        super().__init__(defined_name, vararg="args", kwarg="kwargs")
+
+    def call(self, args):
+        from unknown_type import UNKNOWN_TYPE
+        return {UNKNOWN_TYPE}
+
+
+class SummaryClass(ClassType):
+    """Class known only by name. Its instances are unknown."""
+    def call(self, args):
+        from unknown_type import UNKNOWN_TYPE
+        return {UNKNOWN_TYPE}
+
+
+"""
+Loading packs
+"""
+
+_pack_lock = threading.Lock()
+_pack_summaries = None  # dict[str, dict[str, list[str]]], read only once loaded
+
+
+def read_pack(path):
+    """
+    Returns:
+        dict[str, dict[str, list[str]]]: Module name -> attribute -> descriptors
+    """
+    with open(path, "r") as f:
+        pack = json.load(f)
+    if pack.get("version") != PACK_VERSION:
+        return {}
+    return pack["modules"]
+
+
+def load_summaries(pack_dir=PACK_DIR):
+    summaries = {}
+    if os.path.isdir(pack_dir):
+        for filename in sorted(os.listdir(pack_dir)):
+            if filename.endswith(".json"):
+                summaries.update(read_pack(os.path.join(pack_dir, filename)))
+    return summaries
+
+
+def pack_summaries():
+    """
+    The summaries from every pack. These are loaded once and shared by all
+    sessions, so they must not be modified.
+
+    Returns:
+        dict[str, dict[str, list[str]]]
+    """
+    global _pack_summaries
+    if _pack_summaries is None:
+        with _pack_lock:
+            if _pack_summaries is None:
+                _pack_summaries = load_summaries()
+    return _pack_summaries
+
+
+def module_summary(name):
+    """
+    Summaries registered in the current session take precedence over packs.
+
+    Returns:
+        Optional[dict[str, list[str]]]
+    """
+    from session import current_session
+    summary = current_session().registered_summary(name)
+    if summary is None:
+        summary = pack_summaries().get(name)
+    return summary
+
+
+def load_summary_module(name):
+    """
+    Returns:
+        Optional[module_type.ModuleType]: None if no summary of this module
+            exists.
+    """
+    from session import current_session
+    loaded = current_session().summary_modules()
+    if name in loaded:
+        return loaded[name]
+
+    summary = module_summary(name)
+    if summary is None:
+        return None
+
+    mod_t = SummaryModuleType(name, summary, types_from_descriptors)
+    loaded[name] = mod_t
+    return mod_t
+
+
+"""
+Building packs
+"""
+
+
+def summarize_module(name):
+    """
+    Import a module and describe each of its public attributes.
+
+    Returns:
+        dict[str, list[str]]
+    """
+    mod = importlib.import_module(name)
+    public = getattr(mod, "__all__", None)
+    if public is None:
+        public = [attr for attr in dir(mod) if not attr.startswith("_")]
+
+    summary = {}
+    for attr in sorted(public):
+        try:
+            value = getattr(mod, attr)
+        except AttributeError:
+            continue
+        summary[attr] = [value_descriptor(value)]
+    return summary
+
+
+def build_pack(names):
+    """
+    Returns:
+        dict: The json serializable pack.
+    """
+    modules = {}
+    for name in names:
+        try:
+            modules[name] = summarize_module(name)
+        except ImportError:
+            continue
+    return {
+        "version": PACK_VERSION,
+        "python": "{}.{}".format(*sys.version_info[:2]),
+        "modules": modules,
+    }
+
+
+def write_pack(pack, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(pack, f, sort_keys=True, separators=(",", ":"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build module summary packs.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES,
+                        help="Modules to summarize.")
+    parser.add_argument("-o", "--output",
+                        default=os.path.join(PACK_DIR, "stdlib.json"),
+                        help="Where to write the pack.")
+    args = parser.parse_args()
+    write_pack(build_pack(args.modules), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+import unittest
+
+from analyze import main, expand_paths, EXIT_OK, EXIT_ANALYSIS_ERROR, EXIT_USAGE
+
+
+class TestAnalyzeCommand(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmpdir.name, "out.jsonl")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read_records(self):
+        with open(self.output, "r") as f:
+            return [json.loads(line) for line in f]
+
+    def test_expand_paths(self):
+        """Test directories and globs expand to python files."""
+        self.assertEqual(
+            expand_paths(["samples", "samples/f*.py"]),
+            ["samples/degrees.py", "samples/disemvowel.py", "samples/fib.py"]
+        )
+
+    def test_records(self):
+        """Test one record is written per variable in each scope."""
+        code = main(["samples/fib.py", "-o", self.output])
+        self.assertEqual(code, EXIT_OK)
+        self.assertIn(
+            {"module": "samples/fib.py", "scope": "fib", "variable": "n",
+             "types": ["int"], "line": 1},
+            self.read_records()
+        )
+
+    def test_expr_types(self):
+        """Test the types of expressions are written with --expr-types."""
+        self.assertEqual(main(["samples/fib.py", "-o", self.output]), EXIT_OK)
+        self.assertFalse(any("expr_types" in r for r in self.read_records()))
+
+        code = main(["samples/fib.py", "--expr-types", "-o", self.output])
+        self.assertEqual(code, EXIT_OK)
+        records = [r for r in self.read_records() if "expr_types" in r]
+        self.assertEqual(len(records), 1)
+        # n < 2
+        self.assertEqual(records[0]["expr_types"][:3], [[2, 7, 2, 12, ["bool"]],
+                                                         [2, 7, 2, 8, ["int"]],
+                                                         [2, 11, 2, 12, ["int"]]])
+
+    def test_analysis_error(self):
+        """Test files that cannot be analyzed are reported."""
+        bad = os.path.join(self.tmpdir.name, "bad.py")
+        with open(bad, "w") as f:
+            f.write("with open('x') as f:\n    pass\n")
+        code = main([bad, "samples/fib.py", "-j", "2", "-o", self.output])
+        self.assertEqual(code, EXIT_ANALYSIS_ERROR)
+
+        errors = [r for r in self.read_records() if "error" in r]
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0]["module"], bad)
+
+    def test_no_files(self):
+        """Test nothing to analyze is a usage error."""
+        self.assertEqual(main([self.tmpdir.name]), EXIT_USAGE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+import textwrap
+import unittest
+
+from inference import ModuleEnv
+from builtin_types import *
+from analyze import main, EXIT_OK
+from budget import Budget, NODES, TIME, MODULE_NODES
+from session import AnalysisSession
+from unknown_type import UNKNOWN_TYPE
+
+
+def long_function(name, statements):
+    return "def {}(a):\n".format(name) + "".join(
+        "    x{} = a + {}\n".format(i, i) for i in range(statements)) + "    return a\n"
+
+
+class TestBudget(unittest.TestCase):
+    def create_module_env(self, code, budget):
+        session = AnalysisSession(budget=budget)
+        env = ModuleEnv(session=session)
+        env.parse_code(textwrap.dedent(code))
+        return env, session.budget_meter()
+
+    def first(self, container):
+        self.assertEqual(len(container), 1)
+        return next(iter(container))
+
+    def test_function_nodes(self):
+        """Test a function over its node budget returns unknown."""
+        code = long_function("slow", 50) + textwrap.dedent("""
+            def fast(a):
+                return a
+            x = slow(1)
+            y = fast(1)
+            z = slow(2)
+        """)
+        env, meter = self.create_module_env(code, Budget(function_nodes=40))
+
+        self.assertSetEqual(env.lookup("x"), {UNKNOWN_TYPE})
+        self.assertSetEqual(env.lookup("y"), {INT_TYPE})
+        self.assertSetEqual(env.lookup("z"), {UNKNOWN_TYPE})
+
+        slow = self.first(env.lookup("slow"))
+        self.assertEqual(meter.exhausted_functions(), {slow: NODES})
+
+    def test_nodes_of_callees_not_charged(self):
+        """Test the node budget of a call excludes the functions it calls."""
+        code = long_function("inner", 5) + textwrap.dedent("""
+            def outer(a):
+                b = inner(a)
+                c = inner(a)
+                return b
+            x = outer(1)
+        """)
+        env, meter = self.create_module_env(code, Budget(function_nodes=40))
+        self.assertSetEqual(env.lookup("x"), {INT_TYPE})
+        self.assertEqual(meter.exhausted_functions(), {})
+
+    def test_function_time(self):
+        """Test a function over its time budget returns unknown."""
+        code = long_function("slow", 50) + "x = slow(1)\n"
+        env, meter = self.create_module_env(code, Budget(function_seconds=0.0))
+        self.assertSetEqual(env.lookup("x"), {UNKNOWN_TYPE})
+        self.assertEqual(list(meter.exhausted_functions().values()), [TIME])
+
+    def test_module_nodes(self):
+        """Test functions return unknown once the module budget ran out."""
+        code = long_function("first", 20) + long_function("second", 20) + textwrap.dedent("""
+            x = first(1)
+            y = second(1)
+            z = 'after'
+        """)
+        env, meter = self.create_module_env(code, Budget(module_nodes=120))
+        self.assertSetEqual(env.lookup("x"), {INT_TYPE})
+        self.assertSetEqual(env.lookup("y"), {UNKNOWN_TYPE})
+        self.assertSetEqual(env.lookup("z"), {STR_TYPE})
+        self.assertEqual(meter.module_exhausted(), MODULE_NODES)
+
+    def test_unlimited(self):
+        """Test nothing is given up on, or counted, without a budget."""
+        code = long_function("slow", 50) + "x = slow(1)\n"
+        env, meter = self.create_module_env(code, None)
+        self.assertSetEqual(env.lookup("x"), {INT_TYPE})
+        self.assertFalse(meter.limited())
+        self.assertEqual(meter.nodes(), 0)
+
+    def test_counted(self):
+        """Test nodes are counted under a budget."""
+        code = long_function("slow", 50) + "x = slow(1)\n"
+        env, meter = self.create_module_env(code, Budget(module_nodes=10 ** 6))
+        self.assertSetEqual(env.lookup("x"), {INT_TYPE})
+        self.assertGreater(meter.nodes(), 50)
+
+
+class TestBudgetCommand(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "mod.py")
+        self.output = os.path.join(self.tmpdir.name, "out.jsonl")
+        with open(self.path, "w") as f:
+            f.write(long_function("slow", 50) + "x = slow(1)\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_flagged(self):
+        """Test functions that ran out of budget are flagged."""
+        code = main([self.path, "-o", self.output, "--function-nodes", "40"])
+        self.assertEqual(code, EXIT_OK)
+        with open(self.output, "r") as f:
+            records = {r["variable"]: r for r in map(json.loads, f)
+                       if r["scope"] == ""}
+        self.assertEqual(records["slow"]["exhausted"], NODES)
+        self.assertEqual(records["x"]["types"], ["unknown"])
+        self.assertNotIn("exhausted", records["x"])
+
+
+if __name__ == "__main__":
+    unittest.main()
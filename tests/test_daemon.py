@@ -0,0 +1,132 @@
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from analyze import analyze_file, analysis_kwargs
+import daemon
+
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.socket = os.path.join(self.tmpdir.name, "daemon.sock")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def start(self, idle_timeout=30):
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "daemon", "--socket", self.socket,
+             "serve", "--idle-timeout", str(idle_timeout)],
+            cwd=REPO)
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            try:
+                daemon.request({"op": "ping"}, socket_path=self.socket)
+                return proc
+            except OSError:
+                time.sleep(0.05)
+        proc.kill()
+        self.fail("The daemon did not start")
+
+    def test_analyze_in_daemon(self):
+        """Test the daemon returns the same records as analyzing in process."""
+        proc = self.start()
+        try:
+            path = os.path.join(REPO, "samples", "fib.py")
+            self.assertEqual(
+                daemon.analyze(path, socket_path=self.socket),
+                analyze_file(path, **analysis_kwargs({}))
+            )
+            # Options reach the worker
+            options = {"profile": "fast", "function_nodes": 1}
+            path, records, error = daemon.analyze(
+                path, socket_path=self.socket, options=options)
+            self.assertTrue(any("exhausted" in record for record in records))
+            self.assertEqual((path, records, error),
+                             analyze_file(path, **analysis_kwargs(options)))
+        finally:
+            daemon.request({"op": "shutdown"}, socket_path=self.socket)
+            proc.wait(timeout=30)
+        self.assertFalse(os.path.exists(self.socket))
+
+    def test_second_daemon(self):
+        """Test a daemon does not start while another one answers."""
+        proc = self.start()
+        try:
+            second = subprocess.run(
+                [sys.executable, "-m", "daemon", "--socket", self.socket,
+                 "serve"],
+                cwd=REPO, stderr=subprocess.PIPE, timeout=30)
+            self.assertEqual(second.returncode, 2)
+            self.assertEqual(daemon.request({"op": "ping"}, socket_path=self.socket),
+                             {"ok": True})
+        finally:
+            daemon.request({"op": "shutdown"}, socket_path=self.socket)
+            proc.wait(timeout=30)
+
+    def test_stale_socket(self):
+        """Test the socket of a daemon that is gone is replaced."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(self.socket)
+        proc = self.start()
+        daemon.request({"op": "shutdown"}, socket_path=self.socket)
+        self.assertEqual(proc.wait(timeout=30), 0)
+
+    def test_default_socket(self):
+        """Test the default socket is in a directory only the user can access."""
+        runtime_dir = os.environ.pop("XDG_RUNTIME_DIR", None)
+        tempdir = tempfile.tempdir
+        tempfile.tempdir = self.tmpdir.name
+        try:
+            path = daemon.default_socket()
+            directory = os.path.dirname(path)
+            self.assertEqual(os.path.dirname(directory), self.tmpdir.name)
+            self.assertEqual(os.stat(directory).st_mode & 0o777, 0o700)
+
+            os.chmod(directory, 0o755)
+            with self.assertRaises(RuntimeError):
+                daemon.default_socket()
+
+            os.environ["XDG_RUNTIME_DIR"] = self.tmpdir.name
+            self.assertEqual(daemon.default_socket(),
+                             os.path.join(self.tmpdir.name, daemon.SOCKET_NAME))
+        finally:
+            tempfile.tempdir = tempdir
+            if runtime_dir is None:
+                os.environ.pop("XDG_RUNTIME_DIR", None)
+            else:
+                os.environ["XDG_RUNTIME_DIR"] = runtime_dir
+
+    def test_idle_timeout(self):
+        """Test the daemon exits after not receiving requests."""
+        proc = self.start(idle_timeout=0.2)
+        self.assertEqual(proc.wait(timeout=30), 0)
+
+    def test_fallback_without_daemon(self):
+        """Test files are analyzed in process if no daemon is running."""
+        path = os.path.join(REPO, "samples", "fib.py")
+        self.assertEqual(
+            daemon.analyze(path, socket_path=self.socket),
+            analyze_file(path, **analysis_kwargs({}))
+        )
+
+    def test_no_fallback_on_timeout(self):
+        """Test a daemon that does not answer is not worked around."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(self.socket)
+            server.listen(1)
+            path = os.path.join(REPO, "samples", "fib.py")
+            with self.assertRaises(socket.timeout):
+                daemon.analyze(path, socket_path=self.socket, timeout=0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import ast
+import textwrap
+import unittest
+
+from inference import ModuleEnv
+from builtin_types import *
+from eval_memo import EvalMemo
+from session import AnalysisSession
+from type_set import TypeSet
+
+
+class TestEvalMemo(unittest.TestCase):
+    CODE = """
+        def scale(x, low):
+            return x * 2 - low
+
+        a = scale(1, 2)
+        b = scale(3, 4)
+    """
+
+    def create_module_env(self, code, memoize=True):
+        session = AnalysisSession(memoize=memoize)
+        env = ModuleEnv(session=session)
+        env.parse_code(textwrap.dedent(code))
+        return env, session.eval_memo()
+
+    def test_hits(self):
+        """Test calls with arguments of the same types reuse results."""
+        env, memo = self.create_module_env(self.CODE)
+        self.assertSetEqual(env.lookup("b"), {INT_TYPE})
+        # The result of x * 2 - low is found without evaluating x * 2
+        stats = memo.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["stores"]), (1, 2, 2))
+        self.assertAlmostEqual(stats["hit_rate"], 1 / 3)
+
+    def test_changed_variables(self):
+        """Test results are evaluated again once a variable they read changes."""
+        env, memo = self.create_module_env(self.CODE + "    c = scale(1.5, 2)\n")
+        self.assertSetEqual(env.lookup("c"), {INT_TYPE, FLOAT_TYPE})
+        self.assertEqual(memo.stats()["hits"], 1)
+        self.assertEqual(memo.stats()["misses"], 4)
+
+    def test_unfrozen_operands(self):
+        """Test operations on types that are not frozen are never kept."""
+        env, memo = self.create_module_env("""
+            class Number:
+                def __add__(self, other):
+                    return other
+
+            def add(x, y):
+                return x + y
+
+            a = add(Number(), 1)
+            b = add(Number(), 'a')
+        """)
+        self.assertSetEqual(env.lookup("b"), {INT_TYPE, STR_TYPE})
+        self.assertEqual(memo.stats()["stores"], 0)
+
+    def test_calls(self):
+        """Test operations with calls are never looked up."""
+        env, memo = self.create_module_env("""
+            def one():
+                return 1
+
+            a = one() + 1
+            b = one() + 1
+        """)
+        self.assertSetEqual(env.lookup("b"), {INT_TYPE})
+        self.assertEqual(memo.stats()["misses"], 0)
+
+    def test_entries(self):
+        """Test the names of an operation are found once, with its operands."""
+        memo = EvalMemo()
+        compare = ast.parse("-(a + b) < c * a").body[0].value
+        entry = memo.entry(compare)
+        self.assertCountEqual(entry[0], ["a", "b", "c"])
+        self.assertIs(memo.entry(compare), entry)
+        self.assertCountEqual(memo.entry(compare.left.operand)[0], ["a", "b"])
+        self.assertIsNone(memo.entry(ast.parse("a + f()").body[0].value))
+
+    def test_shared_results(self):
+        """Test results are kept and found without copies."""
+        memo = EvalMemo()
+        entry = memo.entry(ast.parse("a + 1").body[0].value)
+        memo.store(entry, (1,), {INT_TYPE})
+        found = memo.lookup(entry, (1,))
+        self.assertIsInstance(found, TypeSet)
+        self.assertIs(memo.lookup(entry, (1,)), found)
+        self.assertIsNone(memo.lookup(entry, (2,)))
+
+    def test_disabled(self):
+        """Test the memo can be turned off."""
+        env, memo = self.create_module_env(self.CODE, memoize=False)
+        self.assertSetEqual(env.lookup("b"), {INT_TYPE})
+        self.assertEqual(memo.stats(), {"hits": 0, "misses": 0, "stores": 0,
+                                        "hit_rate": 0.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import ast
+import json
+import textwrap
+import unittest
+
+from inference import ModuleEnv
+from builtin_types import *
+from node_index import NodeIndex
+
+
+class TestNodeIndex(unittest.TestCase):
+    def test_dense_ids(self):
+        """Test every expression gets the next id in source order, parents first."""
+        tree = ast.parse("a = b + 1\nc = [a]\n")
+        index = NodeIndex()
+        index.number(tree)
+        exprs = [tree.body[0].targets[0], tree.body[0].value,
+                 tree.body[0].value.left, tree.body[0].value.right,
+                 tree.body[1].targets[0], tree.body[1].value,
+                 tree.body[1].value.elts[0]]
+        self.assertEqual([index.node_id(n) for n in exprs], list(range(len(exprs))))
+        self.assertEqual(len(index), len(exprs))
+        self.assertEqual(index.at(1, 4), index.node_id(tree.body[0].value))
+        self.assertEqual(index.span(index.at(2, 4)), (2, 4, 2, 7))
+
+    def test_parsed_again(self):
+        """Test nodes parsed again from the same code keep their ids."""
+        code = "a = b + 1\n"
+        index = NodeIndex()
+        first = ast.parse(code)
+        index.number(first)
+        second = ast.parse(code)
+        self.assertEqual(index.node_id(first.body[0].value),
+                         index.node_id(second.body[0].value))
+        self.assertEqual(index.node_id(first.body[0].value.left),
+                         index.node_id(second.body[0].value.left))
+        self.assertEqual(len(index), 4)
+
+    def test_outermost(self):
+        """Test positions find the outermost expression whatever the order."""
+        tree = ast.parse("a = b.c(1)\n")
+        index = NodeIndex()
+        call = tree.body[0].value
+        for node in (call.func.value, call.func, call):
+            index.node_id(node, create=True)
+        self.assertEqual(index.at(1, 4), index.node_id(call))
+
+
+class TestExprTypes(unittest.TestCase):
+    CODE = """
+        def f(x):
+            return x + 1
+
+        a = f(1)
+        b = [a, 'b']
+    """
+
+    def create_module_env(self, code):
+        env = ModuleEnv(record_expr_types=True)
+        env.parse_code(textwrap.dedent(code))
+        return env
+
+    def test_disabled(self):
+        """Test nothing is recorded by default."""
+        env = ModuleEnv()
+        env.parse_code(textwrap.dedent(self.CODE))
+        self.assertIsNone(env.expr_types())
+
+    def test_lookup(self):
+        """Test the types of expressions by node and by position."""
+        env = self.create_module_env(self.CODE)
+        table = env.expr_types()
+        self.assertSetEqual(table.at(3, 11), {INT_TYPE})
+        self.assertSetEqual(table.at(5, 4), {INT_TYPE})
+        self.assertEqual(table.at(1, 0), None)
+
+        b, = env.lookup("b")
+        self.assertSetEqual(table.at(6, 4), {b})
+        self.assertSetEqual(table.at(6, 8), {STR_TYPE})
+
+    def test_nodes(self):
+        """Test the types of nodes of the parsed module."""
+        env = ModuleEnv(record_expr_types=True)
+        tree = ast.parse(textwrap.dedent(self.CODE))
+        env.parse_module(tree)
+        table = env.expr_types()
+        self.assertSetEqual(table.types(tree.body[1].value), {INT_TYPE})
+        # Assignment targets are not evaluated
+        self.assertEqual(table.types(tree.body[1].targets[0]), None)
+
+    def test_shared_tree(self):
+        """Test envs parsing the same tree keep tables of their own."""
+        tree = ast.parse(textwrap.dedent(self.CODE))
+        first = ModuleEnv(record_expr_types=True)
+        first.parse_code("z = [1, 2.5]\n")
+        first.parse_module(tree)
+        second = ModuleEnv(record_expr_types=True)
+        second.parse_module(tree)
+
+        node = tree.body[1].value
+        for env in (first, second):
+            self.assertSetEqual(env.expr_types().types(node), {INT_TYPE})
+        self.assertNotEqual(first.expr_types().node_index().node_id(node),
+                            second.expr_types().node_index().node_id(node))
+        self.assertEqual(first.expr_types().summary()[3:], second.expr_types().summary())
+
+    def test_source_order(self):
+        """Test ids follow the source, not the order of evaluation."""
+        env = self.create_module_env(self.CODE)
+        index = env.expr_types().node_index()
+        # The body of f is evaluated after the call below it
+        self.assertLess(index.at(3, 11), index.at(5, 4))
+        self.assertEqual(index.span(0), (3, 11, 3, 16))
+
+    def test_calls_merged(self):
+        """Test the types of a function body over all calls."""
+        env = self.create_module_env(self.CODE + "    c = f(1.5)\n")
+        self.assertSetEqual(env.expr_types().at(3, 11), {INT_TYPE, FLOAT_TYPE})
+
+    def test_released_ast(self):
+        """Test expressions of bodies parsed again keep their ids."""
+        code = textwrap.dedent(self.CODE + "    c = f(1.5)\n")
+        env = ModuleEnv(record_expr_types=True)
+        list(env.iter_parse(code, release_ast=True))
+        released = env.expr_types()
+        self.assertSetEqual(released.at(3, 11), {INT_TYPE, FLOAT_TYPE})
+
+        env = self.create_module_env(code)
+        self.assertEqual(len(released.node_index()), len(env.expr_types().node_index()))
+        self.assertEqual(released.summary(), env.expr_types().summary())
+
+    def test_summary(self):
+        """Test the table serializes like module summaries."""
+        env = self.create_module_env(self.CODE)
+        summary = json.loads(json.dumps(env.expr_types().summary()))
+        self.assertEqual(summary[:3], [[3, 11, 3, 16, ["int"]],
+                                       [3, 11, 3, 12, ["int"]],
+                                       [3, 15, 3, 16, ["int"]]])
+        self.assertEqual(summary[-1], [6, 8, 6, 11, ["str"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
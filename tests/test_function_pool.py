@@ -0,0 +1,141 @@
+import os
+import textwrap
+import tempfile
+import tracemalloc
+import unittest
+
+from inference import ModuleEnv
+from builtin_types import *
+from analyze import analyze_file
+from function_pool import FunctionEnvPool
+from session import AnalysisSession
+
+
+class TestFunctionEnvPool(unittest.TestCase):
+    CODE = """
+        def double(a):
+            total = a + a
+            return total
+
+        def twice(a):
+            first = double(a)
+            return double(first)
+
+        def label(s):
+            return s
+
+        x = twice(1)
+        y = label('a')
+        z = double(2.5)
+    """
+
+    def create_module_env(self, pool):
+        session = AnalysisSession(function_pool=pool)
+        env = ModuleEnv(session=session)
+        with session.activate():
+            env.parse_code(textwrap.dedent(self.CODE))
+        return env, session
+
+    def first(self, container):
+        self.assertEqual(len(container), 1)
+        return next(iter(container))
+
+    def test_evicted_least_recently_used(self):
+        """Test environments beyond the limit are evicted and results kept."""
+        env, session = self.create_module_env(FunctionEnvPool(max_functions=1))
+        pool = session.function_pool()
+
+        self.assertSetEqual(env.lookup("x"), {INT_TYPE})
+        self.assertSetEqual(env.lookup("y"), {STR_TYPE})
+        self.assertSetEqual(env.lookup("z"), {INT_TYPE, FLOAT_TYPE})
+        self.assertGreater(pool.stats()["evictions"], 0)
+        self.assertEqual(pool.resident(), [self.first(env.lookup("double"))])
+        self.assertTrue(self.first(env.lookup("twice")).evicted())
+
+    def test_rebuilt_on_read(self):
+        """Test reading the variables of an evicted function rebuilds them."""
+        env, session = self.create_module_env(FunctionEnvPool(max_functions=1))
+        twice = self.first(env.lookup("twice"))
+        self.assertTrue(twice.evicted())
+
+        with session.activate():
+            # Interpreted again after double() was also called with a float
+            self.assertSetEqual(twice.env().lookup("first"), {INT_TYPE, FLOAT_TYPE})
+        self.assertFalse(twice.evicted())
+        self.assertGreaterEqual(session.function_pool().stats()["rebuilds"], 1)
+
+    def test_rebuilt_on_call(self):
+        """Test calling an evicted function keeps its earlier argument types."""
+        env, session = self.create_module_env(FunctionEnvPool(max_functions=1))
+        label = self.first(env.lookup("label"))
+        self.assertTrue(label.evicted())
+
+        with session.activate():
+            env.parse_code("w = label(1)")
+            self.assertSetEqual(env.lookup("w"), {INT_TYPE, STR_TYPE})
+            self.assertSetEqual(label.env().lookup("s"), {INT_TYPE, STR_TYPE})
+
+    def test_unlimited(self):
+        """Test nothing is evicted without a limit."""
+        env, session = self.create_module_env(None)
+        self.assertEqual(session.function_pool().stats()["evictions"], 0)
+        self.assertFalse(self.first(env.lookup("twice")).evicted())
+
+    def test_max_bytes(self):
+        """Test traced memory is reported and limits the environments."""
+        was_tracing = tracemalloc.is_tracing()
+        try:
+            env, session = self.create_module_env(FunctionEnvPool(max_bytes=1, check_interval=1))
+            stats = session.function_pool().stats()
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+
+        self.assertSetEqual(env.lookup("x"), {INT_TYPE})
+        self.assertGreater(stats["evictions"], 0)
+        self.assertGreater(stats["peak_traced_bytes"], 0)
+
+    def test_analyze_file_stats(self):
+        """Test analyzing a file with a limit reports the evictions."""
+        path, records, error = analyze_file("samples/degrees.py", max_functions=1)
+        self.assertIsNone(error)
+        self.assertEqual(records[-1]["module"], path)
+        self.assertGreater(records[-1]["memory"]["evictions"], 0)
+        self.assertEqual(
+            [r for r in records[:-1] if "types" in r],
+            analyze_file("samples/degrees.py")[1]
+        )
+
+    def test_analyze_file_rebuilds(self):
+        """Test functions rebuilt while writing bindings count in the file's session."""
+        from session import current_session
+
+        default_pool = current_session().function_pool()
+        default_rebuilds = default_pool.stats()["rebuilds"]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "rebuilt.py")
+            with open(path, "w") as f:
+                f.write(textwrap.dedent("""
+                    def f(a):
+                        b = a
+                        return b
+
+                    def g(a):
+                        c = a
+                        return c
+
+                    def h(a):
+                        d = a
+                        return d
+
+                    x = f(1) + g(2) + h(3)
+                """))
+            path, records, error = analyze_file(path, max_functions=1)
+
+        self.assertIsNone(error)
+        self.assertGreater(records[-1]["memory"]["rebuilds"], 0)
+        self.assertEqual(default_pool.stats()["rebuilds"], default_rebuilds)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import textwrap
+import unittest
+
+from inference import ModuleEnv
+from builtin_types import *
+from heap import (AllocationSiteHeap, CallerContextHeap, ClassHeap,
+                  SiteInstanceType, create_heap)
+from session import AnalysisSession
+from value_error_type import VALUE_ERROR_CLASS
+
+
+class TestHeap(unittest.TestCase):
+    CODE = """
+        class Box:
+            def __init__(self, value):
+                self.value = value
+
+            def get(self):
+                return self.value
+
+        def make_box(value):
+            return Box(value)
+
+        a = Box(1)
+        b = Box('a')
+        av = a.get()
+        bv = b.get()
+        m = make_box(1.5).get()
+        n = make_box(None).get()
+        error = ValueError('e')
+    """
+
+    def create_module_env(self, heap):
+        session = AnalysisSession(heap=heap)
+        env = ModuleEnv(session=session)
+        with session.activate():
+            env.parse_code(textwrap.dedent(self.CODE))
+        return env, session
+
+    def first(self, container):
+        self.assertEqual(len(container), 1)
+        return next(iter(container))
+
+    def test_class_heap(self):
+        """Test every allocation of a class shares one instance."""
+        env, session = self.create_module_env(ClassHeap())
+        self.assertIs(self.first(env.lookup("a")), self.first(env.lookup("b")))
+        self.assertSetEqual(env.lookup("av"), {INT_TYPE, STR_TYPE})
+        self.assertSetEqual(env.lookup("n"), {INT_TYPE, STR_TYPE, FLOAT_TYPE, NONE_TYPE})
+        self.assertEqual(session.heap().stats(), {"instances": 0, "contexts": 0})
+
+    def test_allocation_site_heap(self):
+        """Test allocations at different call nodes are kept apart, and
+        allocations at the same node are not."""
+        env, session = self.create_module_env(AllocationSiteHeap())
+        a = self.first(env.lookup("a"))
+        b = self.first(env.lookup("b"))
+        self.assertIsInstance(a, SiteInstanceType)
+        self.assertNotEqual(a, b)
+        self.assertSetEqual(env.lookup("av"), {INT_TYPE})
+        self.assertSetEqual(env.lookup("bv"), {STR_TYPE})
+        self.assertSetEqual(env.lookup("n"), {FLOAT_TYPE, NONE_TYPE})
+
+        # Frozen builtin classes keep their one instance
+        self.assertSetEqual(env.lookup("error"), {VALUE_ERROR_CLASS.instance()})
+
+        # The method reports the types of every instance it ran for
+        box = self.first(env.lookup("Box"))
+        init = self.first(box.get_attr("__init__"))
+        self.assertSetEqual(init.env().lookup("value"),
+                            {INT_TYPE, STR_TYPE, FLOAT_TYPE, NONE_TYPE})
+
+    def test_caller_context_heap(self):
+        """Test allocations in a factory are kept apart by their callers."""
+        env, session = self.create_module_env(CallerContextHeap(1))
+        self.assertSetEqual(env.lookup("m"), {FLOAT_TYPE})
+        self.assertSetEqual(env.lookup("n"), {NONE_TYPE})
+        self.assertGreater(session.heap().stats()["contexts"], 0)
+
+    def test_create_heap(self):
+        self.assertIsInstance(create_heap("site"), AllocationSiteHeap)
+        self.assertEqual(create_heap("context", 3).depth(), 3)
+        self.assertRaises(RuntimeError, create_heap, "object")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import random
+import unittest
+
+from builtin_types import *
+from incremental import IncrementalModule, differential_check
+
+
+class TestIncrementalAnalysis(unittest.TestCase):
+    BASE = """
+total = 10
+
+def add(a, b):
+    total = a + b
+    return total
+
+def scale(x):
+    return x * FACTOR
+
+FACTOR = 2
+items = [1]
+items.append(total)
+r = add(1, 2)
+s = scale(1.5)
+"""
+
+    def versions(self):
+        v2 = self.BASE.replace("add(1, 2)", "add(1.0, 2)")
+        v3 = v2.replace("items.append(total)", "items.append('s')")
+        v4 = v3 + "t = add(2, 3)\n"
+        return [self.BASE, v2, v3, v4]
+
+    def test_recorded_reads(self):
+        """Test local variables do not connect statements like module names."""
+        module = IncrementalModule()
+        analyzed = []
+        for source in self.versions():
+            module.update(source)
+            analyzed.append(module.analyzed_statements())
+
+        # The first version connects add() to total by name. Once add() was
+        # seen to only read its own total, changing a call to it only
+        # interprets the function and the call.
+        self.assertEqual(analyzed, [8, 2, 3, 3])
+        self.assertSetEqual(module.types()[("add", "total")],
+                            {INT_TYPE, FLOAT_TYPE})
+        self.assertSetEqual(module.types()[("", "total")], {INT_TYPE})
+
+    def test_scripted_edits_match_cold_analysis(self):
+        """Test every version gives the same types as a cold analysis."""
+        self.assertEqual(differential_check(self.versions()), [])
+
+    def test_random_edits_match_cold_analysis(self):
+        """Test random edits of a module against cold analyses."""
+        header = [
+            "values = [1]",
+            "label = 'x'",
+            "def first(a):\n    return a",
+            "def combine(a, b):\n    result = a + b\n    return result",
+            "def wrap(x):\n    return [first(x)]",
+            "class Box:\n    def __init__(self, v):\n        self.v = v\n    def get(self):\n        return self.v",
+        ]
+        literals = ["1", "2.5", "'s'", "True", "None"]
+        numbers = ["1", "2.5"]
+        # Only statements that analyze cleanly, so every version is compared
+        pool = [
+            ("values.append({})", literals),
+            ("n = first({})", literals),
+            ("m = combine({0}, {0})", numbers),
+            ("w = wrap({})", literals),
+            ("b = Box({})", literals),
+            ("got = Box({}).get()", literals),
+            ("result = [{}]", literals),
+            ("label = first({})", literals),
+        ]
+
+        def statement(rng):
+            template, choices = rng.choice(pool)
+            return template.format(rng.choice(choices))
+
+        rng = random.Random(0)
+        body = []
+        versions = []
+        for _ in range(40):
+            action = rng.random()
+            if body and action < 0.3:
+                body.pop(rng.randrange(len(body)))
+            elif body and action < 0.5:
+                body[rng.randrange(len(body))] = statement(rng)
+            else:
+                body.insert(rng.randrange(len(body) + 1), statement(rng))
+            versions.append("\n".join(header + body) + "\n")
+
+        self.assertEqual(differential_check(versions), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
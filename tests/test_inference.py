@@ -392,6 +392,62 @@ x.b = 2
         )
 
 
+    def test_iter_parse(self):
+        """Test bindings are yielded once later statements cannot change them."""
+        code = """
+def func(a):
+    b = a
+    return b
+x = func(1)
+y = func("a")
+z = 2
+with open("file") as f:
+    pass
+"""
+        env = ModuleEnv()
+        bindings = env.iter_parse(code)
+
+        # x is final right away and func after its last call
+        found = [next(bindings) for i in range(5)]
+        self.assertEqual(
+            [(b.scope, b.name, b.lineno) for b in found],
+            [("", "x", 5), ("", "func", 2), ("func", "a", 2), ("func", "b", 3),
+             ("", "y", 6)]
+        )
+        self.assertSetEqual(found[2].types, {INT_TYPE, STR_TYPE})
+
+        # Results before the unsupported statement are still available
+        self.assertEqual(next(bindings).name, "z")
+        self.assertRaises(NotImplementedError, next, bindings)
+
+    def test_bindings(self):
+        """Test walking the bindings of a parsed module."""
+        code = """
+class A:
+    def get(self, a):
+        return a
+x = A().get(1)
+"""
+        env = ModuleEnv()
+        env.parse_code(code)
+
+        self.assertEqual(
+            [(b.scope, b.name, b.lineno) for b in env.bindings()],
+            [("", "A", 2), ("", "x", 5), ("A.get", "a", 3), ("A.get", "self", 3)]
+        )
+
+    def test_bindings_session(self):
+        """Test the functions of a module are only walked in its session."""
+        from inference import nested_bindings
+        from session import AnalysisSession
+
+        env = ModuleEnv(session=AnalysisSession())
+        env.parse_code("def f(a):\n    return a\nx = f(1)\n")
+
+        self.assertRaises(RuntimeError, list, nested_bindings("f", env.lookup("f")))
+        with env.session().activate():
+            self.assertEqual([b[1] for b in nested_bindings("f", env.lookup("f"))], ["a"])
+
 
 if __name__ == "__main__":
     unittest.main()
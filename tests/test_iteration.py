@@ -0,0 +1,80 @@
+import textwrap
+import unittest
+
+from inference import ModuleEnv
+from builtin_types import *
+from dict_type import DictType
+from generator_type import GENERATOR_CLASS
+from tuple_type import TUPLE_CLASS
+from unknown_type import UNKNOWN_TYPE
+
+
+class TestIteration(unittest.TestCase):
+    def create_module_env(self, code):
+        env = ModuleEnv()
+        env.parse_code(textwrap.dedent(code))
+        return env
+
+    def first(self, container):
+        self.assertEqual(len(container), 1)
+        return next(iter(container))
+
+    def test_builtin_containers(self):
+        """Test builtin containers know their element types."""
+        lst = LIST_CLASS.from_list([{INT_TYPE}, {STR_TYPE}])
+        self.assertIs(lst.element_types(), lst.contents())
+
+        tup = TUPLE_CLASS.create_tuple(init_contents=({INT_TYPE}, {FLOAT_TYPE}))
+        self.assertSetEqual(tup.element_types(), {INT_TYPE, FLOAT_TYPE})
+
+        self.assertSetEqual(STR_TYPE.element_types(), {STR_TYPE})
+        self.assertSetEqual(
+            DictType(key_types={STR_TYPE}, value_types={INT_TYPE}).element_types(),
+            {STR_TYPE})
+        self.assertSetEqual(
+            GENERATOR_CLASS.instance(yields={BOOL_TYPE}).element_types(),
+            {BOOL_TYPE})
+        self.assertSetEqual(UNKNOWN_TYPE.element_types(), {UNKNOWN_TYPE})
+
+    def test_for(self):
+        """Test for loops over builtin containers."""
+        env = self.create_module_env("""
+            def gen():
+                yield 1.5
+
+            for a in [1, 'a']:
+                pass
+            for b in (None, True):
+                pass
+            for c in 'abc':
+                pass
+            for d in gen():
+                pass
+        """)
+        self.assertSetEqual(env.lookup("a"), {INT_TYPE, STR_TYPE})
+        self.assertSetEqual(env.lookup("b"), {NONE_TYPE, BOOL_TYPE})
+        self.assertSetEqual(env.lookup("c"), {STR_TYPE})
+        self.assertSetEqual(env.lookup("d"), {FLOAT_TYPE})
+
+    def test_user_iterator(self):
+        """Test classes defining __iter__ still go through the magic methods."""
+        env = self.create_module_env("""
+            class Count:
+                def __iter__(self):
+                    return self
+
+                def __next__(self):
+                    return 1
+
+            for x in Count():
+                pass
+
+            l = [None]
+            l.extend(Count())
+        """)
+        self.assertSetEqual(env.lookup("x"), {INT_TYPE})
+        self.assertSetEqual(self.first(env.lookup("l")).contents(), {NONE_TYPE, INT_TYPE})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import ast
+import unittest
+
+from inference import ModuleEnv
+from builtin_types import *
+from budget import Budget
+from session import AnalysisSession
+from tuple_type import TUPLE_CLASS
+
+
+class TestLiterals(unittest.TestCase):
+    def create_module_env(self, code):
+        session = AnalysisSession()
+        env = ModuleEnv(session=session)
+        env.parse_code(code)
+        return env, session
+
+    def first(self, container):
+        self.assertEqual(len(container), 1)
+        return next(iter(container))
+
+    def test_long_tuple(self):
+        """Test long tuples of literals are run-length encoded."""
+        code = "table = ({}, 'a', 'b', None)".format(", ".join(map(str, range(1000))))
+        env, session = self.create_module_env(code)
+        table = self.first(env.lookup("table"))
+
+        self.assertEqual(table.length(), 1003)
+        self.assertEqual(len(list(table.runs())), 3)
+        contents = table.contents()
+        self.assertEqual(len(contents), 1003)
+        self.assertSetEqual(contents[0], {INT_TYPE})
+        self.assertIs(contents[0], contents[999])
+        self.assertSetEqual(contents[1001], {STR_TYPE})
+        self.assertSetEqual(contents[1002], {NONE_TYPE})
+        self.assertSetEqual(table.all_contents(), {INT_TYPE, STR_TYPE, NONE_TYPE})
+
+        # Equal to the same tuple of one set per element
+        same = TUPLE_CLASS.create_tuple(init_contents=tuple(set(t) for t in contents))
+        self.assertEqual(table, same)
+        self.assertEqual(str(table), str(same))
+
+    def test_short_tuple(self):
+        """Test tuples that do not compress keep a set per element."""
+        env, session = self.create_module_env("a = 1\nt = (1, 'a', a)\nx, y, z = t")
+        t = self.first(env.lookup("t"))
+        self.assertEqual(t.contents(), ({INT_TYPE}, {STR_TYPE}, {INT_TYPE}))
+        self.assertSetEqual(env.lookup("y"), {STR_TYPE})
+        self.assertSetEqual(env.lookup("z"), {INT_TYPE})
+
+    def test_list(self):
+        """Test lists of literals and other elements union their types."""
+        env, session = self.create_module_env("a = 1.5\nl = [1, 2, 3, 'a', a, b'b', True]")
+        self.assertSetEqual(
+            self.first(env.lookup("l")).contents(),
+            {INT_TYPE, STR_TYPE, FLOAT_TYPE, BYTES_TYPE, BOOL_TYPE})
+
+    def test_budget(self):
+        """Test literals evaluated together are still charged one node each."""
+        code = "(1, 2, 'a', -1, [3, 4])"
+        stmt = ast.parse(code).body[0]
+        node = stmt.value
+        # Unlimited budgets count nothing
+        session = AnalysisSession(budget=Budget(module_nodes=10 ** 6))
+        ModuleEnv(session=session).parse_code(code)
+
+        # Evaluating every element on its own
+        each = AnalysisSession(budget=Budget(module_nodes=10 ** 6))
+        env = ModuleEnv(session=each)
+        with each.activate():
+            env.charge(stmt)
+            env.charge(node)
+            for elt in node.elts[:-1]:
+                env.eval(elt)
+            env.charge(node.elts[-1])
+            for elt in node.elts[-1].elts:
+                env.eval(elt)
+        self.assertEqual(session.budget_meter().nodes(), each.budget_meter().nodes())
+
+
+if __name__ == "__main__":
+    unittest.main()
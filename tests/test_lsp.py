@@ -0,0 +1,134 @@
+import io
+import unittest
+
+from inference import ModuleEnv
+from builtin_types import *
+from incremental import IncrementalModule
+from lsp_server import LanguageServer, read_message, write_message
+from summary_pack import types_descriptors
+
+
+URI = "file:///tmp/example.py"
+
+
+class TestIncrementalModule(unittest.TestCase):
+    CODE = """
+def scale(x, factor=2):
+    y = x * factor
+    return y
+
+a = scale(1)
+words = ["a"]
+words.append(1)
+"""
+
+    def test_matches_cold_analysis(self):
+        """Test the types of each component match interpreting the module."""
+        module = IncrementalModule()
+        module.update(self.CODE)
+
+        env = ModuleEnv()
+        env.parse_code(self.CODE)
+        for name, types in env.module_variables().items():
+            self.assertEqual(types_descriptors(module.types()[("", name)]),
+                             types_descriptors(types))
+        self.assertSetEqual(module.types()[("scale", "y")], {INT_TYPE})
+
+    def test_only_changed_components_are_analyzed(self):
+        """Test an edit only interprets the statements connected to it."""
+        module = IncrementalModule()
+        module.update(self.CODE)
+        self.assertEqual(module.analyzed_statements(), 4)
+
+        module.update(self.CODE.replace("scale(1)", "scale(1.0)"))
+        self.assertEqual(module.analyzed_statements(), 2)
+        self.assertEqual(module.reused_statements(), 2)
+        self.assertSetEqual(module.types()[("scale", "y")], {FLOAT_TYPE})
+
+        # Moving statements does not interpret them again
+        module.update("\n\n" + self.CODE.replace("scale(1)", "scale(1.0)"))
+        self.assertEqual(module.analyzed_statements(), 0)
+
+
+class TestLanguageServer(unittest.TestCase):
+    def setUp(self):
+        self.out = io.BytesIO()
+        self.server = LanguageServer(self.out)
+        self.server.handle({"id": 0, "method": "initialize", "params": {}})
+        self.server.handle({"method": "textDocument/didOpen", "params": {
+            "textDocument": {"uri": URI, "version": 1,
+                             "text": "def f(x):\n    return x\n\ny = f(1)\n"}}})
+
+    def messages(self):
+        self.out.seek(0)
+        messages = []
+        while True:
+            message = read_message(self.out)
+            if message is None:
+                return messages
+            messages.append(message)
+
+    def response(self, msg_id):
+        return next(m for m in self.messages() if m.get("id") == msg_id)
+
+    def hover(self, msg_id, line, character):
+        self.server.handle({"id": msg_id, "method": "textDocument/hover",
+                            "params": {"textDocument": {"uri": URI},
+                                       "position": {"line": line,
+                                                    "character": character}}})
+        return self.response(msg_id)["result"]
+
+    def test_framing(self):
+        """Test messages survive being written and read."""
+        stream = io.BytesIO()
+        write_message(stream, {"jsonrpc": "2.0", "id": 1, "result": "é"})
+        stream.seek(0)
+        self.assertEqual(read_message(stream),
+                         {"jsonrpc": "2.0", "id": 1, "result": "é"})
+
+    def test_hover_after_change(self):
+        """Test hovers reflect incremental edits."""
+        self.assertIn("y: int", self.hover(1, 3, 0)["contents"]["value"])
+        self.assertIn("x: int", self.hover(2, 0, 6)["contents"]["value"])
+
+        self.server.handle({"method": "textDocument/didChange", "params": {
+            "textDocument": {"uri": URI, "version": 2},
+            "contentChanges": [{
+                "range": {"start": {"line": 3, "character": 6},
+                          "end": {"line": 3, "character": 7}},
+                "text": "'s'"}]}})
+        self.assertIn("y: str", self.hover(3, 3, 0)["contents"]["value"])
+        self.assertIsNone(self.hover(4, 2, 0))
+
+    def test_inlay_hints(self):
+        """Test a hint follows the first binding of each variable."""
+        self.server.handle({"id": 1, "method": "textDocument/inlayHint",
+                            "params": {"textDocument": {"uri": URI}}})
+        hints = {(h["position"]["line"], h["position"]["character"]): h["label"]
+                 for h in self.response(1)["result"]}
+        self.assertEqual(hints[(0, 7)], ": int")
+        self.assertEqual(hints[(3, 1)], ": int")
+
+    def test_diagnostics(self):
+        """Test statements that fail to analyze are published as errors."""
+        self.server.handle({"method": "textDocument/didChange", "params": {
+            "textDocument": {"uri": URI, "version": 2},
+            "contentChanges": [{"text": "y = 1\nz = y.missing\n"}]}})
+        published = [m for m in self.messages()
+                     if m.get("method") == "textDocument/publishDiagnostics"]
+        diagnostics = published[-1]["params"]["diagnostics"]
+        self.assertEqual(len(diagnostics), 1)
+        self.assertEqual(diagnostics[0]["range"]["start"]["line"], 1)
+
+    def test_shutdown(self):
+        """Test the server stops on exit after a shutdown request."""
+        stream = io.BytesIO()
+        write_message(stream, {"jsonrpc": "2.0", "id": 9, "method": "shutdown"})
+        write_message(stream, {"jsonrpc": "2.0", "method": "exit"})
+        stream.seek(0)
+        self.assertEqual(self.server.serve(stream), 0)
+        self.assertTrue(self.server.exited())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import textwrap
+import unittest
+
+from inference import ModuleEnv
+from builtin_types import *
+from module_type import load_module
+from unknown_type import UNKNOWN_TYPE
+from summary_pack import (
+    summarize_module, types_descriptors, types_from_descriptors
+)
+
+
+class TestSummaryPacks(unittest.TestCase):
+    def test_import_from_pack(self):
+        """Test stdlib imports resolve to their precomputed summaries."""
+        code = """
+import os
+sep = os.sep
+cwd = os.getcwd()
+        """
+        env = ModuleEnv()
+        env.parse_code(code)
+
+        self.assertSetEqual(
+            env.exclusive_lookup("os"),
+            {load_module("os")}
+        )
+        self.assertSetEqual(
+            env.exclusive_lookup("sep"),
+            {STR_TYPE}
+        )
+        self.assertSetEqual(
+            env.exclusive_lookup("cwd"),
+            {UNKNOWN_TYPE}
+        )
+
+    def test_pack_module_is_cached(self):
+        """Test importing a summarized module twice returns the same type."""
+        self.assertIs(load_module("collections"), load_module("collections"))
+
+    def test_summarize_module(self):
+        """Test the descriptors produced when building a pack."""
+        summary = summarize_module("string")
+        self.assertEqual(summary["ascii_letters"], ["str"])
+        self.assertEqual(summary["capwords"], ["function"])
+        self.assertEqual(summary["Template"], ["class:Template"])
+
+    def test_descriptor_round_trip(self):
+        """Test types survive being described and decoded."""
+        types = {INT_TYPE, STR_TYPE, NONE_TYPE}
+        self.assertSetEqual(
+            types_from_descriptors(types_descriptors(types)),
+            types
+        )
+
+
+class TestLazyModules(unittest.TestCase):
+    HELPERS = textwrap.dedent("""
+        SCALE = 2
+
+        def double(x):
+            return x * SCALE
+
+        def unsupported():
+            with open("file") as f:
+                return f
+
+        WORDS = ["a"]
+        WORDS.append(1)
+    """)
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmpdir.name, "helpers.py"), "w") as f:
+            f.write(self.HELPERS)
+        self.main_location = os.path.join(self.tmpdir.name, "main.py")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_only_used_members_inferred(self):
+        """Test members are inferred with their dependencies on first access."""
+        code = """
+import helpers
+y = helpers.double(3)
+        """
+        env = ModuleEnv(module_location=self.main_location)
+        env.parse_code(code)
+
+        self.assertSetEqual(
+            env.exclusive_lookup("y"),
+            {INT_TYPE}
+        )
+
+        mod_t = next(iter(env.exclusive_lookup("helpers")))
+        mod_vars = mod_t.env().variables()
+        self.assertIn("SCALE", mod_vars)
+        self.assertNotIn("unsupported", mod_vars)
+        self.assertNotIn("WORDS", mod_vars)
+
+    def test_member_slice_includes_mutations(self):
+        """Test statements acting on a member are part of its slice."""
+        code = """
+import helpers
+words = helpers.WORDS
+        """
+        env = ModuleEnv(module_location=self.main_location)
+        env.parse_code(code)
+
+        self.assertSetEqual(
+            env.exclusive_lookup("words"),
+            {LIST_CLASS.from_list([{STR_TYPE, INT_TYPE}])}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
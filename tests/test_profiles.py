@@ -0,0 +1,160 @@
+import textwrap
+import unittest
+
+from inference import ModuleEnv
+from builtin_types import *
+from analyze import create_parser, profile_from_args
+from heap import AllocationSiteHeap, CallerContextHeap, ClassHeap
+from profiles import DEFAULT_PROFILE, PROFILES, Profile, get_profile
+from session import AnalysisSession
+from unknown_type import UNKNOWN_TYPE
+
+
+class TestProfiles(unittest.TestCase):
+    LOOP_CODE = """
+        def rotate(items):
+            first = 1
+            second = None
+            third = None
+            for item in items:
+                third = second
+                second = first
+                first = item
+            return third
+
+        rotated = rotate(['a', 1.5])
+    """
+
+    def create_module_env(self, code, profile):
+        env = ModuleEnv(profile=profile)
+        env.parse_code(textwrap.dedent(code))
+        return env
+
+    def test_presets(self):
+        """Test the presets trade precision for speed in order."""
+        fast, balanced, precise = (PROFILES[name] for name in
+                                   ("fast", "balanced", "precise"))
+        self.assertLess(fast.loop_iterations(), balanced.loop_iterations())
+        self.assertLess(balanced.loop_iterations(), precise.loop_iterations())
+        self.assertLess(fast.max_union_size(), balanced.max_union_size())
+        self.assertIsNone(precise.max_union_size())
+        self.assertLess(fast.function_seconds(), balanced.function_seconds())
+        self.assertLess(balanced.function_seconds(), precise.function_seconds())
+
+    def test_sessions(self):
+        """Test the heap and budget of a session follow its profile."""
+        env = ModuleEnv(profile="fast")
+        self.assertIsInstance(env.session().heap(), ClassHeap)
+        self.assertIs(env.session().profile(), PROFILES["fast"])
+        self.assertEqual(env.session().budget_meter().budget().function_nodes(), 2000)
+
+        self.assertIsInstance(ModuleEnv(profile="balanced").session().heap(),
+                              AllocationSiteHeap)
+        heap = ModuleEnv(profile=PROFILES["precise"]).session().heap()
+        self.assertIsInstance(heap, CallerContextHeap)
+        self.assertEqual(heap.depth(), 2)
+
+        self.assertIs(AnalysisSession().profile(), DEFAULT_PROFILE)
+        with self.assertRaises(RuntimeError):
+            ModuleEnv(session=AnalysisSession(), profile="fast")
+        with self.assertRaises(RuntimeError):
+            ModuleEnv(profile="slow")
+
+    def test_overrides(self):
+        """Test levers of a preset can be changed one at a time."""
+        profile = get_profile("fast", loop_iterations=5, heap_policy=None)
+        self.assertEqual(profile.name(), "fast")
+        self.assertEqual(profile.loop_iterations(), 5)
+        self.assertEqual(profile.heap_policy(), "class")
+        self.assertEqual(profile.max_union_size(), 4)
+        self.assertIsNone(PROFILES["fast"].replace(max_union_size=None).max_union_size())
+        self.assertEqual(PROFILES["fast"].loop_iterations(), 1)
+
+        with self.assertRaises(RuntimeError):
+            PROFILES["fast"].replace(loop_limit=2)
+        with self.assertRaises(RuntimeError):
+            Profile(loop_iterations=0)
+
+    def test_command_line(self):
+        """Test options given on the command line override the profile."""
+        parser = create_parser()
+        profile = profile_from_args(parser.parse_args(["a.py"]))
+        self.assertEqual(profile.name(), "balanced")
+        self.assertEqual(profile.settings(), PROFILES["balanced"].settings())
+
+        profile = profile_from_args(parser.parse_args(
+            ["a.py", "--profile", "fast", "--heap", "context",
+             "--function-seconds", "3", "--max-union-size", "8"]))
+        self.assertEqual(profile.heap_policy(), "context")
+        self.assertEqual(profile.function_seconds(), 3.0)
+        self.assertEqual(profile.max_union_size(), 8)
+        self.assertEqual(profile.loop_iterations(), 1)
+        self.assertEqual(profile.function_nodes(), 2000)
+
+    def test_loop_iterations(self):
+        """Test loop bodies are interpreted until their variables stop changing."""
+        once = self.create_module_env(self.LOOP_CODE, Profile())
+        self.assertSetEqual(once.lookup("rotated"), {NONE_TYPE})
+
+        twice = self.create_module_env(self.LOOP_CODE, Profile(loop_iterations=2))
+        self.assertSetEqual(twice.lookup("rotated"), {NONE_TYPE, INT_TYPE})
+
+        fixpoint = {NONE_TYPE, INT_TYPE, STR_TYPE, FLOAT_TYPE}
+        for iterations in (3, 100):
+            env = self.create_module_env(self.LOOP_CODE,
+                                         Profile(loop_iterations=iterations))
+            self.assertSetEqual(env.lookup("rotated"), fixpoint)
+
+    def test_loop_mutations(self):
+        """Test loops keep going while their body changes containers."""
+        code = """
+            a = [1]
+            b = [None]
+            c = [None]
+            for i in [0, 1]:
+                c.append(b[0])
+                b.append(a[0])
+        """
+        env = self.create_module_env(code, Profile())
+        c, = env.lookup("c")
+        self.assertSetEqual(c.element_types(), {NONE_TYPE})
+
+        for iterations in (2, 10):
+            env = self.create_module_env(code, Profile(loop_iterations=iterations))
+            c, = env.lookup("c")
+            self.assertSetEqual(c.element_types(), {NONE_TYPE, INT_TYPE})
+
+    def test_widening(self):
+        """Test variables with too many types are widened to unknown."""
+        code = """
+            x = 1
+            x = 'a'
+            y = x
+            x = None
+            y = 1.5
+        """
+        env = self.create_module_env(code, Profile(max_union_size=2))
+        self.assertSetEqual(env.lookup("x"), {UNKNOWN_TYPE})
+        self.assertSetEqual(env.lookup("y"), {UNKNOWN_TYPE})
+
+        env = self.create_module_env(code, Profile())
+        self.assertSetEqual(env.lookup("x"), {INT_TYPE, STR_TYPE, NONE_TYPE})
+
+    def test_widened_absorbs(self):
+        """Test types bound to a widened variable keep it unknown."""
+        code = """
+            x = 1
+            x = 'a'
+            x = None
+            x = 1.5
+        """
+        env = self.create_module_env(code, Profile(max_union_size=2))
+        self.assertSetEqual(env.lookup("x"), {UNKNOWN_TYPE})
+
+        env = self.create_module_env(self.LOOP_CODE,
+                                     Profile(loop_iterations=100, max_union_size=2))
+        self.assertSetEqual(env.lookup("rotated"), {UNKNOWN_TYPE})
+
+
+if __name__ == "__main__":
+    unittest.main()
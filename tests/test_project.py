@@ -0,0 +1,216 @@
+import ast
+import os
+import subprocess
+import tempfile
+import textwrap
+import unittest
+
+from project import (ProjectAnalyzer, SummaryCache, topological_waves, analyze_changes,
+                     dependents, imported_names)
+
+
+class TestImportedNames(unittest.TestCase):
+    def test_parent_packages(self):
+        """Test importing a module also imports the packages it is in."""
+        node = ast.parse("import a.b.c\nfrom d.e import f\n")
+        self.assertEqual(imported_names(node, "mod"),
+                         {"a", "a.b", "a.b.c", "d", "d.e", "d.e.f"})
+
+    def test_package_relative(self):
+        """Test relative imports of a package __init__ resolve in the package."""
+        node = ast.parse("from . import b\nfrom .c import d\n")
+        self.assertEqual(imported_names(node, "pkg", is_package=True),
+                         {"pkg", "pkg.b", "pkg.c", "pkg.c.d"})
+        self.assertEqual(imported_names(node, "pkg.mod"),
+                         {"pkg", "pkg.b", "pkg.c", "pkg.c.d"})
+
+    def test_package_graph(self):
+        """Test modules depend on their packages and on what __init__ imports."""
+        with tempfile.TemporaryDirectory() as root:
+            os.mkdir(os.path.join(root, "pkg"))
+            files = {
+                os.path.join("pkg", "__init__.py"): "from . import util\n",
+                os.path.join("pkg", "util.py"): "x = 1\n",
+                os.path.join("pkg", "sub.py"): "y = 1\n",
+                "main.py": "import pkg.sub\n",
+            }
+            for filename, code in files.items():
+                with open(os.path.join(root, filename), "w") as f:
+                    f.write(code)
+            graph = ProjectAnalyzer(root).graph()
+        self.assertEqual(graph["pkg"], {"pkg.util"})
+        self.assertEqual(graph["main"], {"pkg", "pkg.sub"})
+
+
+class TestProject(unittest.TestCase):
+    FILES = {
+        "base.py": """
+            SCALE = 2
+            NAME = "base"
+        """,
+        "middle.py": """
+            import base
+            value = base.SCALE
+        """,
+        "top.py": """
+            import middle
+            import base
+            result = middle.value
+            label = base.NAME
+        """,
+        "ping.py": """
+            import pong
+            x = 1
+        """,
+        "pong.py": """
+            import ping
+            y = "a"
+        """,
+    }
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        for filename, code in self.FILES.items():
+            with open(os.path.join(self.tmpdir.name, filename), "w") as f:
+                f.write(textwrap.dedent(code))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_waves(self):
+        """Test modules are grouped after the modules they import."""
+        analyzer = ProjectAnalyzer(self.tmpdir.name)
+        self.assertEqual(
+            analyzer.waves(),
+            [["base", "ping", "pong"], ["middle"], ["top"]]
+        )
+
+    def test_cycle_in_one_wave(self):
+        """Test modules importing each other are analyzed together."""
+        graph = {"a": {"b"}, "b": {"a"}, "c": {"a"}}
+        self.assertEqual(
+            topological_waves(graph),
+            [["a", "b"], ["c"]]
+        )
+
+    def test_summaries(self):
+        """Test imported modules are resolved from earlier summaries."""
+        result = ProjectAnalyzer(self.tmpdir.name).analyze()
+        self.assertEqual(result.summaries()["top"]["result"], ["int"])
+        self.assertEqual(result.summaries()["top"]["label"], ["str"])
+        self.assertEqual(result.errors(), {})
+
+    def test_parallel_matches_serial(self):
+        """Test the result does not depend on the number of workers."""
+        serial = ProjectAnalyzer(self.tmpdir.name, workers=1).analyze()
+        parallel = ProjectAnalyzer(self.tmpdir.name, workers=2).analyze()
+        self.assertEqual(serial.to_json(), parallel.to_json())
+
+    def test_dependents(self):
+        """Test modules importing a module indirectly are its dependents."""
+        analyzer = ProjectAnalyzer(self.tmpdir.name)
+        self.assertEqual(dependents(analyzer.graph(), ["base"]),
+                         {"base", "middle", "top"})
+        self.assertEqual(dependents(analyzer.graph(), ["top"]), {"top"})
+
+
+class TestChangedModules(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmpdir.name, "repo")
+        self.cache_dir = os.path.join(self.tmpdir.name, "cache")
+        os.mkdir(self.root)
+        self.git("init", "-q")
+        self.commit(TestProject.FILES)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def git(self, *args):
+        return subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+            + list(args), cwd=self.root, check=True, stdout=subprocess.PIPE,
+            universal_newlines=True).stdout.strip()
+
+    def commit(self, files, removed=()):
+        """
+        Returns:
+            str: The new commit hash.
+        """
+        for filename, code in files.items():
+            with open(os.path.join(self.root, filename), "w") as f:
+                f.write(textwrap.dedent(code))
+        for filename in removed:
+            os.remove(os.path.join(self.root, filename))
+        self.git("add", "-A")
+        self.git("commit", "-q", "-m", "change")
+        return self.git("rev-parse", "HEAD")
+
+    def test_only_changed_closure(self):
+        """Test only changed modules and their importers are analyzed."""
+        first = self.git("rev-parse", "HEAD")
+        _, analyzed = analyze_changes(self.root, first, first, self.cache_dir)
+        self.assertEqual(analyzed, {"base", "middle", "top", "ping", "pong"})
+
+        second = self.commit({"base.py": "SCALE = 2.5\nNAME = 'base'\n"})
+        result, analyzed = analyze_changes(self.root, first, second,
+                                           self.cache_dir)
+        self.assertEqual(analyzed, {"base", "middle", "top"})
+        self.assertEqual(result.summaries()["top"]["result"], ["float"])
+        self.assertEqual(result.to_json(),
+                         ProjectAnalyzer(self.root).analyze().to_json())
+
+        third = self.commit({"pong.py": "import ping\ny = 1\n"})
+        result, analyzed = analyze_changes(self.root, second, third,
+                                           self.cache_dir)
+        self.assertEqual(analyzed, {"ping", "pong"})
+        self.assertEqual(result.summaries()["pong"]["y"], ["int"])
+
+    def test_deleted_module(self):
+        """Test importers of a deleted module are analyzed again."""
+        first = self.git("rev-parse", "HEAD")
+        analyze_changes(self.root, first, first, self.cache_dir)
+
+        second = self.commit({}, removed=["middle.py"])
+        result, analyzed = analyze_changes(self.root, first, second,
+                                           self.cache_dir)
+        self.assertEqual(analyzed, {"top"})
+        self.assertNotIn("middle", result.summaries())
+        self.assertIn("top", result.errors())
+
+    def test_stale_cache(self):
+        """Test everything is analyzed if the cache is for another revision."""
+        first = self.git("rev-parse", "HEAD")
+        second = self.commit({"ping.py": "import pong\nx = 2\n"})
+        _, analyzed = analyze_changes(self.root, first, second, self.cache_dir)
+        self.assertEqual(analyzed, {"base", "middle", "top", "ping", "pong"})
+
+    def test_dirty_tree(self):
+        """Test uncommitted changes are analyzed but not cached."""
+        first = self.git("rev-parse", "HEAD")
+        analyze_changes(self.root, first, first, self.cache_dir)
+        cached = os.path.join(self.cache_dir, SummaryCache.FILENAME)
+        with open(cached) as f:
+            before = f.read()
+
+        with open(os.path.join(self.root, "base.py"), "w") as f:
+            f.write("SCALE = 2.5\nNAME = 'base'\n")
+        result, analyzed = analyze_changes(self.root, first, first,
+                                           self.cache_dir)
+        self.assertEqual(analyzed, {"base", "middle", "top"})
+        self.assertEqual(result.summaries()["top"]["result"], ["float"])
+        with open(cached) as f:
+            self.assertEqual(f.read(), before)
+
+        # Untracked modules make the tree dirty too
+        self.git("checkout", "--", "base.py")
+        with open(os.path.join(self.root, "extra.py"), "w") as f:
+            f.write("import base\n")
+        _, analyzed = analyze_changes(self.root, first, first, self.cache_dir)
+        self.assertEqual(analyzed, {"extra"})
+        with open(cached) as f:
+            self.assertEqual(f.read(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
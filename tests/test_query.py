@@ -0,0 +1,77 @@
+import unittest
+
+from inference import ModuleEnv
+from builtin_types import *
+from query import QueryEngine
+
+
+class TestQuery(unittest.TestCase):
+    CODE = """
+def scale(x):
+    factor = 2
+    return x * factor
+
+class A:
+    def __init__(self, a):
+        self.a = a
+    def get(self):
+        return self.a
+
+def unrelated():
+    with open("file") as f:
+        return f
+
+A("s")
+y = scale(1.0)
+z = scale(3)
+unrelated()
+    """
+
+    def test_module_variable(self):
+        """Test querying a module level variable."""
+        engine = QueryEngine()
+        self.assertSetEqual(
+            engine.query(self.CODE, "", "y"),
+            {FLOAT_TYPE}
+        )
+
+    def test_function_variable(self):
+        """Test all call sites are considered for function variables."""
+        engine = QueryEngine()
+        self.assertSetEqual(
+            engine.query(self.CODE, "scale", "x"),
+            {INT_TYPE, FLOAT_TYPE}
+        )
+        self.assertSetEqual(
+            engine.query(self.CODE, "scale", "factor"),
+            {INT_TYPE}
+        )
+
+    def test_method_variable(self):
+        """Test querying a variable in a method."""
+        engine = QueryEngine()
+        self.assertSetEqual(
+            engine.query(self.CODE, "A.__init__", "a"),
+            {STR_TYPE}
+        )
+
+    def test_unaffected_code_not_analyzed(self):
+        """Test code that cannot affect the query is never interpreted."""
+        env = ModuleEnv()
+        self.assertRaises(NotImplementedError, env.parse_code, self.CODE)
+
+        engine = QueryEngine()
+        self.assertSetEqual(
+            engine.query(self.CODE, "", "z"),
+            {INT_TYPE}
+        )
+
+    def test_results_memoized(self):
+        """Test repeated queries reuse the first result."""
+        engine = QueryEngine()
+        first = engine.query(self.CODE, "scale", "x")
+        self.assertIs(engine.query(self.CODE, ("scale",), "x"), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
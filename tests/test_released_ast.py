@@ -0,0 +1,101 @@
+import ast
+import textwrap
+import unittest
+
+from inference import ModuleEnv
+from builtin_types import *
+from released_ast import (function_body, is_released, parse_span,
+                          release_body, statement_spans)
+
+
+class TestReleasedAst(unittest.TestCase):
+    CODE = textwrap.dedent("""
+        import math
+
+        def outer(a):
+            def inner(b):
+                '''
+            A docstring indented less than the body.
+                '''
+                return a + b
+            return inner
+
+        @staticmethod
+        def decorated(x):
+            return x
+
+        if True:
+            c = 1
+        elif False:
+            c = 2.0
+        else:
+            c = 'c'
+
+        try:
+            d = 1
+        except ValueError:
+            d = None
+        finally:
+            e = 1
+
+        f = outer(1); g = f(2)
+        h = [
+            1,
+        ]
+        h.append(math.pi)
+        late = f(3.5)
+    """)
+
+    def bindings(self, release_ast):
+        env = ModuleEnv()
+        # Function types are only equal to themselves
+        return [(b.scope, b.name, sorted(map(str, b.types)), b.lineno)
+                for b in env.iter_parse(self.CODE, release_ast=release_ast)]
+
+    def test_statement_spans(self):
+        """Test the spans of top level statements, including decorators and
+        the clauses of compound statements."""
+        lines = self.CODE.splitlines(True)
+        spans = statement_spans(self.CODE)
+        self.assertEqual(
+            [type(n).__name__ for span in spans for n in parse_span(lines, span)],
+            [type(n).__name__ for n in ast.parse(self.CODE).body]
+        )
+        self.assertEqual(
+            [n.lineno for span in spans for n in parse_span(lines, span)],
+            [n.lineno for n in ast.parse(self.CODE).body]
+        )
+
+    def test_release_and_restore(self):
+        """Test a released body is parsed again with the same positions."""
+        lines = self.CODE.splitlines(True)
+        outer = ast.parse(self.CODE).body[1]
+        inner = outer.body[0]
+        expected = ast.dump(inner, include_attributes=True)
+
+        self.assertTrue(release_body(inner, lines))
+        self.assertTrue(is_released(inner))
+        self.assertEqual(inner.body, [])
+        self.assertFalse(release_body(inner, lines))
+
+        function_body(inner)
+        self.assertFalse(is_released(inner))
+        self.assertEqual(ast.dump(inner, include_attributes=True), expected)
+
+    def test_same_bindings(self):
+        """Test the bindings are the same with the AST released, including a
+        closure called after its definition was released."""
+        released = self.bindings(True)
+        self.assertEqual(released, self.bindings(False))
+        self.assertIn(("b", ["float", "int"]), [(n, t) for _, n, t, _ in released])
+
+    def test_syntax_error(self):
+        """Test a syntax error is raised before anything is interpreted."""
+        env = ModuleEnv()
+        with self.assertRaises(SyntaxError):
+            list(env.iter_parse("x = 1\ny = (\n", release_ast=True))
+        self.assertNotIn("x", env.module_variables())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import tempfile
+import threading
+import unittest
+
+import pytype
+
+from inference import ModuleEnv
+from builtin_types import *
+from module_type import load_module
+from session import AnalysisSession, current_session
+
+
+class TestAnalysisSession(unittest.TestCase):
+    def test_concurrent_sessions(self):
+        """Test analyses on separate threads get the same types as alone."""
+        codes = [
+            "def f(x):\n    return x + {}\ny = f({})".format(i, value)
+            for i, value in enumerate(["1", "1.0"] * 4)
+        ]
+        expected = [{INT_TYPE}, {FLOAT_TYPE}] * 4
+        results = [None] * len(codes)
+
+        def analyze(i):
+            env = ModuleEnv(session=AnalysisSession())
+            env.parse_code(codes[i])
+            results[i] = env.exclusive_lookup("y")
+
+        threads = [threading.Thread(target=analyze, args=(i, ))
+                   for i in range(len(codes))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results, expected)
+
+    def test_builtin_call_env_is_not_shared(self):
+        """Test calling a builtin method leaves no argument types behind."""
+        env = ModuleEnv()
+        env.parse_code("x = 1 + 2")
+        self.assertSetEqual(env.exclusive_lookup("x"), {INT_TYPE})
+
+        for method in INT_TYPE.get_attr("__add__"):
+            self.assertDictEqual(method.env().variables(), {})
+
+    def test_summaries_are_per_session(self):
+        """Test a registered summary is only visible in its own session."""
+        session = AnalysisSession()
+        session.register_summary("generated", {"VALUE": ["int"]})
+
+        with session.activate():
+            self.assertIs(current_session(), session)
+            self.assertSetEqual(
+                load_module("generated").get_attr("VALUE"),
+                {INT_TYPE}
+            )
+
+        self.assertIsNot(current_session(), session)
+        self.assertRaises(RuntimeError, load_module, "generated")
+
+    def test_search_path_is_per_session(self):
+        """Test modules next to an analyzed file are only found by its session."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, "neighbour.py"), "w") as f:
+                f.write("VALUE = 1\n")
+
+            env = ModuleEnv(module_location=os.path.join(tmpdir, "main.py"),
+                            session=AnalysisSession())
+            env.parse_code("import neighbour\nx = neighbour.VALUE")
+            self.assertSetEqual(env.exclusive_lookup("x"), {INT_TYPE})
+
+            self.assertRaises(RuntimeError, load_module, "neighbour")
+
+
+class TestFrozenBuiltins(unittest.TestCase):
+    def test_builtins_are_built_once(self):
+        """Test every environment shares the same frozen builtin types."""
+        self.assertIs(pytype.load_builtin_vars(), pytype.load_builtin_vars())
+        self.assertSetEqual(ModuleEnv().lookup("int"), {INT_CLASS})
+        self.assertTrue(INT_CLASS.is_frozen())
+        self.assertTrue(INT_TYPE.is_frozen())
+
+    def test_attrs_set_on_builtins_stay_in_session(self):
+        """Test attributes set on a builtin type only exist in one session."""
+        env = ModuleEnv(session=AnalysisSession())
+        env.parse_code("x = 1\nx.label = 'one'\ny = x.label")
+        self.assertSetEqual(env.exclusive_lookup("y"), {STR_TYPE})
+
+        self.assertFalse(INT_TYPE.has_attr("label"))
+        self.assertRaises(
+            KeyError,
+            ModuleEnv(session=AnalysisSession()).parse_code,
+            "x = 1\ny = x.label"
+        )
+
+    def test_rebinding_builtin_copies_it(self):
+        """Test rebinding a builtin name does not change other modules."""
+        env = ModuleEnv()
+        env.parse_code("print = 1")
+        self.assertIn(INT_TYPE, env.module_variables()["print"])
+        self.assertNotIn(INT_TYPE, ModuleEnv().lookup("print"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import gc
+import textwrap
+import unittest
+import weakref
+
+from inference import ModuleEnv
+from builtin_types import *
+from session import AnalysisSession
+from shape import ROOT_SHAPE, Shape
+
+
+class TestShape(unittest.TestCase):
+    CODE = """
+        class Point:
+            def __init__(self, x, y):
+                self.x = x
+                self.y = y
+
+        class Size:
+            def __init__(self, x, y):
+                self.x = x
+                self.y = y
+
+        class Swapped:
+            def __init__(self, x, y):
+                self.y = y
+                self.x = x
+
+        p = Point(1, 2)
+        s = Size(1.0, 2)
+        w = Swapped(1, 'a')
+        p.x = 'a'
+        px = p.x
+    """
+
+    def create_module_env(self):
+        session = AnalysisSession()
+        env = ModuleEnv(session=session)
+        with session.activate():
+            env.parse_code(textwrap.dedent(self.CODE))
+        return env, session
+
+    def instance(self, env, name):
+        types = env.lookup(name)
+        self.assertEqual(len(types), 1)
+        return next(iter(types))
+
+    def test_shared_layout(self):
+        """Test instances that set the same attributes in the same order
+        share a shape."""
+        env, _ = self.create_module_env()
+        point = self.instance(env, "p")
+        size = self.instance(env, "s")
+        swapped = self.instance(env, "w")
+
+        self.assertIs(point.shape(), size.shape())
+        self.assertIsNot(point.shape(), swapped.shape())
+        self.assertEqual(point.shape().names(), ("x", "y"))
+        self.assertEqual(swapped.shape().names(), ("y", "x"))
+        self.assertIs(LIST_CLASS.instance().shape(), ROOT_SHAPE)
+
+    def test_lookup(self):
+        """Test looking up one attribute matches merging every attribute."""
+        env, _ = self.create_module_env()
+        point = self.instance(env, "p")
+        self.assertSetEqual(env.lookup("px"), {INT_TYPE, STR_TYPE})
+        self.assertSetEqual(point.get_attr("y"), {INT_TYPE})
+        for attr, types in point.attrs().items():
+            self.assertSetEqual(point.lookup_attr(attr), types)
+        self.assertIsNone(point.lookup_attr("z"))
+        self.assertFalse(point.has_attr("z"))
+
+    def test_frozen_overlay(self):
+        """Test attributes set on a frozen type in a session are merged."""
+        env, session = self.create_module_env()
+        with session.activate():
+            env.parse_code("n = 1\nn.label = 'one'")
+            self.assertSetEqual(INT_TYPE.attrs()["label"], {STR_TYPE})
+            self.assertSetEqual(INT_TYPE.lookup_attr("label"), {STR_TYPE})
+            self.assertIs(INT_TYPE.shape(), INT_TYPE.shape())
+            self.assertNotIn("label", INT_TYPE.shape().names())
+
+    def test_branches(self):
+        """Test shapes sharing names only see the names they added."""
+        root = Shape()
+        ab = root.with_attr("a").with_attr("b")
+        ac = root.with_attr("a").with_attr("c")
+        self.assertEqual((ab.names(), ac.names()), (("a", "b"), ("a", "c")))
+        self.assertEqual((ab.index("b"), ab.index("c")), (1, None))
+        self.assertEqual((ac.index("b"), ac.index("c")), (None, 1))
+        self.assertIsNone(root.with_attr("a").index("b"))
+        self.assertIs(root.with_attr("a").with_attr("b"), ab)
+
+    def test_released(self):
+        """Test the shapes of a finished analysis are not kept."""
+        env, session = self.create_module_env()
+        shape = weakref.ref(self.instance(env, "w").shape())
+        del env, session
+        gc.collect()
+        self.assertIsNone(shape())
+
+
+if __name__ == "__main__":
+    unittest.main()
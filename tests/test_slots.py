@@ -0,0 +1,52 @@
+import ast
+import unittest
+
+from inference import Environment, ModuleEnv
+from builtin_types import *
+from arguments import Arguments
+from class_type import ClassType
+from dict_type import DICT_CLASS
+from function_type import FunctionType
+from generator_type import GENERATOR_CLASS
+from module_type import BUILTIN_MODULES
+from tuple_type import TUPLE_CLASS, EMPTY_TUPLE
+
+
+class TestSlots(unittest.TestCase):
+    def test_no_instance_dict(self):
+        """Test the types allocated while analyzing do not have a __dict__."""
+        env = ModuleEnv()
+        node = ast.parse("def f(a, *b):\n    return a").body[0]
+        objects = [
+            Arguments([{INT_TYPE}]),
+            TUPLE_CLASS.create_tuple(init_contents=({INT_TYPE},)),
+            GENERATOR_CLASS.instance(yields={INT_TYPE}),
+            DICT_CLASS.instance().new_container(),
+            LIST_CLASS.instance(),
+            ClassType("Point"),
+            ClassType("Point").instance(),
+            FunctionType.from_node_and_env(node, env),
+            Environment("f", parent_env=env),
+            env,
+            BUILTIN_MODULES["math"],
+        ]
+        for obj in objects:
+            self.assertFalse(hasattr(obj, "__dict__"), type(obj).__name__)
+
+    def test_shared_empty_arguments(self):
+        """Test calls without a vararg or kwarg share the empty ones, and
+        setting an attribute does not leak into other types."""
+        args = Arguments([{INT_TYPE}])
+        self.assertIs(args.vararg(), EMPTY_TUPLE)
+        self.assertIs(args.kwarg(), DICT_CLASS.instance())
+        self.assertFalse(args.vararg())
+
+        first = ClassType("First")
+        second = ClassType("Second")
+        first.set_attr("x", {INT_TYPE})
+        self.assertTrue(first.has_attr("x"))
+        self.assertFalse(second.has_attr("x"))
+
+
+if __name__ == "__main__":
+    unittest.main()
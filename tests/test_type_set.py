@@ -0,0 +1,64 @@
+import textwrap
+import unittest
+
+from inference import ModuleEnv
+from builtin_types import *
+from type_set import EMPTY_TYPES, TypeSet, type_set
+
+
+class TestTypeSet(unittest.TestCase):
+    def test_union(self):
+        """Test unions that add nothing return the same set."""
+        types = TypeSet([INT_TYPE, FLOAT_TYPE])
+        self.assertIs(types | {INT_TYPE}, types)
+        self.assertIs(types | EMPTY_TYPES, types)
+        self.assertIs(EMPTY_TYPES | types, types)
+
+        union = types | {STR_TYPE}
+        self.assertIsInstance(union, TypeSet)
+        self.assertSetEqual(union, {INT_TYPE, FLOAT_TYPE, STR_TYPE})
+        self.assertSetEqual(types, {INT_TYPE, FLOAT_TYPE})
+
+    def test_type_set(self):
+        """Test only mutable sets are copied."""
+        types = TypeSet([INT_TYPE])
+        self.assertIs(type_set(types), types)
+        self.assertIs(type_set(set()), EMPTY_TYPES)
+        mutable = {INT_TYPE}
+        copy = type_set(mutable)
+        mutable.add(STR_TYPE)
+        self.assertSetEqual(copy, {INT_TYPE})
+
+    def test_shared_reads(self):
+        """Test variables and attributes are read without copies."""
+        env = ModuleEnv()
+        env.parse_code(textwrap.dedent("""
+            class A:
+                label = 'a'
+
+            x = 1
+            y = 2
+            x = 3
+            a = A()
+        """))
+        x = env.lookup("x")
+        self.assertIsInstance(x, TypeSet)
+        version = env.version("x")
+
+        # Binding types the variable has keeps its set and version
+        env.bind("x", {INT_TYPE})
+        self.assertIs(env.lookup("x"), x)
+        self.assertEqual(env.version("x"), version)
+
+        env.bind("x", {STR_TYPE})
+        self.assertSetEqual(env.lookup("x"), {INT_TYPE, STR_TYPE})
+        self.assertSetEqual(x, {INT_TYPE})
+        self.assertNotEqual(env.version("x"), version)
+
+        a, = env.lookup("a")
+        self.assertIs(a.get_attr("label"), a.get_attr("label"))
+        self.assertIs(env.lookup("int"), env.lookup("int"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import analyze
+from profiles import get_profile
+from watch import FileWatcher, Debouncer, TypeTracker, watch
+
+
+class TestFileWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        self.write("a.py", "x = 1\n")
+        self.write("pkg/b.py", "y = 1\n")
+        self.write("notes.txt", "")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def write(self, name, code, mtime=None):
+        os.makedirs(os.path.dirname(self.path(name)), exist_ok=True)
+        with open(self.path(name), "w") as f:
+            f.write(code)
+        if mtime is not None:
+            os.utime(self.path(name), ns=(mtime, mtime))
+
+    def test_added_and_removed(self):
+        """Test files added or removed in a directory are found."""
+        watcher = FileWatcher([self.root], sweep=0)
+        self.assertEqual(watcher.files(), [self.path("a.py"), self.path("pkg/b.py")])
+        self.assertEqual(watcher.poll(), set())
+
+        self.write("pkg/sub/c.py", "z = 1\n")
+        os.remove(self.path("a.py"))
+        self.assertEqual(watcher.poll(), {self.path("pkg/sub/c.py"), self.path("a.py")})
+        self.assertEqual(watcher.files(), [self.path("pkg/b.py"), self.path("pkg/sub/c.py")])
+
+    def test_written_in_place(self):
+        """Test files written in place are found by the sweep."""
+        watcher = FileWatcher([self.root], sweep=1)
+        dir_mtime = os.stat(self.root).st_mtime_ns
+        self.write("a.py", "x = 2.5\n", mtime=1)
+        os.utime(self.root, ns=(dir_mtime, dir_mtime))
+
+        found = set()
+        for _ in range(2):
+            found |= watcher.poll()
+        self.assertEqual(found, {self.path("a.py")})
+
+    def test_recent_files_polled(self):
+        """Test recently changed files are stated on every poll."""
+        watcher = FileWatcher([self.root], sweep=0)
+        self.write("pkg/c.py", "z = 1\n")
+        self.assertEqual(watcher.poll(), {self.path("pkg/c.py")})
+
+        self.write("pkg/c.py", "z = 2.5\n", mtime=1)
+        self.assertEqual(watcher.poll(), {self.path("pkg/c.py")})
+
+
+class TestDebouncer(unittest.TestCase):
+    def test_batches(self):
+        """Test changes within the debounce window are one batch."""
+        now = [0.0]
+        debouncer = Debouncer(debounce=1.0, clock=lambda: now[0])
+        debouncer.add({"a.py"})
+        now[0] = 0.5
+        debouncer.add({"b.py"})
+        self.assertIsNone(debouncer.batch())
+        now[0] = 1.6
+        self.assertEqual(debouncer.batch(), ["a.py", "b.py"])
+        self.assertIsNone(debouncer.batch())
+
+
+class TestTypeTracker(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "mod.py")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, code):
+        with open(self.path, "w") as f:
+            f.write(code)
+
+    def test_only_changed_bindings(self):
+        """Test only bindings whose types changed are reported."""
+        tracker = TypeTracker()
+        self.write("x = 1\ny = 'a'\n")
+        self.assertEqual(len(tracker.update([self.path])), 2)
+
+        self.write("x = 2.5\ny = 'a'\nz = x\n")
+        self.assertEqual(tracker.update([self.path]), [
+            {"module": self.path, "scope": "", "variable": "x", "types": ["float"]},
+            {"module": self.path, "scope": "", "variable": "z", "types": ["float"]},
+        ])
+        self.assertEqual(tracker.update([self.path]), [])
+
+        os.remove(self.path)
+        self.assertEqual(
+            [(r["variable"], r["removed"]) for r in tracker.update([self.path])],
+            [("x", True), ("y", True), ("z", True)]
+        )
+
+    def test_errors(self):
+        """Test new errors are reported once."""
+        tracker = TypeTracker()
+        self.write("x = 1\ny = missing\n")
+        records = tracker.update([self.path])
+        self.assertEqual([r["line"] for r in records if "error" in r], [2])
+        self.assertEqual(tracker.update([self.path]), [])
+
+    def test_options(self):
+        """Test the options of the analysis apply to every file."""
+        self.write("def f(x):\n    return x + 1\n\ny = f(1)\n")
+        tracker = TypeTracker(profile=get_profile("fast", function_nodes=1))
+        records = tracker.update([self.path])
+        self.assertEqual([r["types"] for r in records if r["variable"] == "y"],
+                         [["unknown"]])
+
+    def test_watch(self):
+        """Test watch writes every binding and then the changed ones."""
+        self.write("x = 1\n")
+        out = io.StringIO()
+        polls = [0]
+
+        def stop():
+            polls[0] += 1
+            if polls[0] == 1:
+                self.write("x = 'a'\n")
+            return polls[0] > 3
+
+        watch([self.tmpdir.name], out=out, interval=0, debounce=0, stop=stop)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([r["types"] for r in records], [["int"], ["str"]])
+
+    def test_release_ast(self):
+        """Test options that do not apply to watching are rejected."""
+        self.assertEqual(
+            analyze.main(["--watch", "--release-ast", self.tmpdir.name]),
+            analyze.EXIT_USAGE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,28 +1,70 @@
+import itertools
+
 import pytype
 import class_type
 import instance_type
 
 from generator_type import GENERATOR_CLASS
 from magic_methods import *
+from type_set import TYPE_SETS
 
 
 class TupleType(instance_type.InstanceType):
-    def __init__(self, *args, init_contents=None, **kwargs):
+    __slots__ = ("__contents", "__runs", "__length")
+
+    def __init__(self, *args, init_contents=None, runs=None, **kwargs):
         """
         Args:
             init_contents (Optional[tuple[set[pytype.PyType]]])
+            runs (Optional[tuple[tuple[set[pytype.PyType], int]]]): The
+                contents as runs of elements that share a set of types, for
+                long tuples of literals. Only one of init_contents and runs
+                may be given.
         """
         super().__init__("tuple", *args, **kwargs)
 
-        self.__contents = init_contents or tuple()
-
-        assert isinstance(self.__contents, tuple)
-        for types in self.__contents:
-            assert isinstance(types, set)
+        assert init_contents is None or runs is None
+        if runs is not None and len(runs) < sum(count for _, count in runs):
+            # Run-length encoded
+            self.__contents = None
+            self.__runs = runs
+            self.__length = sum(count for _, count in runs)
+        else:
+            if runs is not None:
+                init_contents = tuple(types for types, _ in runs)
+            self.__contents = init_contents or tuple()
+            self.__runs = None
+            self.__length = len(self.__contents)
+            assert isinstance(self.__contents, tuple)
+
+        for types, _ in self.runs():
+            assert isinstance(types, TYPE_SETS)
             assert all(isinstance(x, pytype.PyType) for x in types)
 
     def contents(self):
-        return self.__contents
+        """
+        Returns:
+            tuple[set[pytype.PyType]]: The types of each element. Elements of
+                the same run share a set.
+        """
+        if self.__runs is None:
+            return self.__contents
+        return tuple(itertools.chain.from_iterable(
+            itertools.repeat(types, count) for types, count in self.__runs))
+
+    def runs(self):
+        """
+        Returns:
+            Iterable[tuple[set[pytype.PyType], int]]: The types of each run of
+                elements that share them and the number of elements in it,
+                without expanding a run-length encoded tuple.
+        """
+        if self.__runs is None:
+            return ((types, 1) for types in self.__contents)
+        return self.__runs
+
+    def length(self):
+        return self.__length
 
     def all_contents(self):
         """
@@ -30,10 +72,13 @@ class TupleType(instance_type.InstanceType):
             set[pytype.PyType]: Set of all types in the contents
         """
         ret_types = set()
-        for types in self.contents():
+        for types, _ in self.runs():
             ret_types |= types
         return ret_types
 
+    def element_types(self):
+        return self.all_contents()
+
     def __hash__(self):
         # Tuple hash depends on hashs of contents
         return hash(self.name())
@@ -43,20 +88,13 @@ class TupleType(instance_type.InstanceType):
         if not isinstance(other, TupleType):
             return False
 
-        own_contents = self.contents()
-        other_contents = other.contents()
-
-        if len(own_contents) != len(other_contents):
+        if self.length() != other.length():
             return False
 
-        for i in range(len(own_contents)):
-            if own_contents[i] != other_contents[i]:
-                return False
-
-        return True
+        return self.contents() == other.contents()
 
     def __bool__(self):
-        return bool(self.contents())
+        return self.__length > 0
 
     def __str__(self):
         str_contents = list(set(map(str, types)) for types in self.contents())
@@ -64,6 +102,8 @@ class TupleType(instance_type.InstanceType):
 
 
 class TupleClass(class_type.InstanceWrapperClass):
+    __slots__ = ()
+
     def create_tuple(self, **kwargs):
         return TupleType(parents=[self], **kwargs)
 
@@ -127,3 +167,6 @@ def create_class():
 
 
 TUPLE_CLASS = create_class()
+
+# Shared by every call without a vararg
+EMPTY_TUPLE = TUPLE_CLASS.create_tuple()
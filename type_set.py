@@ -0,0 +1,58 @@
+"""
+Immutable sets of types.
+
+The types of variables and attributes are read far more often than they
+change, so they are kept in TypeSets that every read shares instead of
+copying. Binding more types replaces the set with a union, and a union that
+adds nothing is the same TypeSet, so repeated binds of types already bound
+allocate nothing.
+
+Sets that accumulate results, like the returns of a function or the contents
+of a list, stay mutable sets. Both are accepted wherever a set of types is.
+"""
+
+import itertools
+
+
+# The classes of sets of types, for type checks
+TYPE_SETS = (set, frozenset)
+
+
+class TypeSet(frozenset):
+    __slots__ = ()
+
+    def __or__(self, other):
+        """
+        Returns:
+            TypeSet: This set if other adds no types, or other if it is a
+                TypeSet and this set adds no types, or a new TypeSet.
+        """
+        if not isinstance(other, TYPE_SETS):
+            return NotImplemented
+        if len(other) <= len(self) and other <= self:
+            return self
+        if isinstance(other, TypeSet) and self <= other:
+            return other
+        return TypeSet(itertools.chain(self, other))
+
+    def union(self, *others):
+        result = self
+        for other in others:
+            result = result | (other if isinstance(other, TYPE_SETS) else set(other))
+        return result
+
+    def __repr__(self):
+        return "TypeSet({})".format(set(self) if self else "")
+
+
+EMPTY_TYPES = TypeSet()
+
+
+def type_set(types):
+    """
+    Returns:
+        TypeSet: The types, copied only if they are not a TypeSet already.
+    """
+    if isinstance(types, TypeSet):
+        return types
+    return TypeSet(types) if types else EMPTY_TYPES
@@ -0,0 +1,57 @@
+import class_type
+import instance_type
+
+
+class UnknownType(instance_type.InstanceType):
+    """
+    Type for values whose origin was not interpreted, like the result of
+    calling a function that we only have a summary of. Every operation on an
+    unknown type produces another unknown type.
+    """
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__("unknown", *args, **kwargs)
+
+    def has_attr(self, attr):
+        return True
+
+    def get_attr(self, attr):
+        return {self}
+
+    def set_attr(self, attr, types):
+        pass
+
+    def call(self, args):
+        return {self}
+
+    def call_attr(self, attr, args):
+        return {self}
+
+    def element_types(self):
+        return {self}
+
+    def _call_and_check_return(self, attr, expected, args):
+        return {expected}
+
+
+class UnknownClass(class_type.ClassType):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__("unknown")
+
+    def call(self, args):
+        return {self.instance()}
+
+    def instance(self):
+        return UNKNOWN_TYPE
+
+
+def create_class():
+    cls = UnknownClass()
+    return cls
+
+
+UNKNOWN_CLASS = create_class()
+UNKNOWN_TYPE = UnknownType(parents=[UNKNOWN_CLASS])
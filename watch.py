@@ -0,0 +1,373 @@
+"""
+Watch python files and print the bindings whose types change.
+
+    python -m analyze src/ --watch
+
+Files are polled, so nothing platform specific is needed. Each poll stats
+every watched directory, but only lists and stats the files of directories
+whose mtime changed, which is where files were added, removed or renamed
+(editors that save through a temporary file rename it over the old one).
+Files written in place are found through the files that changed recently,
+which are stated on every poll, and through a sweep that stats a slice of
+the remaining files on each poll. An idle tree of 50k files only costs the
+directory stats and one slice per poll.
+
+Changes arriving within the debounce window of each other are analyzed as a
+single batch. Every file keeps an IncrementalModule, so only the statements
+connected to an edit are interpreted again.
+"""
+
+import os
+import sys
+import time
+
+from collections import OrderedDict
+
+
+DEFAULT_INTERVAL = 0.5
+DEFAULT_DEBOUNCE = 0.2
+DEFAULT_SWEEP = 1000
+DEFAULT_HOT = 64
+
+
+def file_signature(path):
+    """
+    Returns:
+        Optional[tuple[int, int]]: The mtime and size of a file, or None if it
+            does not exist.
+    """
+    try:
+        st = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class FileWatcher:
+    def __init__(self, paths, sweep=DEFAULT_SWEEP, hot=DEFAULT_HOT):
+        """
+        Args:
+            paths (list[str]): Directories to watch recursively and single
+                python files.
+            sweep (int): Number of files stated by each poll on top of those
+                in changed directories and recently changed files.
+            hot (int): Number of recently changed files stated by every poll.
+        """
+        self.__dirs = {}  # dict[str, int]
+        self.__files = {}  # dict[str, tuple[int, int]]
+        self.__pinned = set()  # set[str]
+        self.__hot = OrderedDict()  # OrderedDict[str, None]
+        self.__hot_size = hot
+        self.__sweep = sweep
+        self.__sweep_order = None  # Optional[list[str]]
+        self.__sweep_pos = 0
+
+        for path in paths:
+            if os.path.isdir(path):
+                # Keys of files must start with the key of their directory
+                self.__add_dir(os.path.normpath(path))
+            else:
+                self.__pinned.add(path)
+                signature = file_signature(path)
+                if signature is not None:
+                    self.__files[path] = signature
+
+    def files(self):
+        """
+        Returns:
+            list[str]: Every python file that currently exists, sorted.
+        """
+        return sorted(self.__files)
+
+    def dirs(self):
+        return sorted(self.__dirs)
+
+    def __add_dir(self, dirpath):
+        """
+        Start watching a directory and everything under it.
+
+        Returns:
+            set[str]: The python files found.
+        """
+        found = set()
+        for root, dirnames, filenames in os.walk(dirpath):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            try:
+                self.__dirs[root] = os.stat(root).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            for filename in filenames:
+                if filename.endswith(".py"):
+                    path = os.path.join(root, filename)
+                    signature = file_signature(path)
+                    if signature is not None:
+                        self.__files[path] = signature
+                        found.add(path)
+        self.__sweep_order = None
+        return found
+
+    def __remove_dir(self, dirpath):
+        """
+        Returns:
+            set[str]: The python files that were under the directory.
+        """
+        prefix = dirpath + os.sep
+        for d in [d for d in self.__dirs if d == dirpath or d.startswith(prefix)]:
+            del self.__dirs[d]
+        removed = {path for path in self.__files if path.startswith(prefix)}
+        for path in removed:
+            del self.__files[path]
+        self.__sweep_order = None
+        return removed
+
+    def __rescan_dir(self, dirpath, mtime):
+        """
+        List a directory whose entries changed.
+
+        Returns:
+            set[str]: Python files added, removed or changed in it.
+        """
+        self.__dirs[dirpath] = mtime
+        changed = set()
+        seen = set()
+        try:
+            entries = list(os.scandir(dirpath))
+        except FileNotFoundError:
+            return self.__remove_dir(dirpath)
+
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir():
+                if entry.path not in self.__dirs:
+                    changed |= self.__add_dir(entry.path)
+            elif entry.name.endswith(".py"):
+                seen.add(entry.path)
+                if self.__check(entry.path):
+                    changed.add(entry.path)
+
+        for path in [p for p in self.__files
+                     if os.path.dirname(p) == dirpath and p not in seen]:
+            del self.__files[path]
+            self.__sweep_order = None
+            changed.add(path)
+        return changed
+
+    def __check(self, path):
+        """
+        Stat a single file.
+
+        Returns:
+            bool: Whether it was added, removed or changed.
+        """
+        signature = file_signature(path)
+        if signature == self.__files.get(path):
+            return False
+        if signature is None:
+            del self.__files[path]
+        else:
+            self.__files[path] = signature
+        self.__sweep_order = None
+        return True
+
+    def poll(self):
+        """
+        Returns:
+            set[str]: Python files added, removed or changed since the last
+                poll.
+        """
+        changed = set()
+
+        for dirpath in sorted(self.__dirs):
+            if dirpath not in self.__dirs:
+                # Removed with its parent
+                continue
+            try:
+                mtime = os.stat(dirpath).st_mtime_ns
+            except FileNotFoundError:
+                changed |= self.__remove_dir(dirpath)
+                continue
+            if mtime != self.__dirs[dirpath]:
+                changed |= self.__rescan_dir(dirpath, mtime)
+
+        for path in self.__pinned | set(self.__hot):
+            if (path in self.__files or path in self.__pinned) and self.__check(path):
+                changed.add(path)
+
+        changed |= self.__sweep_files()
+
+        for path in changed:
+            self.__hot.pop(path, None)
+            self.__hot[path] = None
+        while len(self.__hot) > self.__hot_size:
+            self.__hot.popitem(last=False)
+        return changed
+
+    def __sweep_files(self):
+        if self.__sweep_order is None:
+            self.__sweep_order = sorted(self.__files)
+            self.__sweep_pos %= max(len(self.__sweep_order), 1)
+
+        order = self.__sweep_order
+        end = min(self.__sweep_pos + self.__sweep, len(order))
+        batch = order[self.__sweep_pos:end]
+        self.__sweep_pos = end if end < len(order) else 0
+
+        return {path for path in batch
+                if path in self.__files and self.__check(path)}
+
+
+class Debouncer:
+    def __init__(self, debounce=DEFAULT_DEBOUNCE, clock=time.monotonic):
+        """
+        Args:
+            debounce (float): Seconds without new changes before a batch is
+                released.
+            clock (Callable[[], float])
+        """
+        self.__debounce = debounce
+        self.__clock = clock
+        self.__pending = set()
+        self.__last = None
+
+    def pending(self):
+        return bool(self.__pending)
+
+    def add(self, changes):
+        if changes:
+            self.__pending |= set(changes)
+            self.__last = self.__clock()
+
+    def batch(self):
+        """
+        Returns:
+            Optional[list[str]]: The pending changes once none arrived for the
+                debounce window.
+        """
+        if not self.__pending or self.__clock() - self.__last < self.__debounce:
+            return None
+        batch = sorted(self.__pending)
+        self.__pending = set()
+        return batch
+
+
+class TypeTracker:
+    """Incremental analysis of every watched file and the types last seen."""
+
+    def __init__(self, **options):
+        """
+        Args:
+            **options: Arguments of the incremental.IncrementalModule of each
+                file, like the profile.
+        """
+        self.__options = options
+        self.__modules = {}  # dict[str, incremental.IncrementalModule]
+        self.__types = {}  # dict[str, dict[tuple[str, str], list[str]]]
+        self.__errors = {}  # dict[str, list[tuple[Optional[int], str]]]
+
+    def update(self, paths):
+        """
+        Analyze files again.
+
+        Args:
+            paths (Iterable[str]): Files that changed. Files that no longer
+                exist are forgotten.
+
+        Returns:
+            list[dict]: A record for every binding whose types changed, in
+                the format of python -m analyze without the line. Bindings
+                that are gone have "removed" set. New errors get a record
+                with "error".
+        """
+        records = []
+        for path in paths:
+            types, errors = self.__analyze(path)
+            old_types = self.__types.get(path, {})
+            old_errors = self.__errors.get(path, [])
+
+            for scope, name in sorted(old_types.keys() | types.keys()):
+                new = types.get((scope, name))
+                if new == old_types.get((scope, name)):
+                    continue
+                record = {"module": path, "scope": scope, "variable": name}
+                if new is None:
+                    record["removed"] = True
+                else:
+                    record["types"] = new
+                records.append(record)
+
+            for lineno, message in errors:
+                if (lineno, message) not in old_errors:
+                    records.append({"module": path, "error": message,
+                                    "line": lineno})
+
+            if types or errors or os.path.exists(path):
+                self.__types[path] = types
+                self.__errors[path] = errors
+            else:
+                self.__types.pop(path, None)
+                self.__errors.pop(path, None)
+                self.__modules.pop(path, None)
+        return records
+
+    def __analyze(self, path):
+        """
+        Returns:
+            tuple[dict[tuple[str, str], list[str]], list[tuple[Optional[int], str]]]
+        """
+        from incremental import IncrementalModule
+        from summary_pack import types_descriptors
+
+        try:
+            with open(path, "r") as f:
+                source = f.read()
+        except (FileNotFoundError, IsADirectoryError):
+            return {}, []
+
+        module = self.__modules.get(path)
+        if module is None:
+            module = IncrementalModule(module_location=os.path.abspath(path),
+                                       **self.__options)
+            self.__modules[path] = module
+        try:
+            module.update(source)
+        except SyntaxError as e:
+            # Keep the types from before the syntax error
+            return (self.__types.get(path, {}),
+                    [(e.lineno, "SyntaxError: {}".format(e.msg))])
+
+        types = {key: types_descriptors(t) for key, t in module.types().items()}
+        return types, list(module.errors())
+
+
+def watch(paths, out=sys.stdout, interval=DEFAULT_INTERVAL,
+          debounce=DEFAULT_DEBOUNCE, stop=None, **options):
+    """
+    Print the types of every binding, then the bindings whose types change,
+    until stopped.
+
+    Args:
+        paths (list[str])
+        out: Text stream records are written to.
+        interval (float): Seconds between polls while nothing is pending.
+        debounce (float)
+        stop (Optional[Callable[[], bool]]): Checked after every poll.
+        **options: Arguments of the incremental.IncrementalModule of each
+            file.
+    """
+    from analyze import write_record
+
+    watcher = FileWatcher(paths)
+    debouncer = Debouncer(debounce)
+    tracker = TypeTracker(**options)
+
+    for record in tracker.update(watcher.files()):
+        write_record(out, record)
+
+    while stop is None or not stop():
+        debouncer.add(watcher.poll())
+        batch = debouncer.batch()
+        if batch is not None:
+            for record in tracker.update(batch):
+                write_record(out, record)
+        time.sleep(min(interval, debounce) if debouncer.pending() else interval)